@@ -0,0 +1,73 @@
+"""在合成的大规模作答数据上测量向量化分析的耗时。
+
+用法：python -m benchmarks.bench_analytics [--rows 2000000] [--questions 3]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.analytics import TrialFrame, analyze
+
+
+RULES = ["PNP~", "PNAP", "NP~P", "P~NP"]
+SYMBOLS = ["P", "N", "A", "~"]
+
+
+def synthetic_frame(rows: int, questions: int, participants: int, seed: int) -> TrialFrame:
+    rng = np.random.default_rng(seed)
+    trials = -(-rows // questions)
+    count = trials * questions
+    trial_ids = np.repeat(np.arange(trials), questions)
+    participant = (trial_ids * participants // trials).astype(np.int32)
+    first_rating = rng.integers(1, 8, trials).astype(np.float64)
+    rating = np.clip(first_rating[trial_ids] + rng.normal(0, 1.5, count).round(), 1, 7)
+    rating[rng.random(count) < 0.1] = np.nan
+    arrays = {
+        "participant_name": participant,
+        "participant_age": np.zeros(count, dtype=np.int32),
+        "participant_gender": np.zeros(count, dtype=np.int32),
+        "participant_class": (participant % 12).astype(np.int32),
+        "mode": np.zeros(count, dtype=np.int32),
+        "trial_index": trial_ids.astype(np.int64) + 1,
+        "question_order": np.tile(np.arange(1, questions + 1), trials).astype(np.int64),
+        "rule_code": np.repeat(rng.integers(0, len(RULES), trials), questions).astype(np.int32),
+        "symbol": rng.integers(0, len(SYMBOLS), count).astype(np.int32),
+        "category": np.zeros(count, dtype=np.int32),
+        "rating_value": rating,
+        "elapsed_since_display": rng.gamma(2.0, 0.8, count),
+    }
+    categories = {
+        "participant_name": np.asarray([f"被试{index}" for index in range(participants)], dtype=np.str_),
+        "participant_age": np.asarray(["20"], dtype=np.str_),
+        "participant_gender": np.asarray(["女"], dtype=np.str_),
+        "participant_class": np.asarray([f"{index + 1}班" for index in range(12)], dtype=np.str_),
+        "mode": np.asarray(["formal"], dtype=np.str_),
+        "rule_code": np.asarray(RULES, dtype=np.str_),
+        "symbol": np.asarray(SYMBOLS, dtype=np.str_),
+        "category": np.asarray(["P"], dtype=np.str_),
+    }
+    return TrialFrame(arrays, categories)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--questions", type=int, default=3)
+    parser.add_argument("--participants", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    frame = synthetic_frame(args.rows, args.questions, args.participants, args.seed)
+    print(f"合成 {len(frame)} 行（{args.participants} 名被试，每试次 {args.questions} 题）")
+    start = time.perf_counter()
+    results = analyze(frame)
+    elapsed = time.perf_counter() - start
+    print(f"  全部指标                        {elapsed:8.3f} s  ({len(frame) / elapsed / 1e6:.1f} M 行/秒)")
+    for name, table in results.items():
+        print(f"  {name:<32}{len(next(iter(table.values()))):8d} 行")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""对比批量读取 CSV 与列式结果文件（Parquet / .npz）的耗时。
+
+用法：python -m benchmarks.bench_columnar_load [--files 10000] [--rows 40] [--format columnar]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import Callable, List
+
+from src.columnar import read_columnar, read_csv_columns, resolve_format
+from src.recorder import DataRecorder
+
+
+def build_session(path: str, rows: int, rng: random.Random, fmt: str) -> None:
+    recorder = DataRecorder(path, journal=False, export_formats=[fmt])
+    recorder.set_participant_info(
+        {"name": f"被试{rng.randrange(10000)}", "age": str(rng.randint(18, 30)), "gender": "女", "class": "三班"}
+    )
+    controls_pool = [
+        {"show_slider": True, "caption_template": "第 {trial} 次 - 题目 {question_order}"},
+        {"show_slider": False, "hint_template": "请复核并给出评分。"},
+        {},
+    ]
+    clock = 0.0
+    for index in range(rows):
+        trial, order = index // 2 + 1, index % 2 + 1
+        clock += rng.uniform(1.0, 4.0)
+        show = order == 1 or rng.random() < 0.5
+        recorder.record(
+            mode="formal",
+            trial_index=trial,
+            question_order=order,
+            category=rng.choice(["P", "N", "none"]),
+            symbol=rng.choice(["P", "N", "~"]),
+            stimulus=f"在一次情境中做出了第 {index} 个选择",
+            rating_value=float(rng.randint(1, 7)) if show else None,
+            rating_started_at=clock - 0.5 if show else None,
+            rating_confirmed_at=clock,
+            elapsed_since_display=rng.uniform(0.5, 3.0),
+            trial_elapsed_total=rng.uniform(1.0, 6.0),
+            rule_code=rng.choice(["PN", "NP", "P~"]),
+            controls=rng.choice(controls_pool),
+        )
+    recorder.export()
+    recorder.close()
+
+
+def timed(label: str, func: Callable[[], int]) -> float:
+    start = time.perf_counter()
+    count = func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<32}{elapsed:8.3f} s  ({count} 行)")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=10000)
+    parser.add_argument("--rows", type=int, default=40)
+    parser.add_argument("--format", default="columnar", choices=["columnar", "parquet", "npz"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    fmt = resolve_format(args.format)
+    if fmt is None:
+        print("未安装 pyarrow 或 numpy，无法运行列式基准")
+        return
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"生成 {args.files} 个会话文件（每个 {args.rows} 行，列式格式 {fmt}）…")
+        csv_paths: List[str] = []
+        for index in range(args.files):
+            path = os.path.join(directory, f"session_{index:05d}.csv")
+            build_session(path, args.rows, rng, fmt)
+            csv_paths.append(path)
+        column_paths = [f"{os.path.splitext(path)[0]}.{fmt}" for path in csv_paths]
+        csv_bytes = sum(os.path.getsize(path) for path in csv_paths)
+        column_bytes = sum(os.path.getsize(path) for path in column_paths)
+        print(f"  磁盘占用：CSV {csv_bytes / 1e6:.1f} MB，{fmt} {column_bytes / 1e6:.1f} MB")
+
+        for path_csv, path_col in zip(csv_paths[:50], column_paths[:50]):
+            if read_csv_columns(path_csv) != read_columnar(path_col):
+                raise SystemExit(f"内容不一致：{path_csv}")
+        print("  抽样核对：列式文件与 CSV 的类型化内容一致")
+
+        for decode in (False, True):
+            label = "含 controls JSON 解析" if decode else "仅类型化读取"
+            print(f"批量读取（{label}）：")
+            base = timed("CSV", lambda: sum(len(read_csv_columns(p, decode)["mode"]) for p in csv_paths))
+            fast = timed(fmt, lambda: sum(len(read_columnar(p, decode)["mode"]) for p in column_paths))
+            print(f"  加速比 {base / fast:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
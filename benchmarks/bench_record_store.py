@@ -0,0 +1,148 @@
+"""对比逐条 dataclass 记录与列式 RecordStore 的内存占用、record() 耗时与导出遍历耗时。
+
+用法：python -m benchmarks.bench_record_store [--records 10000] [--repeat 3]
+"""
+
+import argparse
+import gc
+import random
+import statistics
+import time
+import tracemalloc
+from dataclasses import asdict
+from typing import Any, Callable, List, Tuple
+
+from src.recorder import DataRecorder, QuestionRecord
+
+
+CONTROLS = [
+    {"show_slider": True, "caption_template": "第 {trial} 次 - 题目 {question_order}"},
+    {"show_slider": False, "hint_template": "请复核并给出评分。"},
+    {},
+]
+
+
+class LegacyRecorder:
+    """旧实现的内存部分：每条记录一个 QuestionRecord，导出前整体排序"""
+
+    def __init__(self) -> None:
+        self.participant_info = {"name": "", "age": "", "gender": "", "class": ""}
+        self._records: List[QuestionRecord] = []
+
+    def record(self, *args: Any, **kwargs: Any) -> None:
+        info = self.participant_info
+        fields = dict(zip(RECORD_ARGS, args), **kwargs)
+        controls = fields.pop("controls")
+        self._records.append(
+            QuestionRecord(
+                participant_name=info.get("name", ""),
+                participant_age=info.get("age", ""),
+                participant_gender=info.get("gender", ""),
+                participant_class=info.get("class", ""),
+                controls=controls.copy() if controls else {},
+                **fields,
+            )
+        )
+
+    def iter_rows(self) -> int:
+        rows = sorted(self._records, key=lambda rec: (rec.mode, rec.trial_index, rec.question_order))
+        return sum(1 for record in rows if asdict(record))
+
+
+RECORD_ARGS = (
+    "mode",
+    "trial_index",
+    "question_order",
+    "category",
+    "symbol",
+    "stimulus",
+    "rating_value",
+    "rating_started_at",
+    "rating_confirmed_at",
+    "elapsed_since_display",
+    "trial_elapsed_total",
+    "rule_code",
+    "controls",
+)
+
+
+def make_calls(count: int, seed: int) -> List[Tuple[Any, ...]]:
+    rng = random.Random(seed)
+    calls = []
+    clock = 0.0
+    for index in range(count):
+        clock += rng.uniform(1.0, 4.0)
+        calls.append(
+            (
+                "formal",
+                index // 2 + 1,
+                index % 2 + 1,
+                rng.choice(["P", "N", "none"]),
+                rng.choice(["P", "N", "~"]),
+                f"在一次情境中做出了第 {rng.randrange(400)} 个选择",
+                rng.randint(1, 7),
+                clock - 0.5,
+                clock,
+                rng.uniform(0.5, 3.0),
+                rng.uniform(1.0, 6.0),
+                rng.choice(["PN", "NP", "P~"]),
+                dict(rng.choice(CONTROLS)),
+            )
+        )
+    return calls
+
+
+def fill(factory: Callable[[], Any], calls: List[Tuple[Any, ...]], latencies: List[int]) -> Any:
+    recorder = factory()
+    recorder.participant_info.update({"name": "被试", "age": "20", "gender": "女", "class": "三班"})
+    for call in calls:
+        start = time.perf_counter_ns()
+        recorder.record(*call)
+        latencies.append(time.perf_counter_ns() - start)
+    return recorder
+
+
+def measure(label: str, factory: Callable[[], Any], calls: List[Tuple[Any, ...]], iterate: Callable[[Any], int]) -> None:
+    # 内存与耗时分两遍测量：tracemalloc 本身会拖慢分配
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    recorder = fill(factory, calls, [])
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del recorder
+
+    gc.collect()
+    latencies: List[int] = []
+    recorder = fill(factory, calls, latencies)
+    start = time.perf_counter()
+    rows = iterate(recorder)
+    export_elapsed = time.perf_counter() - start
+    latencies.sort()
+    count = len(calls)
+    print(f"{label}")
+    print(f"  每条记录内存                    {used / count:8.1f} B")
+    print(f"  record() 平均 / p99             {statistics.fmean(latencies) / 1000:8.2f} / {latencies[count * 99 // 100] / 1000:.2f} µs")
+    print(f"  导出遍历 {rows} 行{'':<{14 - len(str(rows))}}{export_elapsed * 1000:8.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    calls = make_calls(args.records, args.seed)
+    for _ in range(args.repeat):
+        measure("逐条 QuestionRecord（旧实现）", LegacyRecorder, calls, lambda recorder: recorder.iter_rows())
+        measure(
+            "列式 RecordStore",
+            lambda: DataRecorder("unused.csv", journal=False),
+            calls,
+            lambda recorder: sum(1 for _ in recorder._iter_rows()),
+        )
+
+
+if __name__ == "__main__":
+    main()
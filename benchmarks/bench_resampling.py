@@ -0,0 +1,41 @@
+"""测量重抽样引擎在不同进程数下的耗时与加速比。
+
+用法：python -m benchmarks.bench_resampling [--participants 500] [--resamples 50000]
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from src.resampling import resample
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--participants", type=int, default=500)
+    parser.add_argument("--resamples", type=int, default=50000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    differences = np.random.default_rng(args.seed).normal(0.2, 1.0, args.participants)
+    counts = sorted({1, *(2 ** power for power in range(1, 8) if 2 ** power <= args.max_workers), args.max_workers})
+    print(f"{args.participants} 名被试，自助法与置换检验各 {args.resamples} 次（CPU 核数 {os.cpu_count()}）")
+    baseline = None
+    reference = None
+    for workers in counts:
+        start = time.perf_counter()
+        boot = resample("bootstrap", differences, args.resamples, args.seed, workers)
+        perm = resample("permutation", differences, args.resamples, args.seed + 1, workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        if reference is None:
+            reference = (boot, perm)
+        same = np.array_equal(reference[0], boot) and np.array_equal(reference[1], perm)
+        print(f"  {workers:>3} 个进程  {elapsed:8.3f} s  加速比 {baseline / elapsed:5.2f}x  结果一致：{'是' if same else '否'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""对比 font.render 与字形图集（GlyphAtlas）在题库文本上的绘制与折行耗时。
+
+用法：python -m benchmarks.bench_text_wrap [--config config.json] [--font fonts/SimHei.ttf] [--rounds 20]
+
+中文字形的光栅化远比拉丁字母昂贵，结论须以实际分发的中文字体测得；
+用缺少中文字形的替代字体时，中文只会渲染为缺字方框，数字没有参考价值。
+"""
+
+import argparse
+import csv
+import os
+import time
+from typing import Callable, List
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+from src.config_loader import load_config  # noqa: E402
+from src.fonts import create_fonts  # noqa: E402
+from src.ui.glyph_atlas import GlyphAtlas  # noqa: E402
+from src.utils.paths import resource_path  # noqa: E402
+
+
+def load_stimulus_lines(path: str) -> List[str]:
+    lines: List[str] = []
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for row in csv.reader(f):
+            lines.extend(cell.strip() for cell in row if cell.strip())
+    return lines
+
+
+def timed(label: str, rounds: int, func: Callable[[], None]) -> float:
+    func()  # 预热：图集在首轮完成光栅化
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    elapsed = (time.perf_counter() - start) / rounds
+    print(f"  {label:<28}{elapsed * 1000:10.3f} ms/轮")
+    return elapsed
+
+
+def wrap_with_render(font: pygame.font.Font, text: str, max_width: int, color) -> int:
+    """旧实现：每追加一个字符就整串 render 一次测量宽度"""
+    lines = 0
+    buffer = ""
+    for char in text:
+        next_buffer = buffer + char
+        if font.render(next_buffer, True, color).get_width() > max_width and buffer:
+            lines += 1
+            buffer = char
+        else:
+            buffer = next_buffer
+    return lines + (1 if buffer else 0)
+
+
+def font_glyph_metrics(font: pygame.font.Font, char: str) -> tuple:
+    """不经图集，直接用 font.size/metrics 取单个字形的 (位图宽度, 步进宽度)"""
+    width = font.size(char)[0]
+    metrics = font.metrics(char)
+    return width, metrics[0][4] if metrics and metrics[0] else width
+
+
+def wrap_with_metrics(metrics: Callable[[str], tuple], text: str, max_width: int) -> int:
+    """ExperimentScene._wrap_text 的做法：按字形宽度与步进累加"""
+    lines = 0
+    pen = extent = 0
+    started = False
+    for char in text:
+        glyph_width, advance = metrics(char)
+        next_extent = max(extent, pen + glyph_width, pen + advance)
+        if next_extent > max_width and started:
+            lines += 1
+            pen, extent = advance, max(glyph_width, advance)
+        else:
+            pen, extent = pen + advance, next_extent
+        started = True
+    return lines + (1 if started else 0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--config", default=None)
+    parser.add_argument("--stimuli", default=None)
+    parser.add_argument("--font", default=None, help="覆盖 config.json 中的 fonts.path")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--scale", type=float, default=1.0)
+    args = parser.parse_args()
+
+    pygame.init()
+    config = load_config(args.config)
+    if args.font:
+        config.font_path = os.path.abspath(args.font)
+    width = int(config.window.get("width", 1920) * args.scale)
+    height = int(config.window.get("height", 1080) * args.scale)
+    screen = pygame.display.set_mode((width, height))
+    stimuli_path = args.stimuli or resource_path("stimuli.csv")
+    fonts = create_fonts(config, args.scale, stimuli_path)
+    font = fonts.get("question", fonts["body"])
+    body = fonts["body"]
+    color = config.colors.get("text_primary", (44, 47, 56))
+    lines = load_stimulus_lines(stimuli_path)
+    timers = [f"当前题目用时：{i * 0.016:5.2f}s" for i in range(600)]
+    readouts = [f"当前评分：{1 + i * 0.01:.2f}" for i in range(600)]
+    labels = ["确认", "保存信息", "继续实验", "放弃并重新开始"] * 150
+    wrap_width = int(width * 0.8)
+    line_atlas = GlyphAtlas(font, color)
+    body_atlas = GlyphAtlas(body, color)
+
+    print(f"字体 {config.font_path}，分辨率 {width}x{height}")
+    print(f"题库文本 {len(lines)} 行，计时/评分读数与按钮标签各 {len(timers)} 条")
+
+    def render_font(target_font: pygame.font.Font, texts: List[str]) -> Callable[[], None]:
+        def run() -> None:
+            for text in texts:
+                screen.blit(target_font.render(text, True, color), (0, 0))
+        return run
+
+    def render_atlas(atlas: GlyphAtlas, texts: List[str]) -> Callable[[], None]:
+        def run() -> None:
+            for text in texts:
+                atlas.blit(screen, text, (0, 0))
+        return run
+
+    for title, target_font, atlas, texts in (
+        ("题干整行绘制（每试次一次）：", font, line_atlas, lines),
+        ("计时读数（每帧变化）：", body, body_atlas, timers),
+        ("评分读数（拖动滑块时每帧变化）：", body, body_atlas, readouts),
+        ("按钮标签（状态变化时重绘）：", body, body_atlas, labels),
+    ):
+        print(title)
+        base = timed("font.render + blit", args.rounds, render_font(target_font, texts))
+        fast = timed("GlyphAtlas.blit", args.rounds, render_atlas(atlas, texts))
+        print(f"  加速比 {base / fast:.2f}x")
+
+    print("逐字折行测量（每行重复 3 次）：")
+    long_lines = [text * 3 for text in lines]
+    rounds = max(1, args.rounds // 4)
+    timed("font.render 测宽", rounds, lambda: [wrap_with_render(font, text, wrap_width, color) for text in long_lines])
+    base = timed(
+        "font.size/metrics 步进",
+        rounds,
+        lambda: [wrap_with_metrics(lambda char: font_glyph_metrics(font, char), text, wrap_width) for text in long_lines],
+    )
+    fast = timed(
+        "GlyphAtlas 步进",
+        rounds,
+        lambda: [wrap_with_metrics(line_atlas.glyph_metrics, text, wrap_width) for text in long_lines],
+    )
+    print(f"  图集相对 font.size/metrics 加速比 {base / fast:.2f}x")
+    print(f"图集字形数：题干 {line_atlas.glyph_count}（{line_atlas.page_count} 页），正文 {body_atlas.glyph_count}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,460 @@
+"""端到端会话基准：在无显示器模式下用模拟被试跑完代表性配置，记录历史并与基线比较。
+
+每个场景在独立的子进程中运行（导入开销计入启动时间），依次测量：
+
+- 启动：导入、Config 加载、StimuliManager 载入与容量校验、ExperimentApp 构造、首帧；
+- StimuliManager.begin_run 并取完全部试次与题目的耗时；
+- Config.resolve_question_settings 每 1000 次调用的耗时；
+- DataRecorder 每 1000 次 record() 与导出 2000 行 CSV 的耗时；
+- 模拟被试完成一场正式实验的总耗时与进入实验场景的耗时，以及此后实验场景中逐帧
+  耗时（P50/P95/P99/最大值）与各绘制节的 P95。
+
+场景：default（当前 config.json）、large_bank（2000 行题库、30 个试次）、
+many_overrides（2000 条题目控制覆盖）、hires（2880×1800）。每个场景重复 --repeat 次
+取各指标的中位数，连同极差追加到 benchmarks/history.jsonl。默认与历史中相同平台与
+Python 版本的最近一次运行比较：本次每次重复都比基线中位数慢超过 --threshold（相对），
+且增量超过 --min-delta 毫秒与两次运行极差的 NOISE_FACTOR 倍时，判定为退化并以非零
+状态退出；退化的运行不写入历史。
+
+用法：python -m benchmarks.run_suite [--repeat 3] [--scenarios default hires] [--baseline last]
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.utils.paths import resource_path
+
+
+SCENARIOS = ("default", "large_bank", "many_overrides", "hires")
+DEFAULT_HISTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "history.jsonl")
+LARGE_BANK_ROWS = 2000
+LARGE_BANK_TRIALS = 30
+OVERRIDE_COUNT = 2000
+HIRES_SIZE = (2880, 1800)
+BEGIN_RUN_SEEDS = 50
+RESOLVE_CALLS = 20_000
+RECORDER_ROWS = 2000
+BOT_RT = 1.0
+SEED = 0
+# 增量须超过两次运行各自极差的倍数才算退化
+NOISE_FACTOR = 2.0
+
+Metrics = Dict[str, float]
+
+
+# ---- 场景配置 ----
+
+
+def _load_raw(config_path: str) -> Dict[str, Any]:
+    with open(config_path, "r", encoding="utf-8") as handle:
+        raw = json.load(handle)
+    # 场景配置写在临时目录，字体与画像目录改为基于原配置的绝对路径
+    base = os.path.dirname(os.path.abspath(config_path))
+    fonts = raw.setdefault("fonts", {})
+    if fonts.get("path") and not os.path.isabs(fonts["path"]):
+        fonts["path"] = os.path.join(base, fonts["path"])
+    if raw.get("pictures_dir") and not os.path.isabs(raw["pictures_dir"]):
+        raw["pictures_dir"] = os.path.join(base, raw["pictures_dir"])
+    return raw
+
+
+def _large_bank(stimuli_path: str, target: str, rows: int) -> None:
+    with open(stimuli_path, "r", encoding="utf-8-sig", newline="") as handle:
+        reader = csv.reader(handle)
+        header = next(reader)
+        base_rows = [row for row in reader if any(cell.strip() for cell in row)]
+    with open(target, "w", encoding="utf-8-sig", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(header)
+        for index in range(rows):
+            source = base_rows[index % len(base_rows)]
+            writer.writerow([f"{cell}（{index + 1}）" if cell.strip() else "" for cell in source])
+
+
+def _many_overrides(raw: Dict[str, Any], count: int) -> None:
+    controls = raw.setdefault("question_controls", {})
+    original = list(controls.get("overrides") or [])
+    symbols = list((raw.get("latin_square") or {}).get("symbols", {})) or ["moral", "immoral"]
+    rules = list((raw.get("latin_square") or {}).get("rules", [])) or [None]
+    overrides = []
+    for index in range(count):
+        match: Dict[str, Any] = {"mode": "formal", "symbol": symbols[index % len(symbols)]}
+        match["order"] = index % 6 + 1
+        rule = rules[index % len(rules)]
+        if rule is not None:
+            match["rule_code"] = rule
+        overrides.append({"match": match, "settings": {"caption_template": f"覆盖 {index + 1}：第 {{trial}} 次"}})
+    # 原有覆盖放在最后，保持实际生效的设置不变
+    controls["overrides"] = overrides + original
+
+
+def prepare_scenarios(
+    workdir: str, names: Sequence[str], config_path: Optional[str] = None
+) -> Dict[str, Tuple[str, str]]:
+    """写出各场景的配置与题库，返回 {场景: (配置路径, 题库路径)}"""
+    config_path = config_path or resource_path("config.json")
+    stimuli_path = resource_path("stimuli.csv")
+    prepared: Dict[str, Tuple[str, str]] = {}
+    for name in names:
+        raw = _load_raw(config_path)
+        scenario_stimuli = stimuli_path
+        if name == "large_bank":
+            scenario_stimuli = os.path.join(workdir, f"{name}_stimuli.csv")
+            _large_bank(stimuli_path, scenario_stimuli, LARGE_BANK_ROWS)
+            raw["experiment"]["formal_trials"] = LARGE_BANK_TRIALS
+        elif name == "many_overrides":
+            _many_overrides(raw, OVERRIDE_COUNT)
+        elif name == "hires":
+            raw["window"]["width"], raw["window"]["height"] = HIRES_SIZE
+        elif name != "default":
+            raise ValueError(f"未知的基准场景：{name}")
+        path = os.path.join(workdir, f"{name}.json")
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(raw, handle, ensure_ascii=False, indent=2)
+        prepared[name] = (path, scenario_stimuli)
+    return prepared
+
+
+# ---- 子进程中的测量 ----
+
+
+def _elapsed_ms(func: Callable[[], Any]) -> Tuple[float, Any]:
+    start = time.perf_counter()
+    result = func()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def _drain_run(manager: Any, mode: str, trials: int, seed: int) -> List[Tuple[int, str, Optional[str]]]:
+    """按正式流程 begin_run 并取完全部题目，返回 (题序, 符号, 规则) 列表"""
+    manager.begin_run(mode, trials, seed)
+    questions = []
+    for _ in range(trials):
+        plan = manager.start_trial()
+        order = 0
+        while True:
+            spec = manager.next_question()
+            if spec is None:
+                break
+            order += 1
+            questions.append((order, spec.symbol, plan.rule_code))
+    return questions
+
+
+def _measure_recorder(export_dir: str) -> Metrics:
+    from src.recorder import DataRecorder
+
+    recorder = DataRecorder(os.path.join(export_dir, "bench_recorder.csv"))
+    recorder.set_participant_info({"name": "基准", "age": "20", "gender": "女", "class": "1班"})
+    controls = {"show_slider": True, "caption_template": "第 {trial} 次"}
+    start = time.perf_counter()
+    for index in range(RECORDER_ROWS):
+        recorder.record(
+            "formal",
+            index // 4 + 1,
+            index % 4 + 1,
+            "P",
+            "P",
+            f"题目 {index}",
+            float(index % 7),
+            index * 2.0,
+            index * 2.0 + 1.5,
+            1.5,
+            6.0,
+            "PNAP",
+            controls,
+        )
+    record_ms = (time.perf_counter() - start) * 1000
+    export_ms, _ = _elapsed_ms(recorder.export)
+    recorder.close(wait=True)
+    return {
+        "recorder.record_1k_ms": record_ms * 1000 / RECORDER_ROWS,
+        "recorder.export_ms": export_ms,
+    }
+
+
+def _frame_metrics(rows: Sequence[Dict[str, object]]) -> Metrics:
+    from src.frame_stats import describe
+
+    scene_rows = [row for row in rows if row["scene"] == "ExperimentScene"]
+    # 会话的第一帧包含点击开始后构造实验场景的全部耗时，单独记录，不计入帧分布
+    metrics: Metrics = {}
+    if scene_rows:
+        metrics["session.experiment_start_ms"] = float(scene_rows[0]["total"]) * 1000  # type: ignore[arg-type]
+        scene_rows = scene_rows[1:]
+    frames = describe(float(row["total"]) * 1000 for row in scene_rows)  # type: ignore[arg-type]
+    metrics.update({f"frame.{key}_ms": frames[key] for key in ("p50", "p95", "p99", "max")})
+    sections = sorted({key for row in scene_rows for key in row if key.startswith("section:")})
+    for key in sections:
+        values = [float(row[key]) * 1000 for row in scene_rows if row[key]]  # type: ignore[arg-type]
+        if values:
+            metrics[f"scene.{key[len('section:'):]}_p95_ms"] = describe(values)["p95"]
+    return metrics
+
+
+def run_scenario(config_path: str, stimuli_path: str) -> Tuple[Metrics, Dict[str, Any]]:
+    """在子进程中完整运行一个场景，返回 (指标, 附加信息)"""
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    metrics: Metrics = {}
+    startup = time.perf_counter()
+
+    def load_modules() -> None:
+        import src.app  # noqa: F401
+
+    metrics["startup.import_ms"], _ = _elapsed_ms(load_modules)
+
+    from src.app import ExperimentApp
+    from src.bot import ParticipantBot, rt_sampler
+    from src.config_loader import load_config
+    from src.stimuli_manager import StimuliManager
+    from src.utils.clock import VirtualClock
+
+    metrics["startup.config_ms"], config = _elapsed_ms(lambda: load_config(config_path))
+
+    def load_stimuli() -> StimuliManager:
+        manager = StimuliManager(stimuli_path, config)
+        config.ensure_stimuli_capacity(manager)
+        return manager
+
+    metrics["startup.stimuli_ms"], manager = _elapsed_ms(load_stimuli)
+    export_dir = tempfile.mkdtemp(prefix="psych_bench_")
+    config.set_export_directory(export_dir)
+    metrics["startup.app_ms"], app = _elapsed_ms(
+        lambda: ExperimentApp(config, manager, headless=True, clock=VirtualClock(), seed=SEED)
+    )
+
+    def first_frame() -> None:
+        app.start()
+        app.step(0.0)
+
+    metrics["startup.first_frame_ms"], _ = _elapsed_ms(first_frame)
+    metrics["startup.total_ms"] = (time.perf_counter() - startup) * 1000
+
+    # 用独立的题库实例测量排布，不影响随后的会话
+    planner = StimuliManager(stimuli_path, config)
+    trials = int(config.experiment.get("formal_trials", 0))
+    begin_ms, questions = _elapsed_ms(
+        lambda: [_drain_run(planner, "formal", trials, seed) for seed in range(BEGIN_RUN_SEEDS)]
+    )
+    metrics["stimuli.begin_run_ms"] = begin_ms / BEGIN_RUN_SEEDS
+    calls = [entry for run in questions for entry in run]
+    start = time.perf_counter()
+    for index in range(RESOLVE_CALLS):
+        order, symbol, rule_code = calls[index % len(calls)]
+        config.resolve_question_settings(mode="formal", order=order, symbol=symbol, rule_code=rule_code)
+    metrics["config.resolve_1k_ms"] = (time.perf_counter() - start) * 1000 * 1000 / RESOLVE_CALLS
+
+    metrics.update(_measure_recorder(export_dir))
+
+    bot = ParticipantBot(1, "formal", rt=rt_sampler("fixed", (BOT_RT,)), seed=SEED)
+    session_ms, _ = _elapsed_ms(lambda: app.run(max_frames=1_000_000, on_frame=bot))
+    metrics["session.total_ms"] = session_ms
+    rows = app.frame_stats.rows()
+    app.shutdown()
+    shutil.rmtree(export_dir, ignore_errors=True)
+    metrics.update(_frame_metrics(rows))
+    info = {
+        "frames": len(rows),
+        "questions": sum(check.expected for check in bot.checks),
+        "session_ok": bool(bot.checks) and all(check.ok for check in bot.checks),
+    }
+    return metrics, info
+
+
+# ---- 历史与基线 ----
+
+
+def _git_commit() -> str:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+    return result.stdout.strip()
+
+
+def read_history(path: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+    entries = []
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                entries.append(json.loads(line))
+    return entries
+
+
+def append_history(path: str, entry: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as handle:
+        handle.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def _environment() -> Dict[str, str]:
+    return {"python": platform.python_version(), "platform": platform.platform()}
+
+
+def find_baseline(history: Sequence[Dict[str, Any]], ref: str) -> Optional[Dict[str, Any]]:
+    """ref 为 last（最近一次）或提交号前缀（该提交最近一次运行）；只在相同平台与 Python 版本的记录中查找"""
+    environment = _environment()
+    for entry in reversed(history):
+        if any(entry.get(key) != value for key, value in environment.items()):
+            continue
+        if ref == "last" or entry.get("commit", "").startswith(ref):
+            return entry
+    return None
+
+
+def summarize_runs(runs: Sequence[Metrics]) -> Tuple[Metrics, Metrics, Metrics]:
+    """各指标在多次运行中的 (中位数, 最小值, 极差)"""
+    keys = [key for key in runs[0] if all(key in run for run in runs)]
+    medians = {key: statistics.median(run[key] for run in runs) for key in keys}
+    fastest = {key: min(run[key] for run in runs) for key in keys}
+    spread = {key: max(run[key] for run in runs) - fastest[key] for key in keys}
+    return medians, fastest, spread
+
+
+def compare(
+    fastest: Dict[str, Metrics],
+    spread: Dict[str, Metrics],
+    baseline: Dict[str, Any],
+    threshold: float,
+    min_delta: float,
+) -> List[str]:
+    """返回超出阈值的退化；所有指标都是越小越好的毫秒数
+
+    用本次最快的一次运行与基线中位数比较，即每次重复都变慢才算退化；增量还须超过
+    --min-delta 与两次运行各自极差的 NOISE_FACTOR 倍，按每个指标自身的波动放宽。
+    """
+    regressions = []
+    for scenario, metrics in fastest.items():
+        previous = baseline["results"].get(scenario, {})
+        previous_spread = baseline.get("spread", {}).get(scenario, {})
+        for name, value in metrics.items():
+            base = previous.get(name)
+            if base is None:
+                continue
+            noise = NOISE_FACTOR * max(previous_spread.get(name, 0.0), spread[scenario].get(name, 0.0))
+            delta = value - base
+            if delta > max(min_delta, noise) and delta > base * threshold:
+                change = f"+{delta / base:.0%}" if base > 0 else "新增耗时"
+                regressions.append(f"{scenario} {name}：{base:.3f} → {value:.3f} ms（{change}，波动 ±{noise:.3f}）")
+    return regressions
+
+
+def format_results(results: Dict[str, Metrics], baseline: Optional[Dict[str, Metrics]]) -> List[str]:
+    lines = []
+    for scenario, metrics in results.items():
+        lines.append(f"{scenario}:")
+        previous = (baseline or {}).get(scenario, {})
+        for name, value in metrics.items():
+            line = f"  {name:<36}{value:12.3f}"
+            base = previous.get(name)
+            if base:
+                line += f"  ({(value - base) / base:+.1%})"
+            lines.append(line)
+    return lines
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="端到端会话基准：测量代表性配置并与历史基线比较")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--config", help="作为各场景基础的配置文件，默认 config.json")
+    parser.add_argument("--repeat", type=int, default=3, help="每个场景运行次数，取各指标中位数")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="历史记录文件（JSON Lines）")
+    parser.add_argument("--baseline", default="last", help="比较基线：last 或历史中的提交号前缀")
+    parser.add_argument("--threshold", type=float, default=0.25, help="判定退化的相对增幅")
+    parser.add_argument("--min-delta", type=float, default=0.5, help="判定退化的最小绝对增量（毫秒）")
+    parser.add_argument("--no-record", action="store_true", help="只比较，不写入历史")
+    args = parser.parse_args(argv)
+    if args.repeat <= 0 or args.threshold < 0 or args.min_delta < 0:
+        print("错误：--repeat 须为正整数，--threshold 与 --min-delta 不能为负", file=sys.stderr)
+        return 1
+
+    history = read_history(args.history)
+    baseline_entry = find_baseline(history, args.baseline)
+    if baseline_entry is None and args.baseline != "last":
+        print(f"错误：历史中没有提交 {args.baseline} 的记录", file=sys.stderr)
+        return 1
+
+    samples: Dict[str, List[Metrics]] = {name: [] for name in args.scenarios}
+    infos: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory(prefix="psych_suite_") as workdir:
+        prepared = prepare_scenarios(workdir, args.scenarios, args.config)
+        for repeat in range(args.repeat):
+            for name, (config_path, stimuli_path) in prepared.items():
+                # 每次使用全新的子进程，导入与字体加载计入启动时间
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                    metrics, info = pool.submit(run_scenario, config_path, stimuli_path).result()
+                samples[name].append(metrics)
+                infos[name] = info
+                status = "通过" if info["session_ok"] else "未通过"
+                print(f"  [{repeat + 1}/{args.repeat}] {name}：会话核对{status}，{info['questions']} 道题，{info['frames']} 帧")
+
+    summaries = {name: summarize_runs(runs) for name, runs in samples.items()}
+    results = {name: summary[0] for name, summary in summaries.items()}
+    fastest = {name: summary[1] for name, summary in summaries.items()}
+    spread = {name: summary[2] for name, summary in summaries.items()}
+    baseline = baseline_entry["results"] if baseline_entry else None
+    for line in format_results(results, baseline):
+        print(line)
+
+    failed_sessions = [name for name, info in infos.items() if not info["session_ok"]]
+    for name in failed_sessions:
+        print(f"错误：场景 {name} 的模拟会话与导出不一致")
+
+    regressions: List[str] = []
+    if baseline_entry is None:
+        print("提示：历史中没有相同平台与 Python 版本的基线，本次结果将作为之后运行的基线")
+    else:
+        if args.repeat < 2:
+            print("提示：--repeat 小于 2 时无法估计波动，结果只按 --threshold 与 --min-delta 判定")
+        regressions = compare(fastest, spread, baseline_entry, args.threshold, args.min_delta)
+        label = baseline_entry.get("commit") or baseline_entry.get("timestamp", "")
+        if regressions:
+            print(f"错误：相对基线 {label} 有 {len(regressions)} 项指标退化超过 {args.threshold:.0%}：")
+            for line in regressions:
+                print(f"  {line}")
+        else:
+            print(f"与基线 {label} 相比没有超过 {args.threshold:.0%} 的退化")
+
+    # 退化或会话失败的运行不写入历史，避免成为之后的基线
+    if regressions or failed_sessions:
+        if not args.no_record:
+            print("提示：本次结果未写入历史")
+        return 1
+    if not args.no_record:
+        append_history(
+            args.history,
+            {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "commit": _git_commit(),
+                **_environment(),
+                "repeat": args.repeat,
+                "results": results,
+                "spread": spread,
+                "info": infos,
+            },
+        )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
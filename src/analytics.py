@@ -0,0 +1,343 @@
+"""试次内评分变化（改变主意）的向量化分析，需要 numpy。
+
+把合并数据集（src.merge_results 的输出）、单个列式文件或结果 CSV 读成数组后，所有指标
+都由排序、bincount 与花式索引完成，不逐行循环：
+
+- 评分变化：每个试次中后续题目相对第 1 题的评分差（delta）与绝对变化（abs_shift）
+- 被试 / 规则 / 规则 × 题目序号的汇总（样本数、均值、标准差）
+- 按题目序号分组的反应时分布（elapsed_since_display 的分位数）
+- 占位题（符号 ~ 或类别 none）与证据题的绝对变化对比
+
+--max-missed-frames 可先剔除呈现期间掉帧过多的题目（见 src.frame_watchdog），
+没有计时质量记录的旧数据不受影响。
+
+用法：python -m src.analytics data/merged [--output analysis] [--max-missed-frames 0]
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.columnar import FLOAT_COLUMNS, INT_COLUMNS, read_columnar_arrays, read_csv_columns
+
+
+PLACEHOLDER_SYMBOL = "~"
+PLACEHOLDER_CATEGORY = "none"
+RT_PERCENTILES = (10, 25, 50, 75, 90)
+
+Table = Dict[str, Any]
+
+
+def require_numpy() -> Any:
+    try:
+        import numpy as np
+    except ImportError as exc:  # pragma: no cover - 取决于运行环境
+        raise RuntimeError("分析模块需要安装 numpy") from exc
+    return np
+
+
+@dataclass
+class TrialFrame:
+    """按列存放的作答数据：字符串列为编码数组，categories 为对应取值表"""
+
+    arrays: Dict[str, Any]
+    categories: Dict[str, Any]
+
+    def __len__(self) -> int:
+        return len(self.arrays["trial_index"])
+
+    def labels(self, name: str, codes: Any) -> List[str]:
+        return self.categories[name][codes].tolist()
+
+    def codes_of(self, name: str, value: str) -> Any:
+        """取值 value 在列 name 中的编码（可能为空数组）"""
+        np = require_numpy()
+        return np.flatnonzero(self.categories[name] == value)
+
+
+def _unify_categories(parts: Sequence[Tuple[Dict[str, Any], Dict[str, Any]]]) -> TrialFrame:
+    """拼接多个分片；字符串列的取值表合并后重新映射编码"""
+    np = require_numpy()
+    names = list(dict.fromkeys(name for part in parts for name in part[0]))
+    arrays: Dict[str, Any] = {}
+    categories: Dict[str, Any] = {}
+    for name in names:
+        if name in INT_COLUMNS or name in FLOAT_COLUMNS:
+            # 旧版分片没有计时质量列，按缺失值补齐
+            arrays[name] = np.concatenate(
+                [part[0][name] if name in part[0] else np.full(len(part[0]["trial_index"]), np.nan) for part in parts]
+            )
+            continue
+        merged = np.unique(np.concatenate([part[1][name] for part in parts]))
+        remapped = [np.searchsorted(merged, part[1][name]).astype(np.int32)[part[0][name]] for part in parts]
+        arrays[name] = np.concatenate(remapped)
+        categories[name] = merged
+    return TrialFrame(arrays, categories)
+
+
+def frame_from_columns(columns: Dict[str, List[Any]]) -> TrialFrame:
+    """由 read_columnar / read_csv_columns 返回的列构造数组"""
+    np = require_numpy()
+    arrays: Dict[str, Any] = {}
+    categories: Dict[str, Any] = {}
+    for name, values in columns.items():
+        if name in INT_COLUMNS:
+            arrays[name] = np.asarray(values, dtype=np.int64)
+        elif name in FLOAT_COLUMNS:
+            arrays[name] = np.asarray([np.nan if value is None else value for value in values], dtype=np.float64)
+        else:
+            table, codes = np.unique(np.asarray(values, dtype=np.str_), return_inverse=True)
+            arrays[name] = codes.astype(np.int32)
+            categories[name] = table
+    return TrialFrame(arrays, categories)
+
+
+def load_frame(path: str) -> TrialFrame:
+    """读取合并数据集目录、单个 .npz / .parquet 文件或结果 CSV"""
+    if os.path.isdir(path):
+        from src.merge_results import load_manifest
+
+        manifest = load_manifest(path)
+        parts = [read_columnar_arrays(os.path.join(path, name)) for name in sorted(manifest["parts"])]
+        if not parts:
+            raise ValueError(f"数据集为空：{path}")
+        return _unify_categories(parts)
+    if path.endswith((".npz", ".parquet")):
+        return _unify_categories([read_columnar_arrays(path)])
+    return frame_from_columns(read_csv_columns(path))
+
+
+def drop_compromised(frame: TrialFrame, max_missed_frames: int) -> TrialFrame:
+    """剔除掉帧数超过 max_missed_frames 的题目；没有计时质量记录的行保留"""
+    missed = frame.arrays.get("missed_frames")
+    if missed is None:
+        return frame
+    keep = ~(missed > max_missed_frames)
+    return TrialFrame({name: values[keep] for name, values in frame.arrays.items()}, frame.categories)
+
+
+def _composite(*keys: Any) -> Any:
+    """把多列非负整数编码组合为一个分组编号（0..n-1）"""
+    np = require_numpy()
+    combined = np.zeros(len(keys[0]), dtype=np.int64)
+    if not len(combined):
+        return combined
+    span = 1
+    for key in keys:
+        key = np.asarray(key, dtype=np.int64)
+        key = key - key.min()
+        radix = int(key.max()) + 1
+        if span * radix >= 1 << 62:
+            # 组合后可能溢出时先压缩为连续编号
+            combined = np.unique(combined, return_inverse=True)[1].reshape(-1)
+            span = int(combined.max()) + 1
+        combined = combined * radix + key
+        span *= radix
+    if span <= max(4 * len(combined), 1 << 20):
+        # 取值范围不大时用查找表压缩编号，O(n) 而非排序
+        present = np.zeros(span, dtype=bool)
+        present[combined] = True
+        return (np.cumsum(present) - 1)[combined]
+    return np.unique(combined, return_inverse=True)[1].reshape(-1)
+
+
+def _group_stats(groups: Any, count: int, values: Any, mask: Any) -> Dict[str, Any]:
+    """按组计算样本数、均值与标准差（mask 为参与统计的行）"""
+    np = require_numpy()
+    g = groups[mask]
+    v = values[mask]
+    n = np.bincount(g, minlength=count).astype(np.float64)
+    total = np.bincount(g, weights=v, minlength=count)
+    squares = np.bincount(g, weights=v * v, minlength=count)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / n
+        variance = (squares - n * mean * mean) / (n - 1)
+    return {"n": n.astype(np.int64), "mean": mean, "sd": np.sqrt(np.maximum(variance, 0.0))}
+
+
+def _participant_groups(frame: TrialFrame) -> Any:
+    a = frame.arrays
+    return _composite(a["participant_name"], a["participant_class"], a["participant_age"], a["participant_gender"])
+
+
+def _trial_groups(frame: TrialFrame) -> Any:
+    a = frame.arrays
+    if "source_file" in a:
+        return _composite(a["source_file"], a["mode"], a["trial_index"])
+    return _composite(a["participant_name"], a["participant_class"], a["participant_age"], a["participant_gender"], a["mode"], a["trial_index"])
+
+
+def compute_shifts(frame: TrialFrame) -> Dict[str, Any]:
+    """逐行计算相对本试次第 1 题的评分变化；第 1 题与缺失评分的行 valid 为 False"""
+    np = require_numpy()
+    a = frame.arrays
+    rating = a["rating_value"]
+    trials = _trial_groups(frame)
+    first = np.full(int(trials.max()) + 1 if len(trials) else 0, np.nan)
+    is_first = a["question_order"] == 1
+    first[trials[is_first]] = rating[is_first]
+    baseline = first[trials]
+    delta = rating - baseline
+    valid = ~is_first & np.isfinite(delta)
+    placeholder = np.isin(a["symbol"], frame.codes_of("symbol", PLACEHOLDER_SYMBOL)) | np.isin(
+        a["category"], frame.codes_of("category", PLACEHOLDER_CATEGORY)
+    )
+    return {"participant": _participant_groups(frame), "trial": trials, "delta": delta, "abs_shift": np.abs(delta), "valid": valid, "placeholder": placeholder}
+
+
+def _summary_table(keys: Dict[str, Any], groups: Any, count: int, shifts: Dict[str, Any]) -> Table:
+    valid = shifts["valid"]
+    delta = _group_stats(groups, count, shifts["delta"], valid)
+    shift = _group_stats(groups, count, shifts["abs_shift"], valid)
+    table = dict(keys)
+    table.update(
+        {
+            "n": delta["n"],
+            "mean_delta": delta["mean"],
+            "sd_delta": delta["sd"],
+            "mean_abs_shift": shift["mean"],
+            "sd_abs_shift": shift["sd"],
+        }
+    )
+    return table
+
+
+def _first_of_group(groups: Any) -> Any:
+    """每组第一次出现的行号，用于取回分组键"""
+    np = require_numpy()
+    _, first = np.unique(groups, return_index=True)
+    return first
+
+
+def participant_metrics(frame: TrialFrame, shifts: Dict[str, Any]) -> Table:
+    groups = shifts["participant"]
+    count = int(groups.max()) + 1 if len(groups) else 0
+    rows = _first_of_group(groups)
+    keys = {name: frame.labels(name, frame.arrays[name][rows]) for name in ("participant_name", "participant_class")}
+    return _summary_table(keys, groups, count, shifts)
+
+
+def rule_metrics(frame: TrialFrame, shifts: Dict[str, Any]) -> Table:
+    """按规则编码汇总，并给出占位题与证据题的绝对变化对比"""
+    np = require_numpy()
+    groups = frame.arrays["rule_code"]
+    count = len(frame.categories["rule_code"])
+    table = _summary_table({"rule_code": frame.categories["rule_code"].tolist()}, groups, count, shifts)
+    placeholder = shifts["placeholder"]
+    for label, mask in (("placeholder", placeholder), ("evidence", ~placeholder)):
+        stats = _group_stats(groups, count, shifts["abs_shift"], shifts["valid"] & mask)
+        table[f"n_{label}"] = stats["n"]
+        table[f"mean_abs_shift_{label}"] = stats["mean"]
+    table["placeholder_minus_evidence"] = table["mean_abs_shift_placeholder"] - table["mean_abs_shift_evidence"]
+    present = np.bincount(groups, minlength=count) > 0
+    return {name: np.asarray(values)[present] for name, values in table.items()}
+
+
+def rule_order_metrics(frame: TrialFrame, shifts: Dict[str, Any]) -> Table:
+    np = require_numpy()
+    a = frame.arrays
+    groups = _composite(a["rule_code"], a["question_order"])
+    count = int(groups.max()) + 1 if len(groups) else 0
+    rows = _first_of_group(groups)
+    keys = {
+        "rule_code": frame.labels("rule_code", a["rule_code"][rows]),
+        "question_order": a["question_order"][rows],
+    }
+    table = _summary_table(keys, groups, count, shifts)
+    keep = table["n"] > 0
+    return {name: np.asarray(values)[keep] for name, values in table.items()}
+
+
+def rt_distribution(frame: TrialFrame, column: str = "elapsed_since_display") -> Table:
+    """按题目序号计算反应时分位数：排序后按组内位置插值，无需逐组调用 percentile"""
+    np = require_numpy()
+    a = frame.arrays
+    rt = a[column]
+    finite = np.isfinite(rt)
+    order = a["question_order"][finite]
+    values = rt[finite]
+    # 先按反应时排序，再按题目序号稳定排序（小整数走基数排序），比 lexsort 快得多
+    sort = np.argsort(values)
+    sort = sort[np.argsort(order[sort].astype(np.int16 if order.max(initial=0) < 1 << 15 else np.int64), kind="stable")]
+    order = order[sort]
+    values = values[sort]
+    keys, starts, counts = np.unique(order, return_index=True, return_counts=True)
+    table: Table = {"question_order": keys, "n": counts}
+    table["mean"] = np.add.reduceat(values, starts) / counts if len(keys) else np.zeros(0)
+    for percentile in RT_PERCENTILES:
+        position = starts + (counts - 1) * (percentile / 100.0)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, starts + counts - 1)
+        weight = position - lower
+        table[f"p{percentile}"] = values[lower] * (1 - weight) + values[upper] * weight
+    return table
+
+
+def analyze(frame: TrialFrame) -> Dict[str, Table]:
+    shifts = compute_shifts(frame)
+    return {
+        "participants": participant_metrics(frame, shifts),
+        "rules": rule_metrics(frame, shifts),
+        "rule_by_order": rule_order_metrics(frame, shifts),
+        "rt_by_order": rt_distribution(frame),
+    }
+
+
+def write_table(table: Table, path: str) -> None:
+    names = list(table)
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(names)
+        writer.writerows(zip(*(list(table[name]) for name in names)))
+
+
+def _print_table(title: str, table: Table, limit: int = 20) -> None:
+    names = list(table)
+    print(f"\n{title}")
+    print("  " + "\t".join(names))
+    for row in list(zip(*(list(table[name]) for name in names)))[:limit]:
+        print("  " + "\t".join(f"{value:.3f}" if isinstance(value, float) else str(value) for value in row))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="计算试次内评分变化、反应时分布与占位题对比")
+    parser.add_argument("source", help="合并数据集目录、.npz / .parquet 文件或结果 CSV")
+    parser.add_argument("--output", help="把各张结果表写为 CSV 的目录")
+    parser.add_argument("--max-missed-frames", type=int, help="剔除呈现期间掉帧数超过该值的题目")
+    args = parser.parse_args(argv)
+    try:
+        start = time.perf_counter()
+        frame = load_frame(args.source)
+        if args.max_missed_frames is not None:
+            total = len(frame)
+            frame = drop_compromised(frame, args.max_missed_frames)
+            print(f"已剔除掉帧超过 {args.max_missed_frames} 的题目 {total - len(frame)} 道")
+        loaded = time.perf_counter()
+        results = analyze(frame)
+        done = time.perf_counter()
+    except (OSError, ValueError, RuntimeError, KeyError) as exc:
+        print(f"错误：分析失败。详情：{exc}", file=sys.stderr)
+        return 1
+    print(f"共 {len(frame)} 行：读取 {loaded - start:.2f} s，计算 {done - loaded:.2f} s")
+    titles = {
+        "participants": "被试汇总",
+        "rules": "规则汇总（含占位题 / 证据题对比）",
+        "rule_by_order": "规则 × 题目序号",
+        "rt_by_order": "按题目序号的反应时分布（秒）",
+    }
+    for name, table in results.items():
+        _print_table(titles[name], table)
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+        for name, table in results.items():
+            write_table(table, os.path.join(args.output, f"{name}.csv"))
+        print(f"\n结果表已写入 {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,476 @@
+"""实验程序的场景切换与主循环。
+
+ExperimentApp 负责打开窗口、在被试信息 → 主菜单 → 实验之间切换场景，并逐帧分发事件、
+更新与绘制。headless=True 时使用 SDL 的 dummy 视频驱动在离屏表面上完整运行同一流程，
+无需显示器，便于在构建服务器上跑基准、模拟与回归。
+"""
+
+import os
+import platform
+import random
+import re
+import subprocess
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pygame
+
+from src.config_loader import Config
+from src.fonts import create_fonts
+from src.frame_stats import HUD_TOGGLE_KEY, FrameStats, FrameStatsHud, frame_stats_path_for
+from src.frame_watchdog import FrameWatchdog
+from src.hitch_profiler import HitchProfiler, hitches_path_for
+from src.input_log import InputLog, input_log_path_for
+from src.recorder import DataRecorder
+from src.scenes.experiment import ExperimentScene
+from src.scenes.main_menu import MainMenuScene
+from src.scenes.participant_form import ParticipantFormScene
+from src.scenes.resume_prompt import ResumePromptScene
+from src.session_resume import ResumeState, discard_session, find_resumable_sessions
+from src.stimuli_manager import StimuliManager
+from src.utils.clock import Clock, MonotonicClock
+from src.utils.paths import resource_path
+
+
+FRAME_RATE = 60
+
+# 窗口尺寸变化事件；SCALED 模式下逻辑尺寸不变，场景会取到相同的缓存布局
+RESIZE_EVENTS = {pygame.VIDEORESIZE, getattr(pygame, "WINDOWSIZECHANGED", pygame.VIDEORESIZE)}
+
+
+def sanitize_for_filename(text: str) -> str:
+    cleaned = re.sub(r"[^0-9A-Za-z\u4e00-\u9fff]+", "_", text.strip()) if text else ""
+    cleaned = cleaned.strip("_")
+    return cleaned or "Participant"
+
+
+def configure_headless() -> None:
+    """切换到 SDL 的 dummy 视频与音频驱动，须在 pygame.init() 之前调用"""
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+
+class ExperimentApp:
+    def __init__(
+        self,
+        config: Config,
+        stimuli_manager: StimuliManager,
+        headless: bool = False,
+        skip_participant_form: bool = False,
+        participant_info: Optional[Dict[str, str]] = None,
+        frame_rate: int = FRAME_RATE,
+        clock: Optional[Clock] = None,
+        seed: Optional[int] = None,
+        screen_size: Optional[Tuple[int, int]] = None,
+    ) -> None:
+        self.config = config
+        # 无显示器模式下的窗口尺寸，默认为配置的基准尺寸；回放时使用原会话的实际尺寸
+        self.screen_size = screen_size
+        self.stimuli_manager = stimuli_manager
+        self.headless = headless
+        self.skip_participant_form = skip_participant_form
+        self.participant_info = participant_info
+        self.frame_rate = frame_rate
+        self.current_scene = None
+        self.state = "participant"
+        self.running = False
+        self.frames = 0
+        # 指定 seed 时第 n 个会话使用 seed + n，便于复现模拟运行
+        self.seed = seed
+        self.sessions_started = 0
+        self._on_frame: Optional[Callable[["ExperimentApp"], None]] = None
+        # 实验场景收到的输入逐帧写入输入日志，供 src.replay 回放
+        self._input_log: Optional[InputLog] = None
+        # 逐帧耗时：实验会话结束时导出到结果 CSV 旁，F3 切换 HUD
+        self.frame_stats = FrameStats()
+        self._frame_stats_path: Optional[str] = None
+        # 题目呈现与等待作答期间的掉帧和停顿随每条记录导出
+        self.frame_watchdog = FrameWatchdog(frame_rate)
+        # 实验会话中单帧耗时超过阈值时采集调用栈，会话结束时写出折叠栈
+        threshold_ms = config.experiment.get("hitch_threshold_ms")
+        self.hitch_profiler = HitchProfiler(
+            float(threshold_ms) / 1000 if threshold_ms else 1.0 / (frame_rate if frame_rate > 0 else FRAME_RATE)
+        )
+        self._hitches_path: Optional[str] = None
+        # 正在进行的恢复会话的日志路径，会话结束回到主菜单前据此提示其余未完成的会话
+        self._resumed_journal: Optional[str] = None
+
+        if headless:
+            configure_headless()
+        pygame.init()
+        if not headless and platform.system() == "Windows":
+            # Windows输入法支持：启动ctfmon.exe
+            try:
+                subprocess.Popen(["ctfmon.exe"], shell=True)
+                print("已启动Windows输入法服务 (ctfmon.exe)")
+            except Exception as e:
+                print(f"启动输入法服务时出现警告: {e}")
+        self.screen, self.scale = self._open_display()
+        # 场景计时与主循环共用同一时钟，模拟时注入 VirtualClock 即可快于真实时间运行
+        self.clock = clock or MonotonicClock()
+        self.fonts = create_fonts(config, self.scale, resource_path("stimuli.csv"))
+        self.recorder = DataRecorder(config.export_path("临时.csv"))
+        self.frame_hud = FrameStatsHud(self.frame_stats, self.scale)
+        self.frame_hud.visible = bool(config.display.get("show_frame_stats", False))
+
+    def _open_display(self) -> Tuple[pygame.Surface, float]:
+        config = self.config
+        base_width = config.window.get("width", 1920)
+        base_height = config.window.get("height", 1080)
+
+        if self.headless:
+            # dummy 驱动下的窗口就是一块离屏表面，按指定或配置的基准尺寸打开，忽略全屏设置
+            actual_width, actual_height = self.screen_size or (base_width, base_height)
+            screen = pygame.display.set_mode((actual_width, actual_height))
+        elif config.window.get("fullscreen"):
+            actual_width, actual_height, screen = self._open_fullscreen()
+        else:
+            actual_width = base_width
+            actual_height = base_height
+            flags = pygame.RESIZABLE if config.window.get("resizable", False) else 0
+            screen = pygame.display.set_mode((actual_width, actual_height), flags)
+
+        scale_x = actual_width / base_width if base_width else 1.0
+        scale_y = actual_height / base_height if base_height else 1.0
+        scale = min(scale_x, scale_y) if scale_x > 0 and scale_y > 0 else 1.0
+        config.scale = scale
+        config.screen_size = (actual_width, actual_height)
+        pygame.display.set_caption(config.window.get("title", "心理学实验"))
+        return screen, scale
+
+    def _open_fullscreen(self) -> Tuple[int, int, pygame.Surface]:
+        config = self.config
+        is_windows = platform.system() == "Windows"
+        is_mac = platform.system() == "Darwin"
+        windows_ime_fix = bool(config.window.get("windows_ime_fix", True))
+        mac_fullscreen_fix = bool(config.window.get("mac_fullscreen_fix", True))
+
+        display_info = pygame.display.Info()
+        actual_width = display_info.current_w
+        actual_height = display_info.current_h
+
+        # Windows: 尝试多种模式来支持输入法
+        if is_windows and windows_ime_fix:
+            # 优先尝试SCALED模式（伪全屏但支持系统UI）
+            try:
+                os.environ['SDL_VIDEODRIVER'] = 'windows'
+                flags = pygame.SCALED | pygame.RESIZABLE
+                screen = pygame.display.set_mode((actual_width, actual_height), flags)
+                print("Windows系统：使用SCALED伪全屏模式以支持输入法显示")
+                print("提示：按Alt+Tab可切换窗口，Esc键退出程序")
+            except Exception as e:
+                print(f"SCALED模式失败，回退到NOFRAME模式: {e}")
+                flags = pygame.NOFRAME
+                screen = pygame.display.set_mode((actual_width, actual_height), flags)
+                print("Windows系统：使用NOFRAME无边框模式")
+            print("如需禁用此兼容模式，请在config.json中设置\"windows_ime_fix\": false")
+        elif is_mac and mac_fullscreen_fix:
+            flags = pygame.NOFRAME
+            screen = pygame.display.set_mode((actual_width, actual_height), flags)
+            print("macOS系统检测到，已使用无边框全屏模式以获得更好的兼容性")
+            print("如需禁用此兼容模式，请在config.json中设置\"mac_fullscreen_fix\": false")
+        else:
+            flags = pygame.FULLSCREEN
+            screen = pygame.display.set_mode((actual_width, actual_height), flags)
+        return actual_width, actual_height, screen
+
+    # ---- 场景切换 ----
+
+    def start(self) -> None:
+        """进入第一个场景：有未完成会话时先提示恢复，否则录入被试信息"""
+        # 上次异常退出留下的未完成会话优先提示恢复
+        resumable = find_resumable_sessions(self.config.export_directory)
+        if resumable:
+            self._prompt_resume(resumable, on_skip=lambda: self.collect_participant(initial=True))
+        else:
+            self.collect_participant(initial=True)
+
+    def _prompt_resume(self, sessions: List[ResumeState], on_skip: Callable[[], None]) -> None:
+        self.state = "resume"
+        self.current_scene = ResumePromptScene(
+            screen=self.screen,
+            config=self.config,
+            fonts=self.fonts,
+            sessions=sessions,
+            on_resume=self.resume_session,
+            on_discard=self.discard_resume,
+            on_skip=on_skip,
+            scale=self.scale,
+        )
+
+    def handle_info_submit(self, info: Dict[str, str]) -> None:
+        self.participant_info = info
+        self.go_menu()
+
+    def collect_participant(self, initial: bool = False) -> None:
+        # 如果跳过被试信息录入且已有信息，直接进入主菜单
+        if self.skip_participant_form and self.participant_info:
+            self.go_menu()
+            return
+        self.state = "participant"
+        self.current_scene = ParticipantFormScene(
+            screen=self.screen,
+            config=self.config,
+            fonts=self.fonts,
+            mode=None,
+            on_submit=self.handle_info_submit,
+            on_cancel=(lambda: None) if initial else self.go_menu,
+            initial_values=self.participant_info,
+            scale=self.scale,
+            clock=self.clock,
+        )
+
+    def go_menu(self) -> None:
+        if self.participant_info is None:
+            self.collect_participant(initial=True)
+            return
+        self.state = "menu"
+        self._close_input_log()
+        self._export_frame_stats()
+        self._export_hitches()
+        self.stimuli_manager.reset_session()
+        self.recorder.close()
+        self.recorder = DataRecorder(self.config.export_path("临时.csv"))
+        self.recorder.set_participant_info(self.participant_info)
+        resumed, self._resumed_journal = self._resumed_journal, None
+        if resumed is not None:
+            # 恢复的会话结束后依次提示其余未完成的会话；刚结束的会话可能仍在后台导出，按路径排除
+            remaining = [
+                state
+                for state in find_resumable_sessions(self.config.export_directory)
+                if os.path.abspath(state.journal_path) != os.path.abspath(resumed)
+            ]
+            if remaining:
+                self._prompt_resume(remaining, on_skip=self.go_menu)
+                return
+        self.current_scene = MainMenuScene(
+            screen=self.screen,
+            config=self.config.raw,
+            fonts=self.fonts,
+            on_select_mode=self.start_experiment,
+            on_edit_info=lambda: self.collect_participant(initial=False),
+            participant_info=self.participant_info,
+            scale=self.scale,
+        )
+
+    def resume_session(self, resume: ResumeState) -> None:
+        self.participant_info = dict(resume.participant_info)
+        self._resumed_journal = resume.journal_path
+        self.start_experiment(resume.mode, resume=resume)
+
+    def discard_resume(self, resume: ResumeState) -> None:
+        try:
+            discard_session(resume)
+        except OSError as exc:
+            print(f"警告：无法归档作答日志 {resume.journal_path}。详情：{exc}")
+
+    def start_experiment(self, mode: str, resume: Optional[ResumeState] = None) -> None:
+        if self.participant_info is None:
+            self.collect_participant(initial=True)
+            return
+        if resume is not None:
+            seed = resume.seed
+            total_trials = resume.total_trials
+            export_path = resume.csv_path
+        else:
+            if self.seed is not None:
+                seed = self.seed + self.sessions_started
+            else:
+                seed = random.SystemRandom().randrange(1 << 62)
+            self.sessions_started += 1
+            total_trials, export_path = self.prepare_run(mode, seed)
+        self.recorder.close()
+        self.recorder = DataRecorder(
+            export_path,
+            export_formats=self.config.experiment.get("export_formats"),
+            database_path=self.config.results_database_path,
+        )
+        self.recorder.set_participant_info(self.participant_info)
+        self.state = "experiment"
+        try:
+            self.current_scene = ExperimentScene(
+                screen=self.screen,
+                config=self.config,
+                fonts=self.fonts,
+                stimuli=self.stimuli_manager,
+                recorder=self.recorder,
+                mode=mode,
+                participant_info=self.participant_info.copy(),
+                scale=self.scale,
+                on_finish=self.go_menu,
+                total_trials_override=total_trials,
+                seed=seed,
+                resume=resume,
+                clock=self.clock,
+                frame_stats=self.frame_stats,
+                frame_watchdog=self.frame_watchdog,
+            )
+        except ValueError as exc:
+            if resume is None:
+                raise
+            print(f"会话恢复失败：{exc}")
+            self._resumed_journal = None
+            self.collect_participant(initial=True)
+            return
+        self._open_input_log(export_path, seed, resumed=resume is not None)
+        self.frame_stats.clear()
+        self.frame_watchdog.reset()
+        self.frame_watchdog.install()
+        if self.config.experiment.get("export_frame_stats", True):
+            self._frame_stats_path = frame_stats_path_for(export_path)
+        if self.config.experiment.get("hitch_profiler", True):
+            self.hitch_profiler.arm()
+            self._hitches_path = hitches_path_for(export_path)
+
+    def _open_input_log(self, export_path: str, seed: Optional[int], resumed: bool) -> None:
+        self._close_input_log()
+        try:
+            self._input_log = InputLog(input_log_path_for(export_path), seed, resumed=resumed)
+        except OSError as exc:
+            print(f"警告：无法创建输入日志，本次会话将无法按原始输入回放。详情：{exc}")
+
+    def _close_input_log(self) -> None:
+        if self._input_log is not None:
+            self._input_log.close()
+            self._input_log = None
+
+    def _export_frame_stats(self) -> None:
+        path, self._frame_stats_path = self._frame_stats_path, None
+        if path is None or not len(self.frame_stats):
+            return
+        try:
+            self.frame_stats.export_csv(path)
+        except OSError as exc:
+            print(f"警告：无法导出逐帧耗时 {path}。详情：{exc}")
+
+    def _export_hitches(self) -> None:
+        self.hitch_profiler.disarm()
+        path, self._hitches_path = self._hitches_path, None
+        if path is None or not self.hitch_profiler.samples:
+            return
+        try:
+            self.hitch_profiler.export_folded(path)
+        except OSError as exc:
+            print(f"警告：无法导出超时帧采样 {path}。详情：{exc}")
+
+    def prepare_run(self, mode: str, seed: int) -> Tuple[int, str]:
+        config = self.config
+        safe_name = sanitize_for_filename(self.participant_info.get("name", ""))
+        total_trials = self.stimuli_manager.trial_count(mode)
+        self.stimuli_manager.begin_run(mode, total_trials, seed=seed)
+        if mode == "practice":
+            base_name = config.experiment["practice_output"]
+            directory, filename = os.path.split(base_name)
+            stem, ext = os.path.splitext(filename)
+            if not stem:
+                stem = "practice_results"
+            ext = ext or ".csv"
+            export_filename = f"{safe_name}_{stem}{ext}"
+            export_name = os.path.join(directory, export_filename) if directory else export_filename
+        else:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            prefix = config.experiment.get("formal_output_prefix", "formal_results")
+            directory, base_prefix = os.path.split(prefix)
+            if not base_prefix:
+                base_prefix = "formal_results"
+            export_filename = f"{safe_name}_{base_prefix}_{timestamp}.csv"
+            export_name = os.path.join(directory, export_filename) if directory else export_filename
+        return total_trials, config.export_path(export_name)
+
+    # ---- 主循环 ----
+
+    def handle_event(self, event: pygame.event.Event) -> None:
+        if event.type == pygame.QUIT:
+            self.running = False
+            return
+        if event.type == pygame.KEYDOWN and event.key == HUD_TOGGLE_KEY:
+            self.frame_hud.toggle()
+            return
+        if event.type in RESIZE_EVENTS:
+            self.frame_hud.discard()
+            self.screen = pygame.display.get_surface()
+            self.config.screen_size = self.screen.get_size()
+            if self.current_scene:
+                self.current_scene.resize(self.screen)
+            return
+        if self.current_scene:
+            self.current_scene.handle_event(event)
+
+    def next_deadline(self) -> Optional[float]:
+        """当前场景（以及 on_frame 回调）下一个计时节点，虚拟时钟据此跳过空等的帧"""
+        deadlines = []
+        for source in (self.current_scene, self._on_frame):
+            next_deadline = getattr(source, "next_deadline", None)
+            value = next_deadline() if next_deadline is not None else None
+            if value is not None:
+                deadlines.append(value)
+        return min(deadlines) if deadlines else None
+
+    def step(self, dt: float) -> None:
+        """处理一帧：分发事件、更新并绘制当前场景"""
+        stats = self.frame_stats
+        stats.begin_frame()
+        scene = self.current_scene
+        # 上一帧结束时的场景状态，即刚过去的这段帧间隔里屏幕上的内容
+        self.frame_watchdog.begin_frame(scene.state if isinstance(scene, ExperimentScene) else None)
+        self.hitch_profiler.frame_started(scene)
+        events = pygame.event.get()
+        if events and self._input_log is not None and isinstance(scene, ExperimentScene):
+            # 先记下分发前的场景状态，事件可能触发确认或退出
+            self._input_log.write(
+                self.clock.now() - scene.experiment_start,
+                scene.state,
+                scene.current_trial,
+                scene.current_question_order,
+                events,
+            )
+        for event in events:
+            self.handle_event(event)
+            if not self.running:
+                return
+        stats.mark("events")
+        self.frame_hud.restore(self.screen)
+        if self.current_scene:
+            self.current_scene.update(dt)
+            stats.mark("update")
+            self.current_scene.draw()
+            stats.mark("draw")
+        self.frame_hud.draw(self.screen)
+        stats.mark("hud")
+        pygame.display.flip()
+        stats.mark("flip")
+        self.hitch_profiler.frame_finished()
+        scene = self.current_scene
+        stats.end_frame(type(scene).__name__ if scene is not None else "", getattr(scene, "state", ""))
+        self.frames += 1
+
+    def run(
+        self,
+        max_frames: Optional[int] = None,
+        on_frame: Optional[Callable[["ExperimentApp"], None]] = None,
+    ) -> None:
+        """运行主循环，直到收到退出事件或达到 max_frames 帧
+
+        on_frame 在每帧开始前调用；它若提供 next_deadline()，虚拟时钟也会据此跳帧。
+        """
+        if self.current_scene is None:
+            self.start()
+        self._on_frame = on_frame
+        self.running = True
+        while self.running:
+            if max_frames is not None and self.frames >= max_frames:
+                break
+            dt = self.clock.tick(self.frame_rate, self.next_deadline())
+            if on_frame is not None:
+                on_frame(self)
+            self.step(dt)
+
+    def shutdown(self) -> None:
+        # 等待进行中的导出与日志写盘完成后再退出
+        self._close_input_log()
+        self._export_frame_stats()
+        self._export_hitches()
+        self.hitch_profiler.close()
+        self.frame_watchdog.close()
+        self.recorder.close(wait=True)
+        pygame.quit()
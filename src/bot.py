@@ -0,0 +1,349 @@
+"""模拟被试：向 pygame 事件队列投递真实的鼠标与键盘事件，完整走完实验流程。
+
+机器人依次填写被试信息表单（点击输入框、TEXTINPUT 输入、点选性别、点击保存）、
+在主菜单点击实验模式，在每道题按设定的反应时分布拖动评分条手柄到目标评分并点击
+「确认」，完成页按回车返回主菜单。每个会话结束后读取导出的 CSV，逐题核对评分与
+反应时是否与机器人的意图一致。配合 --headless 与虚拟时钟，整场实验在毫秒级完成。
+
+用法：python -m src.bot --sessions 20 --mode formal --export-dir /tmp/bot_data
+"""
+
+import argparse
+import csv
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import pygame
+
+from src.scenes.experiment import ExperimentScene
+from src.scenes.main_menu import MainMenuScene
+from src.scenes.participant_form import ParticipantFormScene
+from src.scenes.resume_prompt import ResumePromptScene
+
+
+RT_MODELS = ("fixed", "lognormal", "exgauss")
+MIN_RT = 0.2
+# 开始拖动评分条的时刻占反应时的比例，其余时间用于确认
+DRAG_FRACTION = 0.6
+
+EventBatch = List[pygame.event.Event]
+
+
+def click_events(pos: Tuple[int, int]) -> EventBatch:
+    """移到 pos 并单击左键"""
+    return [
+        pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0)),
+        pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1),
+        pygame.event.Event(pygame.MOUSEBUTTONUP, pos=pos, button=1),
+    ]
+
+
+def key_events(key: int) -> EventBatch:
+    return [
+        pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode="", scancode=0),
+        pygame.event.Event(pygame.KEYUP, key=key, mod=0, unicode="", scancode=0),
+    ]
+
+
+def drag_events(start: Tuple[int, int], end: Tuple[int, int], steps: int = 4) -> EventBatch:
+    """从 start 按住左键水平拖到 end（评分条手柄的拖动）"""
+    events = [pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=start, button=1)]
+    previous = start
+    for index in range(1, steps + 1):
+        x = start[0] + (end[0] - start[0]) * index // steps
+        pos = (x, start[1])
+        events.append(
+            pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(pos[0] - previous[0], 0), buttons=(1, 0, 0))
+        )
+        previous = pos
+    events.append(pygame.event.Event(pygame.MOUSEBUTTONUP, pos=end, button=1))
+    return events
+
+
+def rt_sampler(model: str, params: Sequence[float]) -> Callable[[random.Random], float]:
+    """反应时（秒）抽样函数：fixed:秒 / lognormal:中位数,sigma / exgauss:mu,sigma,tau"""
+    if model not in RT_MODELS:
+        raise ValueError(f"未知的反应时分布：{model}，可选 {'、'.join(RT_MODELS)}")
+    expected = {"fixed": 1, "lognormal": 2, "exgauss": 3}[model]
+    if len(params) != expected:
+        raise ValueError(f"反应时分布 {model} 需要 {expected} 个参数，实际为 {len(params)} 个")
+    if model == "fixed":
+        return lambda rng: max(MIN_RT, params[0])
+    if model == "lognormal":
+        median, sigma = params
+        return lambda rng: max(MIN_RT, rng.lognormvariate(math.log(median), sigma))
+    mu, sigma, tau = params
+    return lambda rng: max(MIN_RT, rng.gauss(mu, sigma) + rng.expovariate(1.0 / tau))
+
+
+def parse_rt_spec(spec: str) -> Callable[[random.Random], float]:
+    """解析形如 lognormal:1.8,0.4 的反应时分布"""
+    model, _, raw = spec.partition(":")
+    try:
+        params = [float(value) for value in raw.split(",") if value.strip()]
+    except ValueError as exc:
+        raise ValueError(f"反应时分布参数无效：{spec}") from exc
+    return rt_sampler(model.strip(), params)
+
+
+@dataclass
+class IntendedResponse:
+    trial_index: int
+    question_order: int
+    rating: Optional[float]
+    rt: float
+
+
+@dataclass
+class SessionCheck:
+    path: Optional[str]
+    expected: int
+    mismatches: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.path is not None and not self.mismatches
+
+
+class ParticipantBot:
+    """作为 ExperimentApp.run 的 on_frame 回调，每帧最多投递一批事件"""
+
+    def __init__(
+        self,
+        sessions: int = 1,
+        mode: str = "formal",
+        rt: Optional[Callable[[random.Random], float]] = None,
+        ratings: Optional[Sequence[float]] = None,
+        seed: Optional[int] = None,
+        rt_tolerance: float = 0.05,
+    ) -> None:
+        if mode not in ("practice", "formal"):
+            raise ValueError(f"未知的实验模式：{mode}")
+        self.sessions = sessions
+        self.mode = mode
+        self.rng = random.Random(seed)
+        self.rt = rt or rt_sampler("lognormal", (1.8, 0.4))
+        self.ratings = list(ratings) if ratings else None
+        self.rt_tolerance = rt_tolerance
+        self.checks: List[SessionCheck] = []
+        self._queue: List[EventBatch] = []
+        self._handled_scene: Optional[object] = None
+        self._intended: List[IntendedResponse] = []
+        self._planned_key: Optional[Tuple[int, int]] = None
+        self._drag_at: Optional[float] = None
+        self._confirm_at: Optional[float] = None
+        self._target_rating: Optional[float] = None
+        self._finished_session = False
+
+    # ---- 各场景 ----
+
+    def _participant_name(self) -> str:
+        return f"模拟被试{len(self.checks) + 1:03d}"
+
+    def _fill_form(self, scene: ParticipantFormScene) -> None:
+        values = {
+            "name": self._participant_name(),
+            "age": str(self.rng.randint(18, 30)),
+            "class": f"{self.rng.randint(1, 9)}班",
+        }
+        for entry in scene.fields:
+            key = entry["key"]
+            input_box = entry["input"]
+            self._queue.append(click_events(input_box.rect.center))
+            # 表单会带出上一个会话的信息，先逐字删除
+            for _ in range(len(input_box.value)):
+                self._queue.append(key_events(pygame.K_BACKSPACE))
+            self._queue.append([pygame.event.Event(pygame.TEXTINPUT, text=values[str(key)])])
+        for entry in scene.rows:
+            if entry["type"] == "gender":
+                options = entry["options"]
+                _, rect = options[self.rng.randrange(len(options))]
+                self._queue.append(click_events(rect.center))
+        self._queue.append(click_events(scene.submit_button.rect.center))
+
+    def _use_menu(self, scene: MainMenuScene) -> None:
+        if len(self.checks) >= self.sessions:
+            self._queue.append([pygame.event.Event(pygame.QUIT)])
+        elif self.checks and scene.participant_info.get("name") != self._participant_name():
+            # 每个会话换一名被试，避免同一秒内的导出文件重名
+            self._queue.append(click_events(scene.info_rect.center))
+        else:
+            self._finished_session = False
+            self._intended = []
+            self._planned_key = None
+            self._queue.append(click_events(scene.boxes[self.mode].center))
+
+    def _choose_rating(self, scene: ExperimentScene) -> float:
+        slider = scene.slider
+        if self.ratings:
+            value = self.ratings[len(self._intended) % len(self.ratings)]
+        else:
+            steps = int(round((slider.max_value - slider.min_value) / slider.step))
+            value = slider.min_value + self.rng.randint(0, steps) * slider.step
+        return max(slider.min_value, min(slider.max_value, value))
+
+    def _answer(self, app, scene: ExperimentScene) -> None:
+        key = (scene.current_trial, scene.current_question_order)
+        start = scene.question_start_time
+        if start is None:
+            return
+        if key != self._planned_key:
+            rt = self.rt(self.rng)
+            self._planned_key = key
+            self._target_rating = self._choose_rating(scene) if scene.slider_visible else None
+            self._drag_at = start + rt * DRAG_FRACTION if scene.slider_visible else None
+            self._confirm_at = start + rt
+            self._intended.append(IntendedResponse(key[0], key[1], self._target_rating, rt))
+        now = app.clock.now()
+        if self._drag_at is not None and now >= self._drag_at:
+            slider = scene.slider
+            self._drag_at = None
+            self._queue.append(drag_events(slider.position_of(slider.value), slider.position_of(self._target_rating)))
+        elif self._drag_at is None and self._confirm_at is not None and now >= self._confirm_at:
+            self._confirm_at = None
+            self._queue.append(click_events(scene.confirm_button.rect.center))
+
+    def _finish(self, scene: ExperimentScene) -> None:
+        job = scene._export_job
+        if job is None or not job.done:
+            return
+        if not self._finished_session:
+            self._finished_session = True
+            path = job.result if job.error is None else None
+            self.checks.append(self.verify(path, self._intended))
+        self._queue.append(key_events(pygame.K_RETURN))
+
+    # ---- ExperimentApp 回调 ----
+
+    def next_deadline(self) -> Optional[float]:
+        if self._queue:
+            return None
+        for value in (self._drag_at, self._confirm_at):
+            if value is not None:
+                return value
+        return None
+
+    def __call__(self, app) -> None:
+        if not self._queue:
+            self._plan(app)
+        if self._queue:
+            for event in self._queue.pop(0):
+                pygame.event.post(event)
+
+    def _plan(self, app) -> None:
+        scene = app.current_scene
+        if isinstance(scene, ExperimentScene):
+            if scene.state == "question":
+                self._answer(app, scene)
+            elif scene.state == "completed":
+                self._finish(scene)
+            elif scene.state == "debug":
+                self._queue.append(key_events(pygame.K_SPACE))
+            return
+        if scene is self._handled_scene:
+            return
+        self._handled_scene = scene
+        if isinstance(scene, ParticipantFormScene):
+            self._fill_form(scene)
+        elif isinstance(scene, MainMenuScene):
+            self._use_menu(scene)
+        elif isinstance(scene, ResumePromptScene):
+            # 模拟运行不处理遗留会话
+            self._queue.append(key_events(pygame.K_ESCAPE))
+
+    # ---- 核对 ----
+
+    def verify(self, path: Optional[str], intended: Sequence[IntendedResponse]) -> SessionCheck:
+        """逐题核对导出的评分与反应时"""
+        check = SessionCheck(path, len(intended))
+        if path is None or not os.path.exists(path):
+            check.mismatches.append("会话未导出结果文件")
+            return check
+        with open(path, "r", encoding="utf-8-sig", newline="") as handle:
+            rows = {(int(row["trial_index"]), int(row["question_order"])): row for row in csv.DictReader(handle)}
+        if len(rows) != len(intended):
+            check.mismatches.append(f"导出 {len(rows)} 行，预期 {len(intended)} 行")
+        for response in intended:
+            label = f"第 {response.trial_index} 次第 {response.question_order} 题"
+            row = rows.get((response.trial_index, response.question_order))
+            if row is None:
+                check.mismatches.append(f"{label}：导出中缺失")
+                continue
+            recorded = float(row["rating_value"]) if row["rating_value"] != "" else None
+            if recorded != response.rating:
+                check.mismatches.append(f"{label}：评分 {recorded}，预期 {response.rating}")
+            elapsed = float(row["elapsed_since_display"])
+            if abs(elapsed - response.rt) > self.rt_tolerance:
+                check.mismatches.append(f"{label}：反应时 {elapsed:.3f}s，预期 {response.rt:.3f}s")
+        return check
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="模拟被试：用真实输入事件跑完整场实验并核对导出")
+    parser.add_argument("--sessions", type=int, default=1, help="连续完成的会话数")
+    parser.add_argument("--mode", default="formal", choices=["practice", "formal"])
+    parser.add_argument("--rt", default="lognormal:1.8,0.4", help="反应时分布，如 fixed:1.5、exgauss:1.2,0.2,0.5")
+    parser.add_argument("--ratings", type=float, nargs="*", help="按顺序循环使用的评分，默认在量表内随机")
+    parser.add_argument("--seed", type=int, default=0, help="机器人与会话的随机种子")
+    parser.add_argument("--export-dir", help="导出目录，默认使用临时目录并在结束后删除")
+    parser.add_argument("--config", help="配置文件路径")
+    parser.add_argument("--realtime", action="store_true", help="按真实时间运行（默认使用虚拟时钟）")
+    parser.add_argument("--max-frames", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    from src.app import ExperimentApp
+    from src.config_loader import ConfigError, load_config
+    from src.stimuli_manager import StimuliManager
+    from src.utils.clock import MonotonicClock, VirtualClock
+    from src.utils.paths import resource_path
+
+    try:
+        rt = parse_rt_spec(args.rt)
+        config = load_config(args.config)
+        stimuli_manager = StimuliManager(resource_path("stimuli.csv"), config)
+        config.ensure_stimuli_capacity(stimuli_manager)
+    except (ConfigError, ValueError) as exc:
+        print(f"错误：{exc}", file=sys.stderr)
+        return 1
+
+    export_dir = args.export_dir or tempfile.mkdtemp(prefix="psych_bot_")
+    config.set_export_directory(export_dir)
+    bot = ParticipantBot(args.sessions, args.mode, rt=rt, ratings=args.ratings, seed=args.seed)
+    app = ExperimentApp(
+        config,
+        stimuli_manager,
+        headless=True,
+        clock=MonotonicClock() if args.realtime else VirtualClock(),
+        seed=args.seed,
+    )
+    start = time.perf_counter()
+    try:
+        app.run(max_frames=args.max_frames, on_frame=bot)
+    finally:
+        app.shutdown()
+        if args.export_dir is None:
+            shutil.rmtree(export_dir, ignore_errors=True)
+    elapsed = time.perf_counter() - start
+
+    failed = [check for check in bot.checks if not check.ok]
+    answered = sum(check.expected for check in bot.checks)
+    print(f"完成 {len(bot.checks)} / {args.sessions} 个会话，{answered} 道题，{app.frames} 帧，用时 {elapsed:.2f} s")
+    for check in failed:
+        print(f"错误：{check.path or '（无导出）'} 与机器人作答不一致")
+        for line in check.mismatches[:10]:
+            print(f"  {line}")
+    if len(bot.checks) < args.sessions:
+        print(f"错误：在 {args.max_frames} 帧内未完成全部会话")
+        return 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""结果的列式导出：有 pyarrow 时写 Parquet，否则写 NumPy .npz。
+
+两种格式均对字符串列做字典编码（被试信息、规则、符号与 controls 在一次会话中只有
+少量不同取值），数值列保持 int64 / float64，缺失值在 Parquet 中为 null、在 .npz
+中为 NaN。.npz 内只有一个结构化数组 rows 与一张 UTF-8 JSON 取值表 values。
+读取结果与按同一类型解析 CSV 得到的行完全一致。计时质量列（含掉帧数）按浮点列保存，
+旧版导出中没有这些列时读为缺失值。
+"""
+
+import csv
+import importlib.util
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.record_store import TIMING_QUALITY_FIELDS
+from src.recorder import EXPORT_FIELDNAMES
+
+
+COLUMNAR_FORMATS = ("columnar", "parquet", "npz")
+INT_COLUMNS = ("trial_index", "question_order")
+FLOAT_COLUMNS = (
+    "rating_value",
+    "rating_started_at",
+    "rating_confirmed_at",
+    "elapsed_since_display",
+    "trial_elapsed_total",
+    *TIMING_QUALITY_FIELDS,
+)
+STRING_COLUMNS = tuple(name for name in EXPORT_FIELDNAMES if name not in INT_COLUMNS + FLOAT_COLUMNS)
+_FORMAT_SUFFIX = {"parquet": ".parquet", "npz": ".npz"}
+
+Columns = Dict[str, List[Any]]
+
+
+def _has_module(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+def resolve_format(requested: str) -> Optional[str]:
+    """把配置中的格式名解析为实际可写的格式，缺少依赖时返回 None"""
+    has_arrow = _has_module("pyarrow")
+    has_numpy = _has_module("numpy")
+    if requested == "parquet" and not has_arrow and has_numpy:
+        print("提示：未安装 pyarrow，列式结果改为写入 .npz")
+        return "npz"
+    if requested in ("columnar", "parquet") and has_arrow:
+        return "parquet"
+    if requested in ("columnar", "npz") and has_numpy:
+        return "npz"
+    return None
+
+
+def columnar_path_for(csv_path: str, fmt: str) -> str:
+    stem, ext = os.path.splitext(csv_path)
+    base = stem if ext.lower() == ".csv" else csv_path
+    return f"{base}{_FORMAT_SUFFIX[fmt]}"
+
+
+def _parse_float(value: Any) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    return float(value)
+
+
+def rows_to_columns(rows: Sequence[Dict[str, Any]]) -> Columns:
+    """把导出行（与 CSV 写入的字典相同）转换为带类型的列"""
+    columns: Columns = {name: [] for name in EXPORT_FIELDNAMES}
+    for row in rows:
+        for name in INT_COLUMNS:
+            columns[name].append(int(row[name]))
+        for name in FLOAT_COLUMNS:
+            # 旧版 CSV 没有计时质量列
+            columns[name].append(_parse_float(row.get(name)))
+        for name in STRING_COLUMNS:
+            value = row[name]
+            columns[name].append("" if value is None else str(value))
+    return columns
+
+
+def write_columnar(rows: Sequence[Dict[str, Any]], csv_path: str, fmt: str) -> Optional[str]:
+    """写出与 CSV 同名的列式文件，返回路径；缺少依赖时给出提示并跳过"""
+    resolved = resolve_format(fmt)
+    if resolved is None:
+        print(f"提示：未安装 pyarrow 或 numpy，已跳过 {fmt} 格式导出")
+        return None
+    target = columnar_path_for(csv_path, resolved)
+    write_columns(rows_to_columns(rows), target, resolved)
+    return target
+
+
+def write_columns(columns: Columns, target: str, fmt: str) -> None:
+    """把带类型的列写入 target（fmt 为 parquet 或 npz）；先写临时文件再替换
+
+    列可以多于导出字段（如合并数据集中的来源文件名），未列入数值列的一律按字符串处理。
+    """
+    temp_path = f"{target}.tmp"
+    if fmt == "parquet":
+        _write_parquet(columns, temp_path)
+    else:
+        _write_npz(columns, temp_path)
+    os.replace(temp_path, target)
+
+
+def _write_parquet(columns: Columns, path: str) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrays = {}
+    for name, values in columns.items():
+        if name in INT_COLUMNS:
+            arrays[name] = pa.array(values, type=pa.int64())
+        elif name in FLOAT_COLUMNS:
+            arrays[name] = pa.array(values, type=pa.float64())
+        else:
+            arrays[name] = pa.array(values, type=pa.string()).dictionary_encode()
+    pq.write_table(pa.table(arrays), path, use_dictionary=True)
+
+
+def _npz_dtype(names: Sequence[str]) -> Any:
+    import numpy as np
+
+    fields = []
+    for name in names:
+        if name in INT_COLUMNS:
+            fields.append((name, np.int64))
+        elif name in FLOAT_COLUMNS:
+            fields.append((name, np.float64))
+        else:
+            fields.append((name, np.int32))
+    return np.dtype(fields)
+
+
+def _write_npz(columns: Columns, path: str) -> None:
+    import numpy as np
+
+    # 一个结构化数组加一张共享取值表：小文件的读取开销主要在 zip 成员数量上
+    lookup: Dict[str, int] = {}
+    names = list(columns)
+    rows = np.zeros(len(columns[names[0]]) if names else 0, dtype=_npz_dtype(names))
+    for name in names:
+        values = columns[name]
+        if name in INT_COLUMNS:
+            rows[name] = values
+        elif name in FLOAT_COLUMNS:
+            rows[name] = [np.nan if value is None else value for value in values]
+        else:
+            rows[name] = [lookup.setdefault(value, len(lookup)) for value in values]
+    table = json.dumps(list(lookup), ensure_ascii=False).encode("utf-8")
+    with open(path, "wb") as handle:
+        np.savez(handle, rows=rows, values=np.frombuffer(table, dtype=np.uint8))
+        handle.flush()
+        os.fsync(handle.fileno())
+
+
+def read_columnar(path: str, decode_controls: bool = False) -> Columns:
+    """读取列式文件为带类型的列；decode_controls 时 controls 按取值表只解析一次 JSON"""
+    if path.endswith(".parquet"):
+        return _read_parquet(path, decode_controls)
+    return _read_npz(path, decode_controls)
+
+
+def _read_parquet(path: str, decode_controls: bool) -> Columns:
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(path)
+    columns: Columns = {}
+    for name in table.column_names:
+        column = table.column(name)
+        if decode_controls and name == "controls":
+            chunks = column.combine_chunks()
+            decoded = [json.loads(value) if value else {} for value in chunks.dictionary.to_pylist()]
+            columns[name] = [decoded[index] for index in chunks.indices.to_pylist()]
+        else:
+            columns[name] = column.to_pylist()
+    return columns
+
+
+def _read_npz(path: str, decode_controls: bool) -> Columns:
+    import numpy as np
+
+    with np.load(path, allow_pickle=False) as data:
+        rows = data["rows"]
+        table = json.loads(data["values"].tobytes().decode("utf-8"))
+    columns: Columns = {}
+    for name in rows.dtype.names or ():
+        values = rows[name].tolist()
+        if name in INT_COLUMNS:
+            columns[name] = values
+        elif name in FLOAT_COLUMNS:
+            columns[name] = [None if value != value else value for value in values]
+        elif decode_controls and name == "controls":
+            decoded = {code: json.loads(table[code]) if table[code] else {} for code in set(values)}
+            columns[name] = [decoded[code] for code in values]
+        else:
+            columns[name] = [table[code] for code in values]
+    return columns
+
+
+def read_columnar_arrays(path: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """以 NumPy 数组读取列式文件，不经过 Python 列表
+
+    返回 (arrays, categories)：数值列为 int64 / float64 数组；字符串列为 int32 编码数组，
+    categories[name] 为对应的取值表（NumPy 字符串数组），编码即其下标。
+    """
+    import numpy as np
+
+    arrays: Dict[str, Any] = {}
+    categories: Dict[str, Any] = {}
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path)
+        for name in table.column_names:
+            column = table.column(name).combine_chunks()
+            if name in INT_COLUMNS or name in FLOAT_COLUMNS:
+                dtype = np.int64 if name in INT_COLUMNS else np.float64
+                arrays[name] = column.to_numpy(zero_copy_only=False).astype(dtype)
+                continue
+            if not hasattr(column, "indices"):
+                column = column.dictionary_encode()
+            arrays[name] = column.indices.to_numpy(zero_copy_only=False).astype(np.int32)
+            categories[name] = np.asarray(column.dictionary.to_pylist(), dtype=np.str_)
+        return arrays, categories
+    with np.load(path, allow_pickle=False) as data:
+        rows = data["rows"]
+        table = np.asarray(json.loads(data["values"].tobytes().decode("utf-8")), dtype=np.str_)
+    for name in rows.dtype.names or ():
+        arrays[name] = np.ascontiguousarray(rows[name])
+        if name not in INT_COLUMNS and name not in FLOAT_COLUMNS:
+            categories[name] = table
+    return arrays, categories
+
+
+def read_csv_columns(path: str, decode_controls: bool = False) -> Columns:
+    """按与列式文件相同的类型解析 CSV，用于核对与基准对比"""
+    with open(path, "r", newline="", encoding="utf-8") as handle:
+        columns = rows_to_columns(list(csv.DictReader(handle)))
+    if decode_controls:
+        columns["controls"] = [json.loads(value) if value else {} for value in columns["controls"]]
+    return columns
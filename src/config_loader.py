@@ -2,6 +2,7 @@ import json
 import os
 from typing import Any, Dict, List, Optional, Tuple
 
+from src.font_subset import subset_path_for
 from src.utils.paths import resolve_output_directory, resource_path
 
 
@@ -35,6 +36,23 @@ class Config:
     def raw(self) -> Dict[str, Any]:
         return self._raw
 
+    @property
+    def export_directory(self) -> str:
+        return self._resolved_export_dir
+
+    def set_export_directory(self, path: str) -> None:
+        """改用指定的导出目录（模拟与回归运行时避免写入正式数据目录）"""
+        self._resolved_export_dir = os.path.abspath(path)
+        self._export_dir_fallback = False
+
+    @property
+    def results_database_path(self) -> Optional[str]:
+        """SQLite 结果库路径；相对路径基于导出目录，未配置时返回 None"""
+        name = self.experiment.get("results_database")
+        if not name:
+            return None
+        return os.path.join(self._resolved_export_dir, name)
+
     def _load(self) -> None:
         if not os.path.exists(self._path):
             raise ConfigError(f"未找到配置文件: {self._path}")
@@ -153,6 +171,7 @@ class Config:
             "show_timer": True,
             "show_participant_info": True,
             "show_debug": False,
+            "show_frame_stats": False,
         }
         normalized: Dict[str, bool] = {}
         for key, default in defaults.items():
@@ -185,7 +204,11 @@ class Config:
         if delay_range[0] < 0 or delay_range[1] < delay_range[0]:
             raise ConfigError("题目间隔区间设置不合法")
 
-        if self.font_path and not os.path.exists(self.font_path):
+        if (
+            self.font_path
+            and not os.path.exists(self.font_path)
+            and not os.path.exists(subset_path_for(self.font_path))
+        ):
             raise ConfigError(f"字体文件不存在: {self.font_path}")
 
         subtitles = self.texts.get("home_subtitle") if isinstance(self.texts, dict) else None
@@ -196,6 +219,21 @@ class Config:
         if not export_dir:
             raise ConfigError("请设置结果导出目录 export_directory")
 
+        export_formats = self.experiment.get("export_formats", ["csv"])
+        allowed_formats = {"csv", "columnar", "parquet", "npz", "relational"}
+        if not isinstance(export_formats, list) or any(fmt not in allowed_formats for fmt in export_formats):
+            raise ConfigError("experiment.export_formats 只能包含 csv、columnar、parquet、npz、relational")
+
+        results_database = self.experiment.get("results_database")
+        if results_database is not None and not isinstance(results_database, str):
+            raise ConfigError("experiment.results_database 必须为字符串")
+
+        hitch_threshold = self.experiment.get("hitch_threshold_ms")
+        if hitch_threshold is not None and (
+            isinstance(hitch_threshold, bool) or not isinstance(hitch_threshold, (int, float)) or hitch_threshold <= 0
+        ):
+            raise ConfigError("experiment.hitch_threshold_ms 必须为正数")
+
         practice_trials = int(self.experiment.get("practice_trials", 0))
         formal_trials = int(self.experiment.get("formal_trials", 0))
         if practice_trials < 0 or formal_trials <= 0:
@@ -0,0 +1,317 @@
+"""字体子集化：收集实验实际用到的字符并生成精简字体。
+
+既可在打包前执行 ``python -m src.font_subset`` 生成随包分发的子集字体，
+也会在首次运行时按需生成到用户目录缓存中（需要安装 fontTools）。
+"""
+
+import ast
+import hashlib
+import json
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, FrozenSet, Iterable, List, Optional, Set
+
+from src.utils.paths import bundle_dir, user_data_dir
+
+
+# 即使当前题库未出现，也始终保留的常用字符（数字、字母、标点）
+BASE_CHARACTERS = (
+    "".join(chr(code) for code in range(0x20, 0x7F))
+    + "，。：；！？、（）《》“”‘’…—·【】「」～％×"
+)
+
+SUBSET_SUFFIX = ".subset.ttf"
+
+# 需要扫描硬编码界面文案的源码位置（相对项目根目录）
+SOURCE_GLOBS = ("main.py", "src/**/*.py")
+
+
+@dataclass(frozen=True)
+class FontSelection:
+    """运行时实际加载的字体文件及其字符覆盖范围"""
+
+    path: str
+    charset: Optional[FrozenSet[str]]
+    fallback_path: Optional[str]
+
+
+def subset_path_for(font_path: str) -> str:
+    stem, _ext = os.path.splitext(font_path)
+    return f"{stem}{SUBSET_SUFFIX}"
+
+
+def manifest_path_for(subset_font: str) -> str:
+    stem, _ext = os.path.splitext(subset_font)
+    return f"{stem}.json"
+
+
+def charset_digest(characters: Iterable[str]) -> str:
+    ordered = "".join(sorted(set(characters)))
+    return hashlib.sha1(ordered.encode("utf-8")).hexdigest()
+
+
+# -------------------- 字符收集 --------------------
+
+
+def collect_text_characters(value: Any) -> Set[str]:
+    """递归收集 JSON 结构中所有字符串（含键名）的字符"""
+    chars: Set[str] = set()
+    if isinstance(value, str):
+        chars.update(value)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            chars.update(collect_text_characters(key))
+            chars.update(collect_text_characters(item))
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            chars.update(collect_text_characters(item))
+    return chars
+
+
+def collect_file_characters(path: str) -> Set[str]:
+    if not path or not os.path.exists(path):
+        return set()
+    with open(path, "r", encoding="utf-8-sig") as f:
+        return set(f.read())
+
+
+def collect_portrait_characters(pictures_dir: Optional[str]) -> Set[str]:
+    if not pictures_dir or not os.path.isdir(pictures_dir):
+        return set()
+    chars: Set[str] = set()
+    for entry in os.listdir(pictures_dir):
+        chars.update(os.path.splitext(entry)[0])
+    return chars
+
+
+def collect_source_characters(paths: Iterable[str]) -> Set[str]:
+    """提取源码中字符串常量（含 f-string 的常量片段）的字符"""
+    chars: Set[str] = set()
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                tree = ast.parse(f.read(), filename=path)
+        except (OSError, SyntaxError):
+            continue
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str):
+                chars.update(node.value)
+    return chars
+
+
+def source_files(root: Optional[str] = None) -> List[str]:
+    base = Path(root or bundle_dir())
+    found: List[str] = []
+    for pattern in SOURCE_GLOBS:
+        found.extend(str(path) for path in sorted(base.glob(pattern)) if path.is_file())
+    return found
+
+
+def pictures_directory(config: Any) -> Optional[str]:
+    raw = getattr(config, "raw", {})
+    setting = raw.get("pictures_dir", "pictures") if isinstance(raw, dict) else "pictures"
+    if os.path.isabs(setting):
+        return setting
+    base = os.path.dirname(getattr(config, "_path", "config.json"))
+    return os.path.join(base, setting)
+
+
+def collect_data_characters(config: Any, stimuli_path: Optional[str]) -> Set[str]:
+    """运行期可变内容：配置文案、题库与画像名称"""
+    chars = set(BASE_CHARACTERS)
+    chars.update(collect_text_characters(getattr(config, "raw", {})))
+    chars.update(collect_file_characters(stimuli_path or ""))
+    chars.update(collect_portrait_characters(pictures_directory(config)))
+    chars.discard("\n")
+    chars.discard("\r")
+    return chars
+
+
+def collect_required_characters(
+    config: Any,
+    stimuli_path: Optional[str],
+    source_root: Optional[str] = None,
+) -> Set[str]:
+    chars = collect_data_characters(config, stimuli_path)
+    chars.update(collect_source_characters(source_files(source_root)))
+    chars.discard("\n")
+    chars.discard("\r")
+    return chars
+
+
+# -------------------- 子集生成与读取 --------------------
+
+
+def read_manifest(manifest_path: str) -> Optional[dict]:
+    if not os.path.exists(manifest_path):
+        return None
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("characters"), str):
+        return None
+    return manifest
+
+
+def build_subset(source_font: str, target_font: str, characters: Iterable[str]) -> dict:
+    """调用 fontTools 生成子集字体并写出清单，返回清单内容"""
+    from fontTools import subset  # 可选依赖，仅生成子集时需要
+
+    chars = "".join(sorted(set(characters)))
+    options = subset.Options()
+    options.layout_features = ["*"]
+    options.name_IDs = ["*"]
+    options.notdef_outline = True
+    options.glyph_names = False
+    font = subset.load_font(source_font, options)
+    subsetter = subset.Subsetter(options=options)
+    subsetter.populate(text=chars)
+    subsetter.subset(font)
+
+    os.makedirs(os.path.dirname(os.path.abspath(target_font)), exist_ok=True)
+    temp_target = f"{target_font}.tmp"
+    subset.save_font(font, temp_target, options)
+    os.replace(temp_target, target_font)
+
+    manifest = {
+        "source": os.path.basename(source_font),
+        "source_size": os.path.getsize(source_font),
+        "digest": charset_digest(chars),
+        "characters": chars,
+    }
+    manifest_path = manifest_path_for(target_font)
+    with open(f"{manifest_path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+    return manifest
+
+
+def _usable_subset(
+    subset_font: str,
+    required: Set[str],
+    source_font: Optional[str],
+) -> Optional[FrozenSet[str]]:
+    if not os.path.exists(subset_font):
+        return None
+    manifest = read_manifest(manifest_path_for(subset_font))
+    if manifest is None:
+        return None
+    if source_font and os.path.exists(source_font):
+        if manifest.get("source_size") != os.path.getsize(source_font):
+            return None
+    charset = frozenset(manifest["characters"])
+    if not required.issubset(charset):
+        return None
+    return charset
+
+
+def _has_fonttools() -> bool:
+    try:
+        import fontTools.subset  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def resolve_font_selection(config: Any, stimuli_path: Optional[str]) -> Optional[FontSelection]:
+    """为运行时挑选字体：优先随包子集，其次用户目录缓存，必要时首次生成。
+
+    子集无法覆盖当前题库/配置时退回完整字体；返回 None 表示未配置字体文件。
+    """
+    font_path = getattr(config, "font_path", None)
+    if not font_path:
+        return None
+    full_font = font_path if os.path.exists(font_path) else None
+    required = collect_data_characters(config, stimuli_path)
+
+    bundled = subset_path_for(font_path)
+    charset = _usable_subset(bundled, required, full_font)
+    if charset is not None:
+        return FontSelection(path=bundled, charset=charset, fallback_path=full_font)
+
+    if full_font is None:
+        # 完整字体未随包分发且子集已过期，只能按现有子集加载
+        if os.path.exists(bundled):
+            manifest = read_manifest(manifest_path_for(bundled)) or {}
+            return FontSelection(
+                path=bundled,
+                charset=frozenset(manifest.get("characters", "")),
+                fallback_path=None,
+            )
+        return None
+
+    cache_dir = os.path.join(user_data_dir(), "fonts")
+    stem = os.path.splitext(os.path.basename(font_path))[0]
+    cached = os.path.join(cache_dir, f"{stem}.{charset_digest(required)[:12]}{SUBSET_SUFFIX}")
+    charset = _usable_subset(cached, required, full_font)
+    if charset is not None:
+        return FontSelection(path=cached, charset=charset, fallback_path=full_font)
+
+    if not _has_fonttools():
+        print(
+            "提示：子集字体未覆盖当前题库/配置文案，且未安装 fontTools，"
+            f"将使用完整字体：{full_font}（pip install fontTools 后可自动生成子集）"
+        )
+    else:
+        print(f"提示：正在生成子集字体，写入用户目录：{cached}")
+        characters = set(required)
+        characters.update(collect_source_characters(source_files()))
+        bundled_manifest = read_manifest(manifest_path_for(bundled))
+        if bundled_manifest:
+            characters.update(bundled_manifest["characters"])
+        try:
+            manifest = build_subset(full_font, cached, characters)
+        except Exception as exc:  # fontTools 对损坏字体会抛出多种异常
+            print(f"警告：生成子集字体失败，将使用完整字体：{full_font}。详情：{exc}")
+        else:
+            print(f"提示：已生成子集字体：{cached}")
+            return FontSelection(
+                path=cached,
+                charset=frozenset(manifest["characters"]),
+                fallback_path=full_font,
+            )
+
+    return FontSelection(path=full_font, charset=None, fallback_path=None)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """打包前生成随包分发的子集字体"""
+    import argparse
+
+    from src.config_loader import ConfigError, load_config
+    from src.utils.paths import resource_path
+
+    parser = argparse.ArgumentParser(description="根据题库、配置与界面文案生成子集字体")
+    parser.add_argument("--config", default=None, help="配置文件路径（默认 config.json）")
+    parser.add_argument("--stimuli", default=None, help="题库文件路径（默认 stimuli.csv）")
+    args = parser.parse_args(argv)
+
+    try:
+        config = load_config(args.config)
+    except ConfigError as exc:
+        print(f"配置错误：{exc}")
+        return 1
+    font_path = config.font_path
+    if not font_path or not os.path.exists(font_path):
+        print("错误：config.json 中未配置可用的 fonts.path，无法生成子集字体")
+        return 1
+
+    stimuli_path = args.stimuli or resource_path("stimuli.csv")
+    characters = collect_required_characters(config, stimuli_path)
+    target = subset_path_for(font_path)
+    manifest = build_subset(font_path, target, characters)
+    full_size = os.path.getsize(font_path)
+    subset_size = os.path.getsize(target)
+    print(
+        f"已生成 {target}：{len(manifest['characters'])} 个字符，"
+        f"{full_size / 1024:.0f} KB -> {subset_size / 1024:.0f} KB"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
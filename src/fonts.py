@@ -0,0 +1,110 @@
+from typing import Dict, FrozenSet, Optional
+
+import pygame
+
+from src.font_subset import FontSelection, resolve_font_selection
+from src.utils.paths import resource_path
+
+
+FALLBACK_FONT_NAMES = [
+    "PingFang SC",
+    "PingFangSC-Regular",
+    "Microsoft YaHei",
+    "MicrosoftYaHei",
+    "SimHei",
+    "WenQuanYi Zen Hei",
+    "Noto Sans CJK SC",
+    "Source Han Sans CN",
+    "Songti SC",
+]
+
+
+class SubsetFont(pygame.font.Font):
+    """基于子集字体的 Font，遇到子集外的字符时整串交给完整字体渲染"""
+
+    def __init__(
+        self,
+        path: str,
+        size: int,
+        charset: FrozenSet[str],
+        fallback_path: Optional[str],
+    ) -> None:
+        super().__init__(path, size)
+        self._charset = charset
+        self._fallback_path = fallback_path
+        self._point_size = size
+        self._fallback: Optional[pygame.font.Font] = None
+
+    def _font_for(self, text: str) -> pygame.font.Font:
+        if self._charset.issuperset(text):
+            return self
+        if self._fallback is None:
+            self._fallback = _load_fallback(self._fallback_path, self._point_size)
+        return self._fallback
+
+    def render(self, text, antialias, color, background=None):  # type: ignore[override]
+        font = self._font_for(text)
+        if font is self:
+            return super().render(text, antialias, color, background)
+        return font.render(text, antialias, color, background)
+
+    def size(self, text):  # type: ignore[override]
+        font = self._font_for(text)
+        if font is self:
+            return super().size(text)
+        return font.size(text)
+
+    def metrics(self, text):  # type: ignore[override]
+        font = self._font_for(text)
+        if font is self:
+            return super().metrics(text)
+        return font.metrics(text)
+
+
+def _match_system_font() -> Optional[str]:
+    for name in FALLBACK_FONT_NAMES:
+        matched = pygame.font.match_font(name, bold=False, italic=False)
+        if matched:
+            return matched
+    return None
+
+
+def _load_fallback(path: Optional[str], size: int) -> pygame.font.Font:
+    return pygame.font.Font(path or _match_system_font(), size)
+
+
+def create_fonts(
+    config,
+    scale: float,
+    stimuli_path: Optional[str] = None,
+) -> Dict[str, pygame.font.Font]:
+    pygame.font.init()
+    fonts_conf = config.fonts
+    selection: Optional[FontSelection] = resolve_font_selection(
+        config,
+        stimuli_path or resource_path("stimuli.csv"),
+    )
+
+    warning_issued = False
+
+    def build(size: int) -> pygame.font.Font:
+        nonlocal warning_issued
+        target_size = max(12, int(round(size * scale)))
+        if selection is not None:
+            if selection.charset is not None:
+                return SubsetFont(selection.path, target_size, selection.charset, selection.fallback_path)
+            return pygame.font.Font(selection.path, target_size)
+        matched = _match_system_font()
+        if matched:
+            return pygame.font.Font(matched, target_size)
+        if not warning_issued:
+            print("警告：未找到可用的中文字体，请在 config.json 中配置 fonts.path，当前将使用默认字体。")
+            warning_issued = True
+        return pygame.font.Font(None, target_size)
+
+    return {
+        "title": build(fonts_conf.get("title_size", 48)),
+        "subtitle": build(fonts_conf.get("subtitle_size", 32)),
+        "body": build(fonts_conf.get("body_size", 24)),
+        "question": build(fonts_conf.get("question_size", fonts_conf.get("body_size", 24))),
+    }
@@ -0,0 +1,356 @@
+"""逐帧耗时统计：记录主循环每帧在事件分发、update、draw 与 flip 上的耗时。
+
+FrameStats 把每帧的各阶段耗时连同当时的场景与状态写入预分配的环形缓冲（array），
+每帧只有几次 perf_counter 与数组赋值；场景内部可以用 section() 计量更细的绘制步骤
+（如题目面板），耗时按节名单独成列。计时始终使用真实时间，与场景时钟无关，
+注入 VirtualClock 的模拟运行同样得到真实的绘制开销。
+
+数据可按场景、状态汇总为分位数，在屏幕左上角以 HUD 显示（F3 切换），并在实验结束时
+导出到结果 CSV 旁（<结果 CSV>.frames.csv）。导出的文件可用本模块汇总：
+
+    python -m src.frame_stats data/xxx_formal_results_xxx.csv.frames.csv
+"""
+
+import argparse
+import csv
+import sys
+import time
+from array import array
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import pygame
+
+
+FRAME_STATS_SUFFIX = ".frames.csv"
+PHASES = ("events", "update", "draw", "hud", "flip")
+DEFAULT_CAPACITY = 1 << 16
+HUD_TOGGLE_KEY = pygame.K_F3
+PERCENTILES = (0.5, 0.95, 0.99)
+
+
+def frame_stats_path_for(csv_path: str) -> str:
+    """结果 CSV 对应的逐帧耗时文件路径"""
+    return f"{csv_path}{FRAME_STATS_SUFFIX}"
+
+
+class _Section:
+    """section() 返回的计时上下文，可重复使用"""
+
+    __slots__ = ("_stats", "_name", "_start")
+
+    def __init__(self, stats: "FrameStats", name: str) -> None:
+        self._stats = stats
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(self, *_exc) -> None:
+        sections = self._stats._pending_sections
+        sections[self._name] = sections.get(self._name, 0.0) + time.perf_counter() - self._start
+
+
+class FrameStats:
+    """逐帧耗时的环形缓冲，容量满后覆盖最早的帧"""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        if capacity <= 0:
+            raise ValueError("逐帧统计的容量必须为正数")
+        self.capacity = capacity
+        self._count = 0
+        self._started = time.perf_counter()
+        self._frame_start = 0.0
+        self._last_mark = 0.0
+        self._times = array("d", bytes(8 * capacity))
+        self._phases = {phase: array("d", bytes(8 * capacity)) for phase in PHASES}
+        self._scenes: List[str] = [""] * capacity
+        self._states: List[str] = [""] * capacity
+        self._sections: Dict[str, array] = {}
+        self._section_contexts: Dict[str, _Section] = {}
+        self._pending_phases: Dict[str, float] = {}
+        self._pending_sections: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    @property
+    def total_frames(self) -> int:
+        """清空以来记录过的帧数（含已被覆盖的）"""
+        return self._count
+
+    def clear(self) -> None:
+        """清空缓冲；在帧内调用时从当前帧开始重新记录"""
+        self._count = 0
+        self._started = self._frame_start or time.perf_counter()
+
+    # ---- 记录 ----
+
+    def begin_frame(self) -> None:
+        now = time.perf_counter()
+        self._frame_start = now
+        self._last_mark = now
+        self._pending_phases.clear()
+        self._pending_sections.clear()
+
+    def mark(self, phase: str) -> None:
+        """把上一个标记以来的耗时计入 phase"""
+        now = time.perf_counter()
+        self._pending_phases[phase] = self._pending_phases.get(phase, 0.0) + now - self._last_mark
+        self._last_mark = now
+
+    def section(self, name: str) -> _Section:
+        """计量一段绘制或更新步骤，同一帧内多次进入时累加"""
+        context = self._section_contexts.get(name)
+        if context is None:
+            context = self._section_contexts[name] = _Section(self, name)
+        return context
+
+    def end_frame(self, scene: str, state: str) -> None:
+        index = self._count % self.capacity
+        self._times[index] = self._frame_start - self._started
+        pending = self._pending_phases
+        for phase, values in self._phases.items():
+            values[index] = pending.get(phase, 0.0)
+        self._scenes[index] = scene
+        self._states[index] = state
+        for name in self._pending_sections:
+            if name not in self._sections:
+                self._sections[name] = array("d", bytes(8 * self.capacity))
+        for name, values in self._sections.items():
+            values[index] = self._pending_sections.get(name, 0.0)
+        self._count += 1
+
+    # ---- 读取 ----
+
+    @property
+    def section_names(self) -> List[str]:
+        return sorted(self._sections)
+
+    def _indices(self, last: Optional[int] = None) -> Iterator[int]:
+        size = len(self)
+        if last is not None:
+            size = min(size, last)
+        first = self._count - size
+        for position in range(first, self._count):
+            yield position % self.capacity
+
+    def rows(self, last: Optional[int] = None) -> List[Dict[str, object]]:
+        """按时间顺序返回缓冲中的帧（耗时单位为秒）；last 只取最近的若干帧"""
+        sections = self.section_names
+        indices = list(self._indices(last))
+        first = self._count - len(indices)
+        result = []
+        for offset, index in enumerate(indices):
+            row: Dict[str, object] = {
+                "frame": first + offset,
+                "t": self._times[index],
+                "scene": self._scenes[index],
+                "state": self._states[index],
+            }
+            total = 0.0
+            for phase, values in self._phases.items():
+                row[phase] = values[index]
+                total += values[index]
+            row["total"] = total
+            for name in sections:
+                row[f"section:{name}"] = self._sections[name][index]
+            result.append(row)
+        return result
+
+    def summary(self, last: Optional[int] = None) -> Dict[Tuple[str, str], Dict[str, Dict[str, float]]]:
+        return summarize(self.rows(last))
+
+    def export_csv(self, path: str) -> int:
+        """把缓冲中的帧写入 CSV（耗时单位为毫秒），返回写入的帧数"""
+        rows = self.rows()
+        sections = self.section_names
+        fieldnames = ["frame", "t", "scene", "state"]
+        fieldnames += [f"{phase}_ms" for phase in PHASES] + ["total_ms"]
+        fieldnames += [f"{name}_ms" for name in sections]
+        with open(path, "w", newline="", encoding="utf-8-sig") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(fieldnames)
+            for row in rows:
+                values = [row["frame"], f"{row['t']:.6f}", row["scene"], row["state"]]
+                values += [f"{row[phase] * 1000:.3f}" for phase in (*PHASES, "total")]
+                values += [f"{row[f'section:{name}'] * 1000:.3f}" for name in sections]
+                writer.writerow(values)
+        return len(rows)
+
+
+# ---- 汇总 ----
+
+
+def _percentile(ordered: Sequence[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def describe(values: Iterable[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    if not ordered:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    stats = {"count": len(ordered), "mean": sum(ordered) / len(ordered)}
+    for fraction in PERCENTILES:
+        stats[f"p{int(fraction * 100)}"] = _percentile(ordered, fraction)
+    stats["max"] = ordered[-1]
+    return stats
+
+
+def summarize(rows: Iterable[Dict[str, object]]) -> Dict[Tuple[str, str], Dict[str, Dict[str, float]]]:
+    """按 (场景, 状态) 汇总各阶段与各节的耗时分布；节只统计实际执行过的帧"""
+    grouped: Dict[Tuple[str, str], Dict[str, List[float]]] = defaultdict(lambda: defaultdict(list))
+    for row in rows:
+        bucket = grouped[(str(row["scene"]), str(row["state"]))]
+        for key, value in row.items():
+            if key in ("frame", "t", "scene", "state"):
+                continue
+            if key.startswith("section:") and not value:
+                continue
+            bucket[key].append(float(value))  # type: ignore[arg-type]
+    return {
+        group: {key: describe(values) for key, values in series.items()}
+        for group, series in sorted(grouped.items())
+    }
+
+
+def read_frame_stats(path: str) -> List[Dict[str, object]]:
+    """读取 export_csv 写出的文件，耗时换算回秒"""
+    rows = []
+    with open(path, newline="", encoding="utf-8-sig") as handle:
+        for record in csv.DictReader(handle):
+            row: Dict[str, object] = {
+                "frame": int(record["frame"]),
+                "t": float(record["t"]),
+                "scene": record["scene"],
+                "state": record["state"],
+            }
+            for key, value in record.items():
+                if not key.endswith("_ms"):
+                    continue
+                name = key[: -len("_ms")]
+                if name not in PHASES and name != "total":
+                    name = f"section:{name}"
+                row[name] = float(value or 0) / 1000
+            rows.append(row)
+    return rows
+
+
+def format_summary(summary: Dict[Tuple[str, str], Dict[str, Dict[str, float]]]) -> List[str]:
+    lines = []
+    for (scene, state), series in summary.items():
+        frames = series.get("total", {}).get("count", 0)
+        lines.append(f"{scene} / {state or '-'}（{frames} 帧）")
+        lines.append("  阶段\t平均\tP50\tP95\tP99\t最大（ms）")
+        for key, stats in series.items():
+            label = key[len("section:"):] if key.startswith("section:") else key
+            if key.startswith("section:"):
+                label = f"{label}（{stats['count']} 次）"
+            lines.append(
+                f"  {label}\t{stats['mean'] * 1000:.2f}\t{stats['p50'] * 1000:.2f}\t"
+                f"{stats['p95'] * 1000:.2f}\t{stats['p99'] * 1000:.2f}\t{stats['max'] * 1000:.2f}"
+            )
+    return lines
+
+
+# ---- HUD ----
+
+
+class FrameStatsHud:
+    """屏幕左上角的耗时 HUD：最近若干帧各阶段的 P50 / P95 / 最大值与最慢的节"""
+
+    def __init__(self, stats: FrameStats, scale: float = 1.0, window: int = 120, refresh: float = 0.5) -> None:
+        self.stats = stats
+        self.visible = False
+        self.window = window
+        self.refresh = refresh
+        self._font = pygame.font.Font(None, max(14, int(round(22 * scale))))
+        self._padding = max(4, int(round(8 * scale)))
+        self._surface: Optional[pygame.Surface] = None
+        self._built_at = float("-inf")
+        # HUD 下方原有的画面；首页等场景不会每帧重绘该区域，半透明面板不能叠加在上一帧的面板上
+        self._backdrop: Optional[Tuple[pygame.Surface, pygame.Rect]] = None
+
+    def toggle(self) -> None:
+        self.visible = not self.visible
+        self._surface = None
+
+    def restore(self, screen: pygame.Surface) -> None:
+        """在场景绘制前把上一帧 HUD 覆盖的区域还原；隐藏后的第一帧也会还原"""
+        if self._backdrop is None:
+            return
+        backdrop, rect = self._backdrop
+        self._backdrop = None
+        screen.blit(backdrop, rect)
+
+    def discard(self) -> None:
+        """窗口尺寸变化后场景会整屏重绘，保存的区域已失效"""
+        self._backdrop = None
+
+    def _lines(self) -> List[str]:
+        rows = self.stats.rows(self.window)
+        if not rows:
+            return ["frame stats: no data"]
+        last = rows[-1]
+        span = float(last["t"]) - float(rows[0]["t"])  # type: ignore[arg-type]
+        fps = (len(rows) - 1) / span if span > 0 else 0.0
+        lines = [f"{last['scene']} / {last['state'] or '-'}   {fps:5.1f} fps   last {len(rows)} frames (ms)"]
+        series = summarize(dict(row, scene="", state="") for row in rows)[("", "")]
+        for key in (*PHASES, "total"):
+            stats = series.get(key)
+            if stats:
+                lines.append(f"{key:<8} p50 {stats['p50'] * 1000:6.2f}  p95 {stats['p95'] * 1000:6.2f}  max {stats['max'] * 1000:6.2f}")
+        sections = sorted(
+            ((key[len("section:"):], stats) for key, stats in series.items() if key.startswith("section:")),
+            key=lambda item: -item[1]["max"],
+        )
+        for name, stats in sections[:4]:
+            lines.append(f"  {name}: p95 {stats['p95'] * 1000:.2f}  max {stats['max'] * 1000:.2f}  x{stats['count']}")
+        return lines
+
+    def _build(self) -> pygame.Surface:
+        rendered = [self._font.render(line, True, (255, 255, 255)) for line in self._lines()]
+        width = max(surface.get_width() for surface in rendered) + self._padding * 2
+        height = sum(surface.get_height() for surface in rendered) + self._padding * 2
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        y = self._padding
+        for surface in rendered:
+            panel.blit(surface, (self._padding, y))
+            y += surface.get_height()
+        return panel
+
+    def draw(self, screen: pygame.Surface) -> None:
+        if not self.visible:
+            return
+        # 文字每隔 refresh 秒才重新排版，避免 HUD 本身成为开销
+        now = time.perf_counter()
+        if self._surface is None or now - self._built_at >= self.refresh:
+            self._surface = self._build()
+            self._built_at = now
+        rect = self._surface.get_rect(topleft=(self._padding, self._padding)).clip(screen.get_rect())
+        self._backdrop = (screen.subsurface(rect).copy(), rect)
+        screen.blit(self._surface, rect.topleft)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="汇总逐帧耗时文件：按场景与状态输出各阶段的分位数")
+    parser.add_argument("paths", nargs="+", help="<结果 CSV>.frames.csv 文件")
+    args = parser.parse_args(argv)
+    rows: List[Dict[str, object]] = []
+    for path in args.paths:
+        try:
+            rows.extend(read_frame_stats(path))
+        except (OSError, KeyError, ValueError) as exc:
+            print(f"错误：无法读取 {path}。详情：{exc}", file=sys.stderr)
+            return 1
+    for line in format_summary(summarize(rows)):
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
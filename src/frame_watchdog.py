@@ -0,0 +1,103 @@
+"""呈现循环的帧监视：发现题目呈现或等待作答期间的掉帧、卡顿与垃圾回收停顿。
+
+主循环每帧开始时调用 begin_frame()，监视器用 perf_counter 量出上一帧到这一帧的
+间隔，并按上一帧结束时场景所处的状态归属：只有 question 与 waiting_next 状态下的
+间隔计入。间隔超过帧预算的 1.5 倍视为掉帧，掉帧数按跨过的帧预算数计。gc.callbacks
+记录每次垃圾回收的停顿时长。
+
+实验场景在确认作答时调用 take()，先把本帧开始到确认时刻这段尚未结束的间隔计入，
+再取出上一条记录以来累计的计时质量并清零，随该题记录一起导出（missed_frames、
+worst_frame_ms、total_stall_ms、gc_pause_ms）。确认所在帧的卡顿与垃圾回收停顿因此
+归入被确认的这道题，而不是下一道。
+"""
+
+import gc
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+WATCHED_STATES = ("question", "waiting_next")
+LATE_FACTOR = 1.5
+DEFAULT_FRAME_RATE = 60
+
+
+@dataclass
+class TimingQuality:
+    """一条记录对应时段的计时质量，毫秒"""
+
+    missed_frames: int = 0
+    worst_frame_ms: float = 0.0
+    total_stall_ms: float = 0.0
+    gc_pause_ms: float = 0.0
+
+    def as_record(self) -> Dict[str, Any]:
+        """按导出精度（微秒）取整后的字段字典"""
+        return {
+            "missed_frames": self.missed_frames,
+            "worst_frame_ms": round(self.worst_frame_ms, 3),
+            "total_stall_ms": round(self.total_stall_ms, 3),
+            "gc_pause_ms": round(self.gc_pause_ms, 3),
+        }
+
+
+class FrameWatchdog:
+    """逐帧检查帧间隔，把受监视状态下的掉帧与停顿累计到当前记录"""
+
+    def __init__(self, frame_rate: int = DEFAULT_FRAME_RATE) -> None:
+        self.budget = 1.0 / (frame_rate if frame_rate > 0 else DEFAULT_FRAME_RATE)
+        self._last_frame: Optional[float] = None
+        self._state: Optional[str] = None
+        self._current = TimingQuality()
+        self._gc_started: Optional[float] = None
+        self._gc_pending = 0.0
+        self._installed = False
+
+    def install(self) -> None:
+        if not self._installed:
+            gc.callbacks.append(self._on_gc)
+            self._installed = True
+
+    def close(self) -> None:
+        if self._installed:
+            gc.callbacks.remove(self._on_gc)
+            self._installed = False
+
+    def _on_gc(self, phase: str, _info: Dict[str, int]) -> None:
+        if phase == "start":
+            self._gc_started = time.perf_counter()
+        elif self._gc_started is not None:
+            self._gc_pending += time.perf_counter() - self._gc_started
+            self._gc_started = None
+
+    def reset(self) -> None:
+        """开始新的会话：丢弃之前的帧间隔与累计值"""
+        self._last_frame = None
+        self._state = None
+        self._gc_pending = 0.0
+        self._current = TimingQuality()
+
+    def begin_frame(self, state: Optional[str]) -> None:
+        """state 为上一帧绘制时场景的状态，即这段间隔内屏幕上呈现的内容"""
+        self._state = state
+        self._close_interval(time.perf_counter(), state)
+
+    def _close_interval(self, now: float, state: Optional[str]) -> None:
+        last, self._last_frame = self._last_frame, now
+        gc_pause, self._gc_pending = self._gc_pending, 0.0
+        if last is None or state not in WATCHED_STATES:
+            return
+        interval = now - last
+        current = self._current
+        current.gc_pause_ms += gc_pause * 1000
+        current.worst_frame_ms = max(current.worst_frame_ms, interval * 1000)
+        if interval > self.budget * LATE_FACTOR:
+            current.missed_frames += max(1, round(interval / self.budget) - 1)
+            current.total_stall_ms += (interval - self.budget) * 1000
+
+    def take(self) -> TimingQuality:
+        """计入进行中的这一帧，取出并清零当前累计的计时质量"""
+        # 这段间隔内屏幕上仍是本帧开始时的画面，状态与 begin_frame 收到的相同
+        self._close_interval(time.perf_counter(), self._state)
+        current, self._current = self._current, TimingQuality()
+        return current
@@ -0,0 +1,220 @@
+"""超时帧触发的栈采样：只在单帧耗时超过阈值后采集主线程的 Python 调用栈。
+
+整场会话的常规性能剖析噪声太大，难以解释偶发的卡顿。HitchProfiler 在后台线程中待命：
+主循环每帧开始时登记帧号与起始时刻，采样线程等到该帧已用时超过阈值仍未结束时，
+才以固定间隔读取主线程的调用栈（sys._current_frames），直到这一帧结束。未超时的帧
+只有一次属性赋值与一次 Event.set，几乎没有开销。
+
+采样按 Brendan Gregg 的折叠栈格式累计，每行为「场景/状态;外层函数;...;内层函数 次数」
+（场景状态取采样时刻的值），会话结束时写到结果 CSV 旁（<结果 CSV>.hitches.folded），
+可直接交给 flamegraph.pl 或 speedscope 绘制火焰图；也可用本模块列出采样最多的函数：
+
+    python -m src.hitch_profiler data/xxx_formal_results_xxx.csv.hitches.folded --top 20
+
+受 GIL 限制，主线程在不释放 GIL 的 C 调用中时采样线程无法运行，这类调用会体现为
+调用返回后的位置。
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import CodeType, FrameType
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+HITCHES_SUFFIX = ".hitches.folded"
+DEFAULT_INTERVAL = 0.001
+
+
+def hitches_path_for(csv_path: str) -> str:
+    """结果 CSV 对应的折叠栈文件路径"""
+    return f"{csv_path}{HITCHES_SUFFIX}"
+
+
+class HitchProfiler:
+    """超时帧栈采样器；arm() 之后才会采样，disarm() 后保留已采集的栈"""
+
+    def __init__(self, threshold: float, interval: float = DEFAULT_INTERVAL) -> None:
+        if threshold <= 0 or interval <= 0:
+            raise ValueError("采样阈值与间隔必须为正数")
+        self.threshold = threshold
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.hitches = 0
+        self.samples = 0
+        self._armed = False
+        self._frame_id = 0
+        # (帧号, 起始时刻, 当前场景)；帧结束后为 None。整体赋值，采样线程读到的总是同一帧的值
+        self._current: Optional[Tuple[int, float, Any]] = None
+        self._last_hitch = -1
+        self._labels: Dict[CodeType, str] = {}
+        self._lock = threading.Lock()
+        self._frame_event = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._main_thread_id = threading.main_thread().ident
+
+    @property
+    def armed(self) -> bool:
+        return self._armed
+
+    def arm(self) -> None:
+        """开始待命：清空之前的采样，必要时启动采样线程"""
+        with self._lock:
+            self.stacks = Counter()
+            self.hitches = 0
+            self.samples = 0
+        self._main_thread_id = threading.get_ident()
+        self._armed = True
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="hitch-profiler", daemon=True)
+            self._thread.start()
+
+    def disarm(self) -> None:
+        self._armed = False
+        self._current = None
+
+    def close(self) -> None:
+        self.disarm()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            self._frame_event.set()
+            thread.join()
+
+    # ---- 主线程 ----
+
+    def frame_started(self, scene: Any) -> None:
+        if not self._armed:
+            return
+        self._frame_id += 1
+        self._current = (self._frame_id, time.perf_counter(), scene)
+        self._frame_event.set()
+
+    def frame_finished(self) -> None:
+        self._current = None
+
+    # ---- 采样线程 ----
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._frame_event.wait()
+            self._frame_event.clear()
+            current = self._current
+            if current is None:
+                continue
+            frame_id, start, scene = current
+            delay = start + self.threshold - time.perf_counter()
+            # 等到阈值；期间开始新的一帧时 Event 被置位，提前醒来重新计时
+            if delay > 0 and self._frame_event.wait(delay):
+                continue
+            while not self._stop.is_set():
+                current = self._current
+                if current is None or current[0] != frame_id:
+                    break
+                self._sample(frame_id, scene)
+                time.sleep(self.interval)
+            # 采样期间若已开始新的一帧，交给下一轮循环处理
+            if self._current is not None:
+                self._frame_event.set()
+
+    def _sample(self, frame_id: int, scene: Any) -> None:
+        frame = sys._current_frames().get(self._main_thread_id)
+        if frame is None:
+            return
+        label = f"{type(scene).__name__}/{getattr(scene, 'state', '') or '-'}"
+        names: List[str] = []
+        while frame is not None:
+            names.append(self._label_for(frame))
+            frame = frame.f_back
+        names.append(label)
+        folded = ";".join(reversed(names))
+        with self._lock:
+            self.stacks[folded] += 1
+            self.samples += 1
+            if frame_id != self._last_hitch:
+                self._last_hitch = frame_id
+                self.hitches += 1
+
+    def _label_for(self, frame: FrameType) -> str:
+        code = frame.f_code
+        label = self._labels.get(code)
+        if label is None:
+            name = getattr(code, "co_qualname", code.co_name)
+            module = os.path.splitext(os.path.basename(code.co_filename))[0]
+            # 折叠栈以分号分隔各层、以最后一个空格分隔次数
+            label = self._labels[code] = f"{module}:{name}".replace(";", ",").replace(" ", "_")
+        return label
+
+    # ---- 导出 ----
+
+    def export_folded(self, path: str) -> int:
+        """把累计的栈写为折叠栈文件，返回行数"""
+        with self._lock:
+            stacks = sorted(self.stacks.items())
+        with open(path, "w", encoding="utf-8") as handle:
+            for stack, count in stacks:
+                handle.write(f"{stack} {count}\n")
+        return len(stacks)
+
+
+def read_folded(path: str) -> Counter:
+    stacks: Counter = Counter()
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            stack, _, count = line.rstrip("\n").rpartition(" ")
+            if stack:
+                stacks[stack] += int(count)
+    return stacks
+
+
+def top_functions(stacks: Counter, limit: int = 20) -> List[Tuple[str, int, int]]:
+    """按自身采样数排序的函数：(函数, 自身采样数, 含子调用的采样数)"""
+    own: Counter = Counter()
+    total: Counter = Counter()
+    for stack, count in stacks.items():
+        # 第一层是场景/状态标签，不是函数
+        frames = stack.split(";")[1:]
+        if not frames:
+            continue
+        own[frames[-1]] += count
+        for name in set(frames):
+            total[name] += count
+    ranked = sorted(total, key=lambda name: (-own[name], -total[name], name))
+    return [(name, own[name], total[name]) for name in ranked[:limit]]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="汇总超时帧的折叠栈：列出采样最多的函数")
+    parser.add_argument("paths", nargs="+", help="<结果 CSV>.hitches.folded 文件")
+    parser.add_argument("--top", type=int, default=20, help="列出的函数个数")
+    args = parser.parse_args(argv)
+    stacks: Counter = Counter()
+    for path in args.paths:
+        try:
+            stacks.update(read_folded(path))
+        except (OSError, ValueError) as exc:
+            print(f"错误：无法读取 {path}。详情：{exc}", file=sys.stderr)
+            return 1
+    samples = sum(stacks.values())
+    if not samples:
+        print("没有超时帧的采样")
+        return 0
+    labels: Counter = Counter()
+    for stack, count in stacks.items():
+        labels[stack.split(";", 1)[0]] += count
+    print(f"共 {samples} 个采样")
+    for label, count in labels.most_common():
+        print(f"  {label}\t{count}\t{count / samples:.1%}")
+    print("函数\t自身\t含子调用")
+    for name, own, total in top_functions(stacks, args.top):
+        print(f"  {name}\t{own} ({own / samples:.1%})\t{total} ({total / samples:.1%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
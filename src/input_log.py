@@ -0,0 +1,113 @@
+"""实验场景的输入日志：逐帧记下交给实验场景的鼠标与键盘事件，供会话回放使用。
+
+日志与作答日志放在一起（<结果 CSV>.inputs.jsonl），同样由 RecordJournal 在后台线程
+追加写入。每个会话以一行 session 开头，之后每帧一行 input：
+
+    {"type": "input", "t": 12.3, "state": "question", "trial": 2, "order": 1, "events": [...]}
+
+t 为相对实验开始的秒数（与导出中的 rating_confirmed_at 同一时间轴），state、trial、
+order 为分发这批事件之前场景所处的状态。未按下按键的鼠标移动不影响实验场景，不记录。
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pygame
+
+from src.journal import RecordJournal, read_journal
+
+
+INPUT_LOG_SUFFIX = ".inputs.jsonl"
+
+INPUT_EVENT_TYPES = {
+    pygame.KEYDOWN: "keydown",
+    pygame.KEYUP: "keyup",
+    pygame.TEXTINPUT: "textinput",
+    pygame.MOUSEBUTTONDOWN: "mousebuttondown",
+    pygame.MOUSEBUTTONUP: "mousebuttonup",
+    pygame.MOUSEMOTION: "mousemotion",
+}
+_EVENT_TYPES_BY_NAME = {name: event_type for event_type, name in INPUT_EVENT_TYPES.items()}
+_EVENT_ATTRIBUTES = ("key", "mod", "unicode", "scancode", "text", "pos", "rel", "buttons", "button")
+
+
+def input_log_path_for(csv_path: str) -> str:
+    """结果 CSV 对应的输入日志路径"""
+    return f"{csv_path}{INPUT_LOG_SUFFIX}"
+
+
+def encode_event(event: pygame.event.Event) -> Optional[Dict[str, Any]]:
+    """把事件转为可写入 JSON 的字典；与实验场景无关的事件返回 None"""
+    name = INPUT_EVENT_TYPES.get(event.type)
+    if name is None:
+        return None
+    if event.type == pygame.MOUSEMOTION and not any(getattr(event, "buttons", ())):
+        return None
+    data: Dict[str, Any] = {"type": name}
+    for attribute in _EVENT_ATTRIBUTES:
+        if hasattr(event, attribute):
+            value = getattr(event, attribute)
+            data[attribute] = list(value) if isinstance(value, tuple) else value
+    return data
+
+
+def decode_event(data: Dict[str, Any]) -> pygame.event.Event:
+    event_type = _EVENT_TYPES_BY_NAME.get(str(data.get("type")))
+    if event_type is None:
+        raise ValueError(f"输入日志中有未知的事件类型：{data.get('type')}")
+    attributes = {
+        key: tuple(value) if isinstance(value, list) else value
+        for key, value in data.items()
+        if key != "type"
+    }
+    return pygame.event.Event(event_type, **attributes)
+
+
+class InputLog:
+    """一个会话的输入日志写入端"""
+
+    def __init__(self, path: str, seed: Optional[int], resumed: bool = False) -> None:
+        self.path = path
+        self._journal = RecordJournal(path)
+        self._journal.append({"type": "session", "seed": seed, "resumed": resumed})
+
+    def write(
+        self,
+        t: float,
+        state: str,
+        trial: int,
+        order: int,
+        events: Iterable[pygame.event.Event],
+    ) -> None:
+        encoded = [data for data in (encode_event(event) for event in events) if data is not None]
+        if not encoded:
+            return
+        self._journal.append(
+            {"type": "input", "t": t, "state": state, "trial": trial, "order": order, "events": encoded}
+        )
+
+    def close(self) -> None:
+        self._journal.close()
+
+
+def read_input_log(path: str, seed: Optional[int] = None) -> List[Tuple[float, str, int, int, List[pygame.event.Event]]]:
+    """读取最后一个会话（含其恢复后的续写部分）的输入，返回 (t, 状态, 试次, 题序, 事件) 列表
+
+    指定 seed 时，种子不符的会话会被跳过。
+    """
+    batches: List[Tuple[float, str, int, int, List[pygame.event.Event]]] = []
+    active = False
+    for entry in read_journal(path):
+        kind = entry.get("type")
+        if kind == "session":
+            matches = seed is None or entry.get("seed") == seed
+            if not entry.get("resumed"):
+                batches = []
+                active = matches
+            else:
+                active = active and matches
+        elif kind == "input" and active:
+            events = [decode_event(data) for data in entry.get("events", [])]
+            batches.append(
+                (float(entry["t"]), str(entry.get("state", "")), int(entry.get("trial", 0)), int(entry.get("order", 0)), events)
+            )
+    return batches
@@ -0,0 +1,191 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+
+JOURNAL_SUFFIX = ".journal.jsonl"
+
+_STOP = object()
+_OPEN_JOURNALS: Set["RecordJournal"] = set()
+_OPEN_LOCK = threading.Lock()
+
+
+def journal_path_for(csv_path: str) -> str:
+    """结果 CSV 对应的日志文件路径"""
+    return f"{csv_path}{JOURNAL_SUFFIX}"
+
+
+class RecordJournal:
+    """追加写入的作答日志（JSON Lines）
+
+    append 只把条目放入队列，由后台线程批量写入；fsync 最迟在 sync_interval 秒后执行，
+    渲染线程不会因磁盘 I/O 阻塞。flush 会等待此前的全部条目写入并落盘。
+    """
+
+    def __init__(self, path: str, sync_interval: float = 0.25) -> None:
+        self.path = path
+        self._sync_interval = max(0.01, float(sync_interval))
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="record-journal", daemon=True)
+        self._thread.start()
+        with _OPEN_LOCK:
+            _OPEN_JOURNALS.add(self)
+
+    @property
+    def error(self) -> Optional[BaseException]:
+        return self._error
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        if self._closed:
+            raise ValueError(f"日志已关闭：{self.path}")
+        self._queue.put(entry)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """等待已提交的条目写盘并 fsync，超时返回 False"""
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        with _OPEN_LOCK:
+            _OPEN_JOURNALS.discard(self)
+
+    def _run(self) -> None:
+        try:
+            handle = open(self.path, "a", encoding="utf-8")
+        except OSError as exc:
+            self._fail(exc)
+            return
+        last_sync = time.monotonic()
+        unsynced = False
+        with handle:
+            while True:
+                try:
+                    item = self._queue.get(timeout=self._sync_interval if unsynced else None)
+                except queue.Empty:
+                    item = None
+                lines: List[str] = []
+                waiters: List[threading.Event] = []
+                stop = False
+                # 一次取空队列，合并为一次写入
+                while item is not None:
+                    if item is _STOP:
+                        stop = True
+                    elif isinstance(item, threading.Event):
+                        waiters.append(item)
+                    else:
+                        lines.append(json.dumps(item, ensure_ascii=False) + "\n")
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        item = None
+                try:
+                    if lines:
+                        handle.write("".join(lines))
+                        handle.flush()
+                        unsynced = True
+                    now = time.monotonic()
+                    if unsynced and (waiters or stop or now - last_sync >= self._sync_interval):
+                        os.fsync(handle.fileno())
+                        unsynced = False
+                        last_sync = now
+                except OSError as exc:
+                    self._fail(exc)
+                for waiter in waiters:
+                    waiter.set()
+                if stop:
+                    return
+
+    def _fail(self, exc: BaseException) -> None:
+        if self._error is None:
+            print(f"警告：写入作答日志失败（{self.path}），本次会话仅保存在内存中。详情：{exc}")
+        self._error = exc
+        # 继续消费队列，避免 flush 永久等待
+        while True:
+            item = self._queue.get()
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is _STOP:
+                return
+
+
+def read_journal(path: str) -> Iterator[Dict[str, Any]]:
+    """逐条读取日志；崩溃时写了一半的末行会被忽略"""
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            if not line.endswith("\n"):
+                break
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            if isinstance(entry, dict):
+                yield entry
+
+
+def truncate_partial_tail(path: str) -> None:
+    """截掉崩溃时写了一半的末行，保证后续追加的条目不会与残行粘连"""
+    with open(path, "rb+") as handle:
+        handle.seek(0, os.SEEK_END)
+        size = handle.tell()
+        if size == 0:
+            return
+        position = size
+        chunk = 4096
+        while position > 0:
+            start = max(0, position - chunk)
+            handle.seek(start)
+            data = handle.read(position - start)
+            newline = data.rfind(b"\n")
+            if newline != -1:
+                valid = start + newline + 1
+                break
+            position = start
+        else:
+            valid = 0
+        if valid != size:
+            handle.truncate(valid)
+
+
+def last_entry_type(path: str) -> Optional[str]:
+    """只读取文件末尾判断最后一条完整条目的类型，无需解析整个日志"""
+    with open(path, "rb") as handle:
+        handle.seek(0, os.SEEK_END)
+        size = handle.tell()
+        handle.seek(max(0, size - 65536))
+        tail = handle.read()
+    lines = tail.split(b"\n")
+    # 末尾为换行时最后一段为空；否则最后一段是残行，一并跳过
+    for raw in reversed(lines[:-1]):
+        try:
+            entry = json.loads(raw.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return None
+        if isinstance(entry, dict):
+            return entry.get("type")
+        return None
+    return None
+
+
+@atexit.register
+def _close_open_journals() -> None:
+    with _OPEN_LOCK:
+        journals = list(_OPEN_JOURNALS)
+    for journal in journals:
+        journal.close(timeout=5.0)
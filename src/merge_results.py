@@ -0,0 +1,296 @@
+"""把导出目录中的结果 CSV 增量合并为一个列式数据集。
+
+各文件在进程池中解析并按导出字段校验（加入计时质量列之前的旧表头同样接受，这些列
+记为缺失），合格的行流式写入数据集目录下的分片文件
+（part-*.parquet 或 part-*.npz，每行附带来源文件名 source_file）。manifest.json
+记录每个已合并文件的大小、修改时间与 SHA-256：大小与修改时间未变的文件直接跳过，
+内容有变的文件会先从原分片中剔除旧行再重新合并。
+
+用法：python -m src.merge_results data --output data/merged
+"""
+
+import argparse
+import csv
+import fnmatch
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from src.columnar import Columns, read_columnar, resolve_format, rows_to_columns, write_columns
+from src.recorder import EXPORT_FIELDNAMES, LEGACY_EXPORT_FIELDNAMES
+
+
+MANIFEST_NAME = "manifest.json"
+DEFAULT_PATTERN = "*_results*.csv"
+SIDECAR_PATTERN = "*.csv.*.csv"
+SOURCE_COLUMN = "source_file"
+PART_ROW_LIMIT = 200_000
+
+
+@dataclass
+class ParsedFile:
+    """进程池中解析单个 CSV 的结果"""
+
+    path: str
+    sha256: str
+    columns: Optional[Columns] = None
+    error: Optional[str] = None
+
+    @property
+    def rows(self) -> int:
+        return len(self.columns[EXPORT_FIELDNAMES[0]]) if self.columns else 0
+
+
+@dataclass
+class MergeReport:
+    scanned: int = 0
+    parsed: int = 0
+    skipped: int = 0
+    merged: int = 0
+    replaced: int = 0
+    rows: int = 0
+    elapsed: float = 0.0
+    invalid: List[Tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def files_per_second(self) -> float:
+        return self.parsed / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def parse_result_file(path: str) -> ParsedFile:
+    """读取并校验一个结果 CSV；只读一次文件，同时计算哈希"""
+    try:
+        with open(path, "rb") as handle:
+            data = handle.read()
+    except OSError as exc:
+        return ParsedFile(path, "", error=str(exc))
+    digest = hashlib.sha256(data).hexdigest()
+    try:
+        text = data.decode("utf-8-sig")
+        reader = csv.DictReader(io.StringIO(text, newline=""))
+        if reader.fieldnames not in (EXPORT_FIELDNAMES, LEGACY_EXPORT_FIELDNAMES):
+            return ParsedFile(path, digest, error=f"表头与导出字段不一致：{reader.fieldnames}")
+        columns = rows_to_columns(list(reader))
+    except (UnicodeDecodeError, csv.Error, ValueError, KeyError) as exc:
+        return ParsedFile(path, digest, error=str(exc))
+    return ParsedFile(path, digest, columns=columns)
+
+
+def load_manifest(output: str) -> Dict[str, Any]:
+    path = os.path.join(output, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"format": None, "files": {}, "parts": {}}
+    with open(path, "r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def save_manifest(output: str, manifest: Dict[str, Any]) -> None:
+    path = os.path.join(output, MANIFEST_NAME)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, ensure_ascii=False, indent=2)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temp_path, path)
+
+
+def scan_results(directory: str, pattern: str = DEFAULT_PATTERN) -> List[str]:
+    """导出目录下（含子目录）匹配的结果文件，跳过合并输出目录本身"""
+    matches: List[str] = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = [name for name in dirs if not os.path.exists(os.path.join(root, name, MANIFEST_NAME))]
+        for name in files:
+            # 结果 CSV 旁的附属文件（如逐帧耗时 *.csv.frames.csv）不是作答数据
+            if fnmatch.fnmatch(name, pattern) and not fnmatch.fnmatch(name, SIDECAR_PATTERN):
+                matches.append(os.path.join(root, name))
+    matches.sort()
+    return matches
+
+
+def _file_key(directory: str, path: str) -> str:
+    return os.path.relpath(path, directory).replace(os.sep, "/")
+
+
+def _parse_all(paths: Sequence[str], workers: int) -> Iterator[ParsedFile]:
+    if workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            yield parse_result_file(path)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(1, len(paths) // (workers * 8))
+        yield from executor.map(parse_result_file, paths, chunksize=chunksize)
+
+
+class _PartWriter:
+    """把解析结果累积为分片，达到行数上限即写盘"""
+
+    def __init__(self, output: str, fmt: str, manifest: Dict[str, Any]) -> None:
+        self._output = output
+        self._fmt = fmt
+        self._manifest = manifest
+        self._stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._index = 0
+        self._columns: Columns = self._empty()
+        self._pending: List[Tuple[str, Dict[str, Any]]] = []
+        self._stale: Dict[str, Set[str]] = {}
+
+    @staticmethod
+    def _empty() -> Columns:
+        return {name: [] for name in (*EXPORT_FIELDNAMES, SOURCE_COLUMN)}
+
+    def add(self, key: str, parsed: ParsedFile, stat: os.stat_result, replaced_part: Optional[str] = None) -> None:
+        assert parsed.columns is not None
+        if replaced_part is not None:
+            self._stale.setdefault(replaced_part, set()).add(key)
+        for name, values in parsed.columns.items():
+            self._columns[name].extend(values)
+        self._columns[SOURCE_COLUMN].extend([key] * parsed.rows)
+        entry = {"sha256": parsed.sha256, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "rows": parsed.rows}
+        self._pending.append((key, entry))
+        if len(self._columns[SOURCE_COLUMN]) >= PART_ROW_LIMIT:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        # 先剔除旧行再写新分片：中途退出时清单里已没有这些文件，下次会重新合并
+        if self._stale:
+            _drop_sources(self._output, self._manifest, self._stale)
+            self._stale = {}
+        while True:
+            name = f"part-{self._stamp}-{self._index:04d}.{self._fmt}"
+            self._index += 1
+            if name not in self._manifest["parts"]:
+                break
+        write_columns(self._columns, os.path.join(self._output, name), self._fmt)
+        self._manifest["parts"][name] = len(self._columns[SOURCE_COLUMN])
+        for key, entry in self._pending:
+            entry["part"] = name
+            self._manifest["files"][key] = entry
+        # 分片写完再更新清单，中途退出时下次会重新合并这些文件
+        save_manifest(self._output, self._manifest)
+        self._columns = self._empty()
+        self._pending = []
+
+
+def _drop_sources(output: str, manifest: Dict[str, Any], stale: Dict[str, Set[str]]) -> None:
+    """从各分片中剔除已被新版本取代的来源文件的旧行"""
+    for part, keys in stale.items():
+        for key in keys:
+            manifest["files"].pop(key, None)
+        path = os.path.join(output, part)
+        if not os.path.exists(path):
+            manifest["parts"].pop(part, None)
+            continue
+        columns = read_columnar(path)
+        keep = [index for index, source in enumerate(columns[SOURCE_COLUMN]) if source not in keys]
+        if keep:
+            write_columns({name: [values[i] for i in keep] for name, values in columns.items()}, path, manifest["format"])
+            manifest["parts"][part] = len(keep)
+        else:
+            os.remove(path)
+            manifest["parts"].pop(part, None)
+    save_manifest(output, manifest)
+
+
+def merge_directory(
+    directory: str,
+    output: str,
+    pattern: str = DEFAULT_PATTERN,
+    workers: Optional[int] = None,
+    fmt: str = "columnar",
+) -> MergeReport:
+    """增量合并 directory 下的结果文件到 output 数据集目录"""
+    start = time.perf_counter()
+    os.makedirs(output, exist_ok=True)
+    manifest = load_manifest(output)
+    resolved = manifest.get("format") or resolve_format(fmt)
+    if resolved is None:
+        raise RuntimeError("合并数据集需要安装 pyarrow 或 numpy")
+    manifest["format"] = resolved
+
+    report = MergeReport()
+    paths = scan_results(directory, pattern)
+    report.scanned = len(paths)
+    candidates: List[str] = []
+    stats: Dict[str, os.stat_result] = {}
+    for path in paths:
+        key = _file_key(directory, path)
+        stat = os.stat(path)
+        stats[path] = stat
+        entry = manifest["files"].get(key)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            report.skipped += 1
+            continue
+        candidates.append(path)
+
+    writer = _PartWriter(output, resolved, manifest)
+    for parsed in _parse_all(candidates, workers or os.cpu_count() or 1):
+        report.parsed += 1
+        key = _file_key(directory, parsed.path)
+        entry = manifest["files"].get(key)
+        if parsed.error is not None:
+            report.invalid.append((key, parsed.error))
+            continue
+        if entry is not None and entry["sha256"] == parsed.sha256:
+            # 只是被重新保存或修改时间变化，内容相同
+            entry["size"] = stats[parsed.path].st_size
+            entry["mtime_ns"] = stats[parsed.path].st_mtime_ns
+            report.skipped += 1
+            continue
+        if entry is not None:
+            report.replaced += 1
+        writer.add(key, parsed, stats[parsed.path], entry["part"] if entry is not None else None)
+        report.merged += 1
+        report.rows += parsed.rows
+    writer.flush()
+    save_manifest(output, manifest)
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def read_dataset(output: str, decode_controls: bool = False) -> Columns:
+    """读取合并后的整个数据集（各分片按名称顺序拼接）"""
+    manifest = load_manifest(output)
+    columns: Columns = {name: [] for name in (*EXPORT_FIELDNAMES, SOURCE_COLUMN)}
+    for part in sorted(manifest["parts"]):
+        data = read_columnar(os.path.join(output, part), decode_controls)
+        rows = len(data[SOURCE_COLUMN])
+        for name in columns:
+            # 旧版分片没有计时质量列
+            columns[name].extend(data.get(name, [None] * rows))
+    return columns
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="把导出目录中的结果 CSV 增量合并为一个列式数据集")
+    parser.add_argument("directory", nargs="?", default="data", help="导出目录")
+    parser.add_argument("--output", help="数据集目录，默认 <导出目录>/merged")
+    parser.add_argument("--pattern", default=DEFAULT_PATTERN, help=f"文件名匹配模式，默认 {DEFAULT_PATTERN}")
+    parser.add_argument("--workers", type=int, default=None, help="解析进程数，默认 CPU 核数")
+    parser.add_argument("--format", default="columnar", choices=["columnar", "parquet", "npz"])
+    args = parser.parse_args(argv)
+
+    output = args.output or os.path.join(args.directory, "merged")
+    try:
+        report = merge_directory(args.directory, output, args.pattern, args.workers, args.format)
+    except (OSError, RuntimeError, ValueError) as exc:
+        print(f"错误：合并失败。详情：{exc}", file=sys.stderr)
+        return 1
+    print(f"扫描 {report.scanned} 个文件：合并 {report.merged} 个（其中更新 {report.replaced} 个），跳过 {report.skipped} 个")
+    print(f"新增 {report.rows} 行，用时 {report.elapsed:.2f} s，{report.files_per_second:.1f} 个文件/秒")
+    for key, error in report.invalid:
+        print(f"警告：{key} 未通过校验，已跳过。详情：{error}")
+    print(f"数据集：{output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""按列存放作答记录的紧凑内存结构
+
+每条记录不再单独分配对象：整数与浮点列存放在 array 中，字符串（题干、类别、规则等）
+与被试信息驻留后只在列中保存编号，controls 按 JSON 文本去重后共享编号。记录按追加
+顺序保存，正常作答时即为导出顺序，导出无需排序。
+"""
+
+import json
+from array import array
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
+
+
+FLOAT_FIELDS = (
+    "rating_value",
+    "rating_started_at",
+    "rating_confirmed_at",
+    "elapsed_since_display",
+    "trial_elapsed_total",
+)
+# 计时质量列与浮点列同样存放（掉帧数按整数取值类型还原），旧日志中缺失时为 None
+TIMING_QUALITY_FIELDS = ("missed_frames", "worst_frame_ms", "total_stall_ms", "gc_pause_ms")
+_NUMERIC_FIELDS = FLOAT_FIELDS + TIMING_QUALITY_FIELDS
+
+# 浮点列的取值类型：None 与整数需原样还原，保证 CSV 文本与逐条保存时一致
+_KIND_NONE = 0
+_KIND_FLOAT = 1
+_KIND_INT = 2
+_MISSING = -1
+# 复用同一个编码器，避免 json.dumps 每次带参数调用时重新构造
+_CONTROLS_ENCODER = json.JSONEncoder(ensure_ascii=False)
+
+Participant = Tuple[str, str, str, str]
+StoredRow = Tuple[
+    Participant,
+    str,
+    int,
+    int,
+    str,
+    str,
+    Optional[str],
+    Optional[float],
+    Optional[float],
+    Optional[float],
+    Optional[float],
+    Optional[float],
+    Optional[str],
+    str,
+    Optional[int],
+    Optional[float],
+    Optional[float],
+    Optional[float],
+]
+
+
+class InternPool:
+    """驻留表：相同取值只保存一份，列中存编号"""
+
+    def __init__(self) -> None:
+        self._ids: Dict[Hashable, int] = {}
+        self.values: List[Any] = []
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def intern(self, value: Hashable) -> int:
+        index = self._ids.get(value)
+        if index is None:
+            index = len(self.values)
+            self._ids[value] = index
+            self.values.append(value)
+        return index
+
+
+class RecordStore:
+    """列式记录表
+
+    只由界面线程追加；导出线程按快照时的行数读取，追加不会影响已有行。
+    """
+
+    def __init__(self) -> None:
+        self._strings = InternPool()
+        self._participants = InternPool()
+        self._controls = InternPool()
+        self._control_dicts: List[Dict[str, Any]] = []
+        self._last_controls: Optional[Dict[str, Any]] = None
+        self._last_controls_id = _MISSING
+        self._participant = array("i")
+        self._mode = array("i")
+        self._category = array("i")
+        self._stimulus = array("i")
+        self._symbol = array("i")
+        self._rule_code = array("i")
+        self._controls_id = array("i")
+        self._trial_index = array("q")
+        self._question_order = array("q")
+        self._floats = [array("d") for _ in _NUMERIC_FIELDS]
+        self._float_kinds = [array("B") for _ in _NUMERIC_FIELDS]
+        self._last_key: Optional[Tuple[str, int, int]] = None
+        self._ordered = True
+
+    def __len__(self) -> int:
+        return len(self._trial_index)
+
+    @property
+    def ordered(self) -> bool:
+        """记录是否已按 (模式, 试次, 题目序号) 的顺序追加"""
+        return self._ordered
+
+    def append(
+        self,
+        participant: Participant,
+        mode: str,
+        trial_index: int,
+        question_order: int,
+        category: str,
+        stimulus: str,
+        symbol: Optional[str],
+        rating_value: Optional[float],
+        rating_started_at: Optional[float],
+        rating_confirmed_at: float,
+        elapsed_since_display: float,
+        trial_elapsed_total: float,
+        rule_code: Optional[str],
+        controls: Optional[Dict[str, Any]],
+        missed_frames: Optional[int] = None,
+        worst_frame_ms: Optional[float] = None,
+        total_stall_ms: Optional[float] = None,
+        gc_pause_ms: Optional[float] = None,
+    ) -> None:
+        strings = self._strings
+        self._participant.append(self._participants.intern(tuple(participant)))
+        self._mode.append(strings.intern(mode))
+        self._category.append(strings.intern(category))
+        self._stimulus.append(strings.intern(stimulus))
+        self._symbol.append(_MISSING if symbol is None else strings.intern(symbol))
+        self._rule_code.append(_MISSING if rule_code is None else strings.intern(rule_code))
+        self._controls_id.append(self._intern_controls(controls))
+        values = (
+            rating_value,
+            rating_started_at,
+            rating_confirmed_at,
+            elapsed_since_display,
+            trial_elapsed_total,
+            missed_frames,
+            worst_frame_ms,
+            total_stall_ms,
+            gc_pause_ms,
+        )
+        for column, kinds, value in zip(self._floats, self._float_kinds, values):
+            if value is None:
+                column.append(0.0)
+                kinds.append(_KIND_NONE)
+            else:
+                column.append(value)
+                kinds.append(_KIND_INT if isinstance(value, int) else _KIND_FLOAT)
+        key = (mode, trial_index, question_order)
+        if self._last_key is not None and key < self._last_key:
+            self._ordered = False
+        self._last_key = key
+        # 整数列最后追加：len() 以它为准，导出线程不会读到写了一半的行
+        self._question_order.append(question_order)
+        self._trial_index.append(trial_index)
+
+    def _intern_controls(self, controls: Optional[Dict[str, Any]]) -> int:
+        last = self._last_controls
+        # 同一试次内各题的 controls 通常相同：键序一致时直接沿用上一条的编号，省去序列化
+        if last is not None and controls == last and list(controls) == list(last):
+            return self._last_controls_id
+        text = _CONTROLS_ENCODER.encode(controls) if controls else ""
+        index = self._controls.intern(text)
+        if index == len(self._control_dicts):
+            # 以 JSON 文本去重，保存的副本与调用方的字典互不影响
+            self._control_dicts.append(json.loads(text) if text else {})
+        self._last_controls = self._control_dicts[index]
+        self._last_controls_id = index
+        return index
+
+    def _stored(self, index: int) -> StoredRow:
+        strings = self._strings.values
+        symbol = self._symbol[index]
+        rule_code = self._rule_code[index]
+        floats = []
+        for column, kinds in zip(self._floats, self._float_kinds):
+            kind = kinds[index]
+            if kind == _KIND_NONE:
+                floats.append(None)
+            elif kind == _KIND_INT:
+                floats.append(int(column[index]))
+            else:
+                floats.append(column[index])
+        return (
+            self._participants.values[self._participant[index]],
+            strings[self._mode[index]],
+            self._trial_index[index],
+            self._question_order[index],
+            strings[self._category[index]],
+            strings[self._stimulus[index]],
+            None if symbol == _MISSING else strings[symbol],
+            *floats[: len(FLOAT_FIELDS)],
+            None if rule_code == _MISSING else strings[rule_code],
+            self._controls.values[self._controls_id[index]],
+            *floats[len(FLOAT_FIELDS):],
+        )
+
+    def iter_rows(self, count: Optional[int] = None) -> Iterator[StoredRow]:
+        """按导出顺序遍历前 count 行；controls 为 JSON 文本（空为 ""）"""
+        count = len(self) if count is None else count
+        indices: Sequence[int] = range(count)
+        if not self._ordered:
+            indices = sorted(indices, key=self._sort_key)
+        for index in indices:
+            yield self._stored(index)
+
+    def _sort_key(self, index: int) -> Tuple[str, int, int]:
+        return (self._strings.values[self._mode[index]], self._trial_index[index], self._question_order[index])
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """按 QuestionRecord 的字段返回一行，controls 为独立的字典副本"""
+        (participant, mode, trial_index, question_order, category, stimulus, symbol,
+         rating_value, rating_started_at, rating_confirmed_at, elapsed_since_display,
+         trial_elapsed_total, rule_code, _, missed_frames, worst_frame_ms, total_stall_ms,
+         gc_pause_ms) = self._stored(index)
+        return {
+            "participant_name": participant[0],
+            "participant_age": participant[1],
+            "participant_gender": participant[2],
+            "participant_class": participant[3],
+            "mode": mode,
+            "trial_index": trial_index,
+            "question_order": question_order,
+            "category": category,
+            "stimulus": stimulus,
+            "symbol": symbol,
+            "rating_value": rating_value,
+            "rating_started_at": rating_started_at,
+            "rating_confirmed_at": rating_confirmed_at,
+            "elapsed_since_display": elapsed_since_display,
+            "trial_elapsed_total": trial_elapsed_total,
+            "rule_code": rule_code,
+            "controls": dict(self._control_dicts[self._controls_id[index]]),
+            "missed_frames": missed_frames,
+            "worst_frame_ms": worst_frame_ms,
+            "total_stall_ms": total_stall_ms,
+            "gc_pause_ms": gc_pause_ms,
+        }
+
+    def nbytes(self) -> int:
+        """列数组占用的字节数（不含驻留表中的字符串本身）"""
+        columns = [
+            self._participant,
+            self._mode,
+            self._category,
+            self._stimulus,
+            self._symbol,
+            self._rule_code,
+            self._controls_id,
+            self._trial_index,
+            self._question_order,
+            *self._floats,
+            *self._float_kinds,
+        ]
+        return sum(column.buffer_info()[1] * column.itemsize for column in columns)
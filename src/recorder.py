@@ -1,8 +1,37 @@
 import csv
 import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from src.journal import RecordJournal, journal_path_for, truncate_partial_tail
+from src.record_store import TIMING_QUALITY_FIELDS, RecordStore
+
+
+# 加入计时质量列之前的导出字段，合并与读取旧文件时仍然接受
+LEGACY_EXPORT_FIELDNAMES = [
+    "participant_name",
+    "participant_age",
+    "participant_gender",
+    "participant_class",
+    "mode",
+    "trial_index",
+    "question_order",
+    "rule_code",
+    "symbol",
+    "category",
+    "stimulus",
+    "rating_value",
+    "rating_started_at",
+    "rating_confirmed_at",
+    "elapsed_since_display",
+    "trial_elapsed_total",
+    "controls",
+]
+EXPORT_FIELDNAMES = LEGACY_EXPORT_FIELDNAMES + list(TIMING_QUALITY_FIELDS)
 
 
 @dataclass
@@ -26,14 +55,72 @@ class QuestionRecord:
     trial_elapsed_total: float
     rule_code: Optional[str] = None
     controls: Dict[str, Any] = None
+    # 计时质量，见 src.frame_watchdog；旧日志中的记录没有这些字段
+    missed_frames: Optional[int] = None
+    worst_frame_ms: Optional[float] = None
+    total_stall_ms: Optional[float] = None
+    gc_pause_ms: Optional[float] = None
+
+
+class ExportJob:
+    """后台导出任务，供界面查询进度与结果"""
+
+    def __init__(self, total_rows: int) -> None:
+        self.total_rows = total_rows
+        self.written_rows = 0
+        self.result: Optional[str] = None
+        self.error: Optional[BaseException] = None
+        self._done = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def progress(self) -> float:
+        if self.done or self.total_rows <= 0:
+            return 1.0
+        return min(1.0, self.written_rows / self.total_rows)
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[str]:
+        """等待导出结束并返回文件路径；导出失败时抛出原异常"""
+        if not self._done.wait(timeout):
+            raise TimeoutError("导出尚未完成")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def _finish(self, result: Optional[str] = None, error: Optional[BaseException] = None) -> None:
+        self.result = result
+        self.error = error
+        self._done.set()
 
 
 class DataRecorder:
-    """负责记录实验结果并导出 CSV"""
+    """负责记录实验结果并导出 CSV
 
-    def __init__(self, csv_path: str) -> None:
+    每条记录在 record() 时即写入追加式日志（后台线程落盘），进程意外退出也不会丢失
+    已作答的数据；export() 只负责把内存中的记录整理为最终 CSV 并在日志中标记完成。
+    export_async() 在后台线程完成同样的工作，界面线程可通过 ExportJob 查询进度。
+    内存中的记录保存在列式的 RecordStore 中。
+    """
+
+    def __init__(
+        self,
+        csv_path: str,
+        journal: bool = True,
+        export_formats: Optional[Sequence[str]] = None,
+        database_path: Optional[str] = None,
+    ) -> None:
         self._csv_path = csv_path
-        self._records: List[QuestionRecord] = []
+        # CSV 始终导出，其余为附加的列式格式
+        self._extra_formats = [fmt for fmt in (export_formats or []) if fmt != "csv"]
+        self._database_path = database_path
+        self._store = RecordStore()
+        self._journal_enabled = journal
+        self._journal: Optional[RecordJournal] = None
+        self._session_info: Dict[str, Any] = {}
+        self._export_executor: Optional[ThreadPoolExecutor] = None
         self.participant_info: Dict[str, str] = {
             "name": "",
             "age": "",
@@ -41,11 +128,74 @@ class DataRecorder:
             "class": "",
         }
 
+    @property
+    def csv_path(self) -> str:
+        return self._csv_path
+
+    @property
+    def journal_path(self) -> str:
+        return journal_path_for(self._csv_path)
+
+    def __len__(self) -> int:
+        return len(self._store)
+
     def set_participant_info(self, info: Dict[str, str]) -> None:
         for key in self.participant_info.keys():
             if key in info:
                 self.participant_info[key] = str(info[key])
 
+    def set_session_info(self, info: Dict[str, Any]) -> None:
+        """记录恢复会话所需的信息（模式、种子、试次计划、画像顺序），随日志首行写入"""
+        self._session_info = dict(info)
+
+    def restore(self, records: List[QuestionRecord], session_info: Dict[str, Any]) -> None:
+        """载入中断会话已有的记录，并在原日志末尾继续追加"""
+        self._store = RecordStore()
+        for record in records:
+            self._store.append(
+                (
+                    record.participant_name,
+                    record.participant_age,
+                    record.participant_gender,
+                    record.participant_class,
+                ),
+                record.mode,
+                record.trial_index,
+                record.question_order,
+                record.category,
+                record.stimulus,
+                record.symbol,
+                record.rating_value,
+                record.rating_started_at,
+                record.rating_confirmed_at,
+                record.elapsed_since_display,
+                record.trial_elapsed_total,
+                record.rule_code,
+                record.controls,
+                record.missed_frames,
+                record.worst_frame_ms,
+                record.total_stall_ms,
+                record.gc_pause_ms,
+            )
+        self._session_info = dict(session_info)
+        if not self._journal_enabled:
+            return
+        try:
+            if os.path.exists(self.journal_path):
+                truncate_partial_tail(self.journal_path)
+            self._journal = RecordJournal(self.journal_path)
+        except OSError as exc:
+            print(f"警告：无法续写作答日志 {self.journal_path}，本次会话仅保存在内存中。详情：{exc}")
+            self._journal_enabled = False
+            return
+        self._journal.append(
+            {
+                "type": "resumed",
+                "rows": len(self._store),
+                "resumed_at": datetime.now().isoformat(timespec="seconds"),
+            }
+        )
+
     def record(
         self,
         mode: str,
@@ -61,85 +211,194 @@ class DataRecorder:
         trial_elapsed_total: float,
         rule_code: Optional[str] = None,
         controls: Optional[Dict[str, Any]] = None,
+        missed_frames: Optional[int] = None,
+        worst_frame_ms: Optional[float] = None,
+        total_stall_ms: Optional[float] = None,
+        gc_pause_ms: Optional[float] = None,
     ) -> None:
         info = self.participant_info
-        control_payload = controls.copy() if controls else {}
-        self._records.append(
-            QuestionRecord(
-                participant_name=info.get("name", ""),
-                participant_age=info.get("age", ""),
-                participant_gender=info.get("gender", ""),
-                participant_class=info.get("class", ""),
-                mode=mode,
-                trial_index=trial_index,
-                question_order=question_order,
-                category=category,
-                stimulus=stimulus,
-                symbol=symbol,
-                rating_value=rating_value,
-                rating_started_at=rating_started_at,
-                rating_confirmed_at=rating_confirmed_at,
-                elapsed_since_display=elapsed_since_display,
-                trial_elapsed_total=trial_elapsed_total,
-                rule_code=rule_code,
-                controls=control_payload,
-            )
+        participant = (info.get("name", ""), info.get("age", ""), info.get("gender", ""), info.get("class", ""))
+        self._store.append(
+            participant,
+            mode,
+            trial_index,
+            question_order,
+            category,
+            stimulus,
+            symbol,
+            rating_value,
+            rating_started_at,
+            rating_confirmed_at,
+            elapsed_since_display,
+            trial_elapsed_total,
+            rule_code,
+            controls,
+            missed_frames,
+            worst_frame_ms,
+            total_stall_ms,
+            gc_pause_ms,
         )
+        journal = self._open_journal()
+        if journal is not None:
+            journal.append({"type": "record", "record": self._store.row(len(self._store) - 1)})
 
+    def _open_journal(self) -> Optional[RecordJournal]:
+        # 首次记录时才创建日志，未作答的会话不会留下空文件
+        if self._journal is None and self._journal_enabled:
+            try:
+                self._journal = RecordJournal(self.journal_path)
+            except OSError as exc:
+                print(f"警告：无法创建作答日志 {self.journal_path}，本次会话仅保存在内存中。详情：{exc}")
+                self._journal_enabled = False
+                return None
+            self._journal.append(
+                {
+                    "type": "session",
+                    "csv_path": self._csv_path,
+                    "participant": dict(self.participant_info),
+                    "created_at": datetime.now().isoformat(timespec="seconds"),
+                    "session": self._session_info,
+                }
+            )
+        return self._journal
 
     def export(self) -> Optional[str]:
-        if not self._records:
-            return None
-        os.makedirs(os.path.dirname(self._csv_path), exist_ok=True)
-        fieldnames = [
-            "participant_name",
-            "participant_age",
-            "participant_gender",
-            "participant_class",
-            "mode",
-            "trial_index",
-            "question_order",
-            "rule_code",
-            "symbol",
-            "category",
-            "stimulus",
-            "rating_value",
-            "rating_started_at",
-            "rating_confirmed_at",
-            "elapsed_since_display",
-            "trial_elapsed_total",
-            "controls",
-        ]
-        sorted_records = sorted(
-            self._records,
-            key=lambda rec: (rec.mode, rec.trial_index, rec.question_order),
-        )
-        with open(self._csv_path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            for record in sorted_records:
-                controls = record.controls or {}
-                row = {
-                    "participant_name": record.participant_name,
-                    "participant_age": record.participant_age,
-                    "participant_gender": record.participant_gender,
-                    "participant_class": record.participant_class,
-                    "mode": record.mode,
-                    "trial_index": record.trial_index,
-                    "question_order": record.question_order,
-                    "rule_code": record.rule_code or "",
-                    "symbol": record.symbol or "",
-                    "category": record.category,
-                    "stimulus": record.stimulus,
-                    "rating_value": "" if record.rating_value is None else record.rating_value,
-                    "rating_started_at": "" if record.rating_started_at is None else record.rating_started_at,
-                    "rating_confirmed_at": record.rating_confirmed_at,
-                    "elapsed_since_display": record.elapsed_since_display,
-                    "trial_elapsed_total": record.trial_elapsed_total,
-                    "controls": json.dumps(controls, ensure_ascii=False) if controls else "",
-                }
-                writer.writerow(row)
-        return self._csv_path
+        return self.export_async().wait()
+
+    def export_async(self) -> ExportJob:
+        """在后台线程导出当前全部记录；调用之后新增的记录不影响本次导出"""
+        # 记录表只追加，快照只需记下当前行数
+        store, count = self._store, len(self._store)
+        job = ExportJob(count)
+        if not count:
+            job._finish()
+            return job
+        if self._export_executor is None:
+            self._export_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="record-export")
+        # 单线程执行器保证多次导出按提交顺序完成，后一次总会覆盖前一次
+        self._export_executor.submit(self._run_export, store, count, self._session_info, job, self._journal)
+        return job
+
+    def close(self, wait: bool = False) -> None:
+        """停止后台线程；未完成的导出会先写完，再关闭日志"""
+        journal, self._journal = self._journal, None
+        executor, self._export_executor = self._export_executor, None
+        if executor is not None:
+            if journal is not None:
+                executor.submit(journal.close)
+            executor.shutdown(wait=wait)
+        elif journal is not None:
+            journal.close()
+
+    def _run_export(
+        self,
+        store: RecordStore,
+        count: int,
+        session_info: Dict[str, Any],
+        job: ExportJob,
+        journal: Optional[RecordJournal],
+    ) -> None:
+        try:
+            directory = os.path.dirname(self._csv_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # 先写临时文件再替换，中途退出也不会留下半个 CSV
+            temp_path = f"{self._csv_path}.tmp"
+            rows = self._iter_rows(store, count)
+            if self._extra_formats or self._database_path:
+                rows = list(rows)
+            with open(temp_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=EXPORT_FIELDNAMES)
+                writer.writeheader()
+                for row in rows:
+                    writer.writerow(row)
+                    job.written_rows += 1
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self._csv_path)
+            self._export_extra_formats(rows, session_info)
+            self._export_to_database(rows, session_info)
+            if journal is not None and journal.error is None:
+                journal.append({"type": "finalized", "csv_path": self._csv_path, "rows": count})
+                journal.flush()
+        except Exception as exc:
+            print(f"警告：导出结果文件失败（{self._csv_path}），作答日志仍保留全部记录。详情：{exc}")
+            job._finish(error=exc)
+            return
+        job._finish(result=self._csv_path)
+
+    def _export_extra_formats(self, rows: List[Dict[str, Any]], session_info: Dict[str, Any]) -> None:
+        if not self._extra_formats:
+            return
+        from src.columnar import write_columnar
+        from src.relational_export import write_relational
+
+        for fmt in self._extra_formats:
+            try:
+                if fmt == "relational":
+                    write_relational(rows, self._csv_path, session_info)
+                else:
+                    write_columnar(rows, self._csv_path, fmt)
+            except Exception as exc:
+                print(f"警告：{fmt} 格式导出失败，CSV 不受影响。详情：{exc}")
+
+    def _export_to_database(self, rows: List[Dict[str, Any]], session_info: Dict[str, Any]) -> None:
+        if not self._database_path:
+            return
+        import sqlite3
+
+        from src.results_db import write_session
+
+        try:
+            write_session(self._database_path, rows, self._csv_path, session_info)
+        except (sqlite3.Error, OSError) as exc:
+            print(f"警告：写入结果库失败（{self._database_path}），CSV 不受影响。详情：{exc}")
+
+    def _iter_rows(self, store: Optional[RecordStore] = None, count: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        store = self._store if store is None else store
+        for (
+            participant,
+            mode,
+            trial_index,
+            question_order,
+            category,
+            stimulus,
+            symbol,
+            rating_value,
+            rating_started_at,
+            rating_confirmed_at,
+            elapsed_since_display,
+            trial_elapsed_total,
+            rule_code,
+            controls,
+            missed_frames,
+            worst_frame_ms,
+            total_stall_ms,
+            gc_pause_ms,
+        ) in store.iter_rows(count):
+            yield {
+                "participant_name": participant[0],
+                "participant_age": participant[1],
+                "participant_gender": participant[2],
+                "participant_class": participant[3],
+                "mode": mode,
+                "trial_index": trial_index,
+                "question_order": question_order,
+                "rule_code": rule_code or "",
+                "symbol": symbol or "",
+                "category": category,
+                "stimulus": stimulus,
+                "rating_value": "" if rating_value is None else rating_value,
+                "rating_started_at": "" if rating_started_at is None else rating_started_at,
+                "rating_confirmed_at": rating_confirmed_at,
+                "elapsed_since_display": elapsed_since_display,
+                "trial_elapsed_total": trial_elapsed_total,
+                "controls": controls,
+                "missed_frames": "" if missed_frames is None else missed_frames,
+                "worst_frame_ms": "" if worst_frame_ms is None else worst_frame_ms,
+                "total_stall_ms": "" if total_stall_ms is None else total_stall_ms,
+                "gc_pause_ms": "" if gc_pause_ms is None else gc_pause_ms,
+            }
 
     def clear(self) -> None:
-        self._records.clear()
+        self._store = RecordStore()
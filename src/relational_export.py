@@ -0,0 +1,206 @@
+"""结果的规范化导出：把宽表 CSV 拆成被试、会话、试次、controls 与题目五张表。
+
+宽表每行都重复被试信息与完整的 controls JSON；规范化后它们各只保存一份，题目表只
+保留外键。被试与 controls 的编号由内容哈希得到，合并多个会话时同一取值的编号相同，
+按编号取并集即可。denormalize() 可从这些表还原出与原 CSV 逐字节一致的宽表；没有
+计时质量列的旧版表格还原时这些列为空。
+
+用法：python -m src.relational_export data/*.tables -o merged.csv
+"""
+
+import argparse
+import csv
+import hashlib
+import os
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from src.record_store import TIMING_QUALITY_FIELDS
+from src.recorder import EXPORT_FIELDNAMES
+
+
+TABLES_SUFFIX = ".tables"
+
+PARTICIPANT_FIELDS = ["participant_id", "participant_name", "participant_age", "participant_gender", "participant_class"]
+SESSION_FIELDS = ["session_id", "participant_id", "source_csv", "seed", "total_trials"]
+TRIAL_FIELDS = ["session_id", "mode", "trial_index", "rule_code", "question_count"]
+CONTROL_FIELDS = ["controls_id", "controls"]
+QUESTION_FIELDS = [
+    "session_id",
+    "mode",
+    "trial_index",
+    "question_order",
+    "symbol",
+    "category",
+    "stimulus",
+    "rating_value",
+    "rating_started_at",
+    "rating_confirmed_at",
+    "elapsed_since_display",
+    "trial_elapsed_total",
+    *TIMING_QUALITY_FIELDS,
+    "controls_id",
+]
+
+TABLE_FIELDS: Dict[str, List[str]] = {
+    "participants": PARTICIPANT_FIELDS,
+    "sessions": SESSION_FIELDS,
+    "trials": TRIAL_FIELDS,
+    "controls": CONTROL_FIELDS,
+    "questions": QUESTION_FIELDS,
+}
+
+Tables = Dict[str, List[Dict[str, Any]]]
+
+
+def tables_path_for(csv_path: str) -> str:
+    stem, ext = os.path.splitext(csv_path)
+    base = stem if ext.lower() == ".csv" else csv_path
+    return f"{base}{TABLES_SUFFIX}"
+
+
+def content_id(*parts: Any) -> str:
+    """由内容得到的短编号，跨会话稳定"""
+    digest = hashlib.sha1("\x1f".join(str(part) for part in parts).encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+def normalize_rows(
+    rows: Iterable[Dict[str, Any]],
+    source_csv: str,
+    session_info: Optional[Dict[str, Any]] = None,
+) -> Tables:
+    """把一个会话的宽表行（与 CSV 写入的字典相同）拆成规范化的表"""
+    session_info = session_info or {}
+    session_id = content_id(os.path.basename(source_csv))
+    participants: Dict[str, Dict[str, Any]] = {}
+    controls: Dict[str, Dict[str, Any]] = {}
+    trials: Dict[Tuple[str, Any], Dict[str, Any]] = {}
+    questions: List[Dict[str, Any]] = []
+    for row in rows:
+        person = tuple(row[name] for name in PARTICIPANT_FIELDS[1:])
+        participant_id = content_id(*person)
+        if participant_id not in participants:
+            participants[participant_id] = dict(zip(PARTICIPANT_FIELDS, (participant_id, *person)))
+        controls_text = row["controls"]
+        controls_id = content_id(controls_text) if controls_text else ""
+        if controls_id and controls_id not in controls:
+            controls[controls_id] = {"controls_id": controls_id, "controls": controls_text}
+        trial_key = (row["mode"], row["trial_index"])
+        trial = trials.get(trial_key)
+        if trial is None:
+            trial = trials[trial_key] = {
+                "session_id": session_id,
+                "mode": row["mode"],
+                "trial_index": row["trial_index"],
+                "rule_code": row["rule_code"],
+                "question_count": 0,
+            }
+        elif trial["rule_code"] != row["rule_code"]:
+            raise ValueError(f"第 {row['trial_index']} 个试次内规则编码不一致，无法规范化")
+        trial["question_count"] += 1
+        question = {name: row.get(name, "") for name in QUESTION_FIELDS[1:-1]}
+        question["session_id"] = session_id
+        question["controls_id"] = controls_id
+        questions.append(question)
+    if len(participants) > 1:
+        raise ValueError("同一会话中出现了多名被试，无法规范化")
+    sessions = [
+        {
+            "session_id": session_id,
+            "participant_id": next(iter(participants), ""),
+            "source_csv": os.path.basename(source_csv),
+            "seed": "" if session_info.get("seed") is None else session_info["seed"],
+            "total_trials": session_info.get("total_trials", ""),
+        }
+    ]
+    return {
+        "participants": list(participants.values()),
+        "sessions": sessions,
+        "trials": list(trials.values()),
+        "controls": list(controls.values()),
+        "questions": questions,
+    }
+
+
+def write_tables(tables: Tables, directory: str) -> str:
+    """写出各表 CSV；先写入临时目录再整体替换"""
+    temp_dir = f"{directory}.tmp"
+    os.makedirs(temp_dir, exist_ok=True)
+    for name, fields in TABLE_FIELDS.items():
+        with open(os.path.join(temp_dir, f"{name}.csv"), "w", newline="", encoding="utf-8") as handle:
+            writer = csv.DictWriter(handle, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(tables[name])
+    if os.path.isdir(directory):
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        os.rmdir(directory)
+    os.replace(temp_dir, directory)
+    return directory
+
+
+def write_relational(
+    rows: Sequence[Dict[str, Any]],
+    csv_path: str,
+    session_info: Optional[Dict[str, Any]] = None,
+) -> str:
+    """为一个会话写出与 CSV 同名的 *.tables 目录，返回目录路径"""
+    return write_tables(normalize_rows(rows, csv_path, session_info), tables_path_for(csv_path))
+
+
+def read_tables(directory: str) -> Tables:
+    tables: Tables = {}
+    for name in TABLE_FIELDS:
+        with open(os.path.join(directory, f"{name}.csv"), "r", newline="", encoding="utf-8") as handle:
+            tables[name] = list(csv.DictReader(handle))
+    return tables
+
+
+def denormalize(tables: Tables) -> Iterator[Dict[str, str]]:
+    """由规范化的表还原宽表行，字段与顺序同 DataRecorder 导出的 CSV"""
+    participants = {row["participant_id"]: row for row in tables["participants"]}
+    sessions = {row["session_id"]: participants[row["participant_id"]] for row in tables["sessions"]}
+    rules = {(row["session_id"], row["mode"], row["trial_index"]): row["rule_code"] for row in tables["trials"]}
+    controls = {row["controls_id"]: row["controls"] for row in tables["controls"]}
+    for question in tables["questions"]:
+        session_id = question["session_id"]
+        person = sessions[session_id]
+        row = {name: person[name] for name in PARTICIPANT_FIELDS[1:]}
+        row.update({name: question.get(name, "") for name in QUESTION_FIELDS[1:-1]})
+        row["rule_code"] = rules[(session_id, question["mode"], question["trial_index"])]
+        row["controls"] = controls[question["controls_id"]] if question["controls_id"] else ""
+        yield {name: row[name] for name in EXPORT_FIELDNAMES}
+
+
+def write_wide_csv(directories: Sequence[str], handle: TextIO) -> int:
+    writer = csv.DictWriter(handle, fieldnames=EXPORT_FIELDNAMES)
+    writer.writeheader()
+    count = 0
+    for directory in directories:
+        for row in denormalize(read_tables(directory)):
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="把规范化导出的 *.tables 目录还原为宽表 CSV")
+    parser.add_argument("directories", nargs="+", help="一个或多个 *.tables 目录")
+    parser.add_argument("-o", "--output", help="输出 CSV 路径，缺省时写到标准输出")
+    args = parser.parse_args(argv)
+    try:
+        if args.output:
+            with open(args.output, "w", newline="", encoding="utf-8") as handle:
+                count = write_wide_csv(args.directories, handle)
+            print(f"已写出 {count} 行：{args.output}")
+        else:
+            write_wide_csv(args.directories, sys.stdout)
+    except (OSError, KeyError) as exc:
+        print(f"错误：无法读取规范化表。详情：{exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+"""题目画面批量渲染：实验前把题库中每道题按实际呈现效果输出为 PNG，供审阅排版。
+
+渲染直接使用正式程序的 ExperimentScene 绘制流程（画像、主体名前缀、自动换行、
+空题位的占位画面、说明与提示），在无显示器模式下按每个目标分辨率输出：
+
+- 拉丁方模式：每个模式的每条规则排成若干试次，规则中每个题位都轮流放入该符号的
+  全部题目，空题位（~）随各试次的上一题一起渲染；
+- 普通模式：每道 moral / immoral 题目分别作为试次的第一题与第二题各出现一次。
+
+画像按文件名顺序轮流分配。题目面板内容（题干、说明、提示）超出 panel_rect 的
+画面会在索引中标记并以非零状态退出。任务按分辨率、模式与规则分块，在进程池中渲染。
+
+用法：python -m src.render_review --output review --sizes 1920x1080 2880x1800
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pygame
+
+from src.app import configure_headless
+from src.config_loader import Config, ConfigError, load_config
+from src.fonts import create_fonts
+from src.recorder import DataRecorder
+from src.scenes.experiment import ExperimentScene, portrait_files
+from src.session_resume import ResumeState
+from src.stimuli_manager import StimuliManager
+from src.utils.clock import VirtualClock
+from src.utils.paths import resource_path
+from src.utils.png import save_png
+
+
+MODES = ("practice", "formal")
+DEFAULT_SIZES = ("1920x1080",)
+REVIEW_PARTICIPANT = {"name": "示例被试", "age": "20", "gender": "男", "class": "1"}
+INDEX_FIELDS = [
+    "size",
+    "mode",
+    "rule_code",
+    "trial",
+    "order",
+    "symbol",
+    "subject",
+    "stimulus",
+    "slider",
+    "overflow",
+    "overflow_px",
+    "file",
+]
+
+
+@dataclass
+class ReviewJob:
+    """一块渲染任务：同一分辨率、模式与规则下连续的若干试次"""
+
+    size: Tuple[int, int]
+    mode: str
+    label: str
+    start: int
+    trials: List[Dict[str, Any]]
+    portraits: List[str]
+    output_dir: str
+
+
+@dataclass
+class ReviewEntry:
+    size: str
+    mode: str
+    rule_code: str
+    trial: int
+    order: int
+    symbol: str
+    subject: str
+    stimulus: str
+    slider: bool
+    overflow: bool
+    overflow_px: int
+    file: str
+
+
+def parse_size(text: str) -> Tuple[int, int]:
+    width, sep, height = text.lower().partition("x")
+    try:
+        size = (int(width), int(height))
+    except ValueError:
+        size = (0, 0)
+    if not sep or size[0] <= 0 or size[1] <= 0:
+        raise ValueError(f"分辨率格式应为 宽x高，例如 1920x1080，实际为 {text}")
+    return size
+
+
+def review_trials(stimuli: StimuliManager, mode: str) -> Dict[str, List[Dict[str, Any]]]:
+    """按规则排出覆盖全部题目的试次（export_run 的格式），键为规则代码"""
+    bank = stimuli.question_bank()
+    codes = stimuli.rule_codes(mode)
+    plans: Dict[str, List[Dict[str, Any]]] = {}
+    if not codes:
+        moral, immoral = bank.get("moral", []), bank.get("immoral", [])
+        count = max(len(moral), len(immoral))
+        trials = []
+        for index in range(count):
+            pair = [(moral, "moral"), (immoral, "immoral")]
+            for first, second in (pair, pair[::-1]):
+                questions = [
+                    [texts[index % len(texts)], category, category]
+                    for texts, category in (first, second)
+                    if texts
+                ]
+                trials.append({"rule_code": None, "questions": questions})
+        plans["standard"] = trials
+        return plans
+    for code in codes:
+        if code in plans:
+            continue
+        symbols = list(code)
+        count = max((len(bank.get(symbol, [])) for symbol in symbols if symbol != "~"), default=0)
+        trials = []
+        for index in range(count):
+            questions = []
+            for symbol in symbols:
+                texts = bank.get(symbol, [])
+                text = texts[index % len(texts)] if symbol != "~" and texts else None
+                questions.append([text, symbol, symbol if symbol != "~" else "none"])
+            trials.append({"rule_code": code, "questions": questions})
+        plans[code] = trials
+    return plans
+
+
+def build_jobs(
+    stimuli: StimuliManager,
+    portraits: Sequence[str],
+    sizes: Sequence[Tuple[int, int]],
+    modes: Sequence[str],
+    output_dir: str,
+) -> List[ReviewJob]:
+    """每块的试次数不超过画像数（场景要求每个试次一张不同的画像）"""
+    if not portraits:
+        raise ValueError("画像目录中没有图片，无法渲染题目画面")
+    chunk = len(portraits)
+    jobs: List[ReviewJob] = []
+    for size in sizes:
+        for mode in modes:
+            for label, trials in review_trials(stimuli, mode).items():
+                for start in range(0, len(trials), chunk):
+                    part = trials[start:start + chunk]
+                    names = [portraits[(start + index) % len(portraits)] for index in range(len(part))]
+                    jobs.append(ReviewJob(size, mode, label, start, part, names, output_dir))
+    return jobs
+
+
+_worker_state: Optional[Tuple[Config, StimuliManager, Dict[float, Dict[str, pygame.font.Font]]]] = None
+
+
+def _init_worker(config_path: Optional[str]) -> None:
+    global _worker_state
+    configure_headless()
+    pygame.init()
+    # 画像解码需要显示模式；实际绘制在各分辨率的离屏表面上进行
+    pygame.display.set_mode((1, 1))
+    config = load_config(config_path)
+    _worker_state = (config, StimuliManager(resource_path("stimuli.csv"), config), {})
+
+
+def _fonts_for(scale: float) -> Dict[str, pygame.font.Font]:
+    assert _worker_state is not None
+    config, _, fonts = _worker_state
+    if scale not in fonts:
+        fonts[scale] = create_fonts(config, scale, resource_path("stimuli.csv"))
+    return fonts[scale]
+
+
+def _render_job(job: ReviewJob) -> List[ReviewEntry]:
+    assert _worker_state is not None
+    config, stimuli, _ = _worker_state
+    base_width = config.window.get("width", 1920)
+    base_height = config.window.get("height", 1080)
+    width, height = job.size
+    scale = min(width / base_width, height / base_height) if base_width and base_height else 1.0
+    surface = pygame.Surface(job.size)
+    size_label = f"{width}x{height}"
+    directory = os.path.join(job.output_dir, size_label, job.mode)
+    os.makedirs(directory, exist_ok=True)
+
+    # 借用会话恢复的入口注入试次计划与画像顺序，之后按计时节点推进
+    clock = VirtualClock()
+    resume = ResumeState(
+        journal_path="",
+        csv_path="",
+        mode=job.mode,
+        participant_info=dict(REVIEW_PARTICIPANT),
+        seed=0,
+        total_trials=len(job.trials),
+        run_plan={"rule_plan": [trial["rule_code"] for trial in job.trials if trial["rule_code"]], "trials": job.trials},
+        portraits=list(job.portraits),
+    )
+    scene = ExperimentScene(
+        screen=surface,
+        config=config,
+        fonts=_fonts_for(scale),
+        stimuli=stimuli,
+        # 不会导出：最后一题渲染后不再确认
+        recorder=DataRecorder(os.devnull, journal=False),
+        mode=job.mode,
+        participant_info=dict(REVIEW_PARTICIPANT),
+        scale=scale,
+        on_finish=lambda: None,
+        resume=resume,
+        clock=clock,
+    )
+    remaining = sum(len(trial["questions"]) for trial in job.trials)
+    entries: List[ReviewEntry] = []
+    while remaining:
+        deadline = scene.next_deadline()
+        if scene.state != "question":
+            if deadline is None:
+                raise RuntimeError(f"渲染 {job.label} 时场景停在 {scene.state} 状态")
+            clock.advance_to(deadline)
+            scene.update(0.0)
+            continue
+        scene.draw()
+        name = f"{job.label}_{job.start + scene.current_trial:03d}_{scene.current_question_order}.png"
+        save_png(surface, os.path.join(directory, name))
+        panel = scene.layout.panel_rect
+        content = scene.question_content_rect or panel
+        overflow_px = max(
+            panel.top - content.top,
+            content.bottom - panel.bottom,
+            panel.left - content.left,
+            content.right - panel.right,
+            0,
+        )
+        entries.append(
+            ReviewEntry(
+                size=size_label,
+                mode=job.mode,
+                rule_code=scene.current_rule_code or "",
+                trial=job.start + scene.current_trial,
+                order=scene.current_question_order,
+                symbol=scene.current_symbol or "",
+                subject=scene.current_subject_name,
+                stimulus=scene.current_question_text or "",
+                slider=scene.slider_visible,
+                overflow=overflow_px > 0,
+                overflow_px=overflow_px,
+                file=os.path.relpath(os.path.join(directory, name), job.output_dir),
+            )
+        )
+        remaining -= 1
+        if remaining:
+            confirm = scene.confirm_button.rect.center
+            scene.handle_event(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=confirm, button=1))
+    return entries
+
+
+def render_review(
+    config_path: Optional[str],
+    output_dir: str,
+    sizes: Sequence[Tuple[int, int]],
+    modes: Sequence[str] = MODES,
+    workers: Optional[int] = None,
+) -> List[ReviewEntry]:
+    config = load_config(config_path)
+    stimuli = StimuliManager(resource_path("stimuli.csv"), config)
+    portraits = [file.stem for file in portrait_files(config)]
+    jobs = build_jobs(stimuli, portraits, sizes, modes, output_dir)
+    workers = min(workers or os.cpu_count() or 1, len(jobs)) or 1
+    if workers <= 1:
+        _init_worker(config_path)
+        parts = [_render_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(config_path,)) as executor:
+            parts = list(executor.map(_render_job, jobs))
+    entries = [entry for part in parts for entry in part]
+    with open(os.path.join(output_dir, "index.csv"), "w", newline="", encoding="utf-8-sig") as handle:
+        writer = csv.DictWriter(handle, fieldnames=INDEX_FIELDS)
+        writer.writeheader()
+        for entry in entries:
+            writer.writerow(asdict(entry))
+    return entries
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="题目画面批量渲染：把题库中每道题按实际呈现效果输出为 PNG")
+    parser.add_argument("--output", required=True, help="输出目录")
+    parser.add_argument("--sizes", nargs="+", default=list(DEFAULT_SIZES), help="目标分辨率，如 1920x1080 2880x1800")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认 CPU 核数")
+    parser.add_argument("--config", help="配置文件路径")
+    args = parser.parse_args(argv)
+
+    try:
+        sizes = [parse_size(text) for text in args.sizes]
+        os.makedirs(args.output, exist_ok=True)
+        start = time.perf_counter()
+        entries = render_review(args.config, args.output, sizes, args.modes, args.workers)
+    except (ConfigError, ValueError, RuntimeError) as exc:
+        print(f"错误：{exc}", file=sys.stderr)
+        return 1
+    overflow = [entry for entry in entries if entry.overflow]
+    print(f"已渲染 {len(entries)} 个画面（用时 {time.perf_counter() - start:.2f} s），索引：{os.path.join(args.output, 'index.csv')}")
+    for entry in overflow:
+        print(f"警告：{entry.size} {entry.file} 的内容超出题目面板 {entry.overflow_px} 像素：{entry.stimulus}")
+    return 1 if overflow else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,565 @@
+"""会话回放：按作答日志与输入日志确定性地重现被试看到的每一帧，并核对重新生成的导出。
+
+回放以无显示器模式运行正式程序中的 ExperimentScene：种子、试次计划与画像顺序取自
+作答日志（<结果 CSV>.journal.jsonl），输入事件取自输入日志（<结果 CSV>.inputs.jsonl），
+时间由虚拟时钟驱动——每道题在日志记录的时刻呈现，确认点击落在记录的确认时刻，
+其余时间按 --fps 均匀取帧，空等的时段不必真实等待，回放通常远快于真实时间。
+
+没有输入日志的题目（旧数据或恢复前的部分）按记录合成输入：在反应时的 60% 处把
+评分条拖到记录的评分，在确认时刻点击「确认」。会话中途恢复过的，在恢复点按原程序
+的做法从日志重建场景。
+
+每一帧交给后台线程输出：
+- png：PNG 图像序列，相同画面只编码一次；frames.csv 记录每帧时刻与文件，
+  frames.ffconcat 可直接用 ffmpeg -f concat -i frames.ffconcat 合成可变帧率视频；
+- raw：按 --fps 恒定帧率写出 RGB24 原始视频流（可以是命名管道），
+  如 ffmpeg -f rawvideo -pix_fmt rgb24 -s 1920x1080 -r 30 -i frames.rgb out.mp4。
+
+用法：python -m src.replay data/张三_formal_results_20240101_120000.csv --output replay_out
+"""
+
+import argparse
+import csv
+import math
+import os
+import queue
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import List, Optional, Sequence, Tuple
+
+import pygame
+
+from src.bot import DRAG_FRACTION, click_events, drag_events
+from src.config_loader import Config
+from src.input_log import input_log_path_for, read_input_log
+from src.journal import JOURNAL_SUFFIX, journal_path_for, read_journal
+from src.record_store import TIMING_QUALITY_FIELDS
+from src.recorder import EXPORT_FIELDNAMES, DataRecorder, QuestionRecord
+from src.scenes.experiment import ExperimentScene
+from src.session_resume import ResumeState, load_resume_state
+from src.stimuli_manager import StimuliManager
+from src.utils.clock import VirtualClock
+from src.utils.png import encode_png
+
+
+FRAME_FORMATS = ("png", "raw", "none")
+DEFAULT_FPS = 30
+# 最后一个事件之后继续回放的秒数，完成页也会出现在输出中
+TAIL_SECONDS = 1.0
+TIME_FIELDS = ("rating_started_at", "rating_confirmed_at", "elapsed_since_display", "trial_elapsed_total")
+# 计时质量取决于原始运行时机器的帧时序，回放中不可复现，不参与比对
+IGNORED_FIELDS = TIMING_QUALITY_FIELDS
+
+
+class FramePool:
+    """复用的帧缓冲表面：渲染线程只做一次 blit，像素转换与编码交给后台线程
+
+    全部表面都在排队时 capture 会阻塞，限制了积压的帧数与内存占用。
+    """
+
+    def __init__(self, template: pygame.Surface, size: int) -> None:
+        self._template = template
+        self._free: "queue.Queue[pygame.Surface]" = queue.Queue()
+        self._remaining = size
+        self._lock = threading.Lock()
+
+    def capture(self, screen: pygame.Surface) -> pygame.Surface:
+        with self._lock:
+            create = self._remaining > 0 and self._free.empty()
+            if create:
+                self._remaining -= 1
+        frame = pygame.Surface(screen.get_size(), 0, self._template) if create else self._free.get()
+        frame.blit(screen, (0, 0))
+        return frame
+
+    def release(self, frame: pygame.Surface) -> None:
+        self._free.put(frame)
+
+
+class PngSequenceSink:
+    """PNG 图像序列输出：按像素校验和去重，画面变化时才提交编码"""
+
+    constant_rate = False
+
+    def __init__(self, directory: str, screen: pygame.Surface, workers: int) -> None:
+        self.directory = directory
+        self.size = screen.get_size()
+        os.makedirs(directory, exist_ok=True)
+        self._pool = FramePool(screen, workers * 2)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="frame-encode")
+        self._futures: List[Future] = []
+        self._previous: Optional[int] = None
+        self._frames: List[Tuple[float, str]] = []
+        self.encoded = 0
+
+    def write(self, t: float, screen: pygame.Surface) -> None:
+        # 校验和直接读取屏幕像素，不复制；大多数帧与上一帧相同，到此为止
+        checksum = zlib.crc32(screen.get_view("1"))
+        if checksum != self._previous:
+            name = f"frame_{self.encoded:06d}.png"
+            frame = self._pool.capture(screen)
+            self._futures.append(self._executor.submit(self._encode, os.path.join(self.directory, name), frame))
+            self._previous = checksum
+            self.encoded += 1
+        self._frames.append((t, f"frame_{self.encoded - 1:06d}.png"))
+
+    def _encode(self, path: str, frame: pygame.Surface) -> None:
+        try:
+            data = pygame.image.tobytes(frame, "RGB")
+        finally:
+            self._pool.release(frame)
+        with open(path, "wb") as handle:
+            handle.write(encode_png(data, self.size))
+
+    def close(self, end_time: float) -> None:
+        self._executor.shutdown(wait=True)
+        for future in self._futures:
+            future.result()
+        with open(os.path.join(self.directory, "frames.csv"), "w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["frame", "time", "file"])
+            for index, (t, name) in enumerate(self._frames):
+                writer.writerow([index, f"{t:.6f}", name])
+        # 连续相同的画面合并为一段，时长为到下一次画面变化为止
+        segments: List[Tuple[str, float]] = []
+        for t, name in self._frames:
+            if segments and segments[-1][0] == name:
+                continue
+            segments.append((name, t))
+        with open(os.path.join(self.directory, "frames.ffconcat"), "w", encoding="utf-8") as handle:
+            handle.write("ffconcat version 1.0\n")
+            for index, (name, start) in enumerate(segments):
+                stop = segments[index + 1][1] if index + 1 < len(segments) else end_time
+                handle.write(f"file '{name}'\nduration {max(stop - start, 0.0):.6f}\n")
+            if segments:
+                handle.write(f"file '{segments[-1][0]}'\n")
+
+    @property
+    def frames(self) -> int:
+        return len(self._frames)
+
+
+class RawVideoSink:
+    """恒定帧率的 RGB24 原始视频流，由后台线程按顺序转换并写出"""
+
+    constant_rate = True
+
+    def __init__(self, path: str, screen: pygame.Surface, workers: int) -> None:
+        self.path = path
+        self._handle = open(path, "wb")
+        self._pool = FramePool(screen, max(2, workers * 2))
+        self._queue: "queue.Queue[Optional[pygame.Surface]]" = queue.Queue()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="frame-writer", daemon=True)
+        self._thread.start()
+        self.frames = 0
+
+    @property
+    def encoded(self) -> int:
+        return self.frames
+
+    def write(self, t: float, screen: pygame.Surface) -> None:
+        if self._error is not None:
+            raise self._error
+        self._queue.put(self._pool.capture(screen))
+        self.frames += 1
+
+    def _run(self) -> None:
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                return
+            try:
+                if self._error is None:
+                    self._handle.write(pygame.image.tobytes(frame, "RGB"))
+            except OSError as exc:
+                self._error = exc
+            finally:
+                self._pool.release(frame)
+
+    def close(self, end_time: float) -> None:
+        self._queue.put(None)
+        self._thread.join()
+        self._handle.close()
+        if self._error is not None:
+            raise self._error
+
+
+@dataclass
+class TimelineEntry:
+    """回放时间轴上的一个节点"""
+
+    time: float
+    kind: str  # present / input / drag / confirm / resume
+    events: List[pygame.event.Event] = field(default_factory=list)
+    record: Optional[QuestionRecord] = None
+    rows: int = 0
+
+
+@dataclass
+class ReplayResult:
+    csv_path: str
+    session_seconds: float
+    wall_seconds: float
+    frames: int = 0
+    encoded: int = 0
+    synthesized: int = 0
+
+    @property
+    def speedup(self) -> float:
+        return self.session_seconds / self.wall_seconds if self.wall_seconds > 0 else math.inf
+
+
+def presented_at(record: QuestionRecord) -> float:
+    """题目呈现时刻（相对实验开始）"""
+    if record.rating_started_at is not None:
+        return record.rating_started_at
+    return record.rating_confirmed_at - record.elapsed_since_display
+
+
+def resume_points(journal_path: str) -> List[int]:
+    """最后一个会话中每次恢复时已有的记录数"""
+    points: List[int] = []
+    for entry in read_journal(journal_path):
+        kind = entry.get("type")
+        if kind == "session":
+            points = []
+        elif kind == "resumed":
+            points.append(int(entry.get("rows", 0)))
+    return points
+
+
+def build_timeline(
+    state: ResumeState,
+    batches: Sequence[Tuple[float, str, int, int, List[pygame.event.Event]]],
+    resumes: Sequence[int] = (),
+) -> Tuple[List[TimelineEntry], int]:
+    """按记录与输入日志排出回放时间轴，返回 (时间轴, 合成输入的题数)
+
+    输入日志中每道题的最后一批事件即触发确认的那一批，对齐到记录的确认时刻；
+    同一题更早的事件限制在呈现与确认之间。
+    """
+    by_question = {}
+    others: List[TimelineEntry] = []
+    for t, scene_state, trial, order, events in batches:
+        if scene_state == "question":
+            by_question.setdefault((trial, order), []).append((t, events))
+        else:
+            others.append(TimelineEntry(max(t, 0.0), "input", events))
+
+    entries: List[TimelineEntry] = []
+    synthesized = 0
+    for index, record in enumerate(state.records, start=1):
+        start = presented_at(record)
+        confirm = record.rating_confirmed_at
+        entries.append(TimelineEntry(start, "present", record=record))
+        logged = by_question.pop((record.trial_index, record.question_order), None)
+        if logged:
+            for t, events in logged[:-1]:
+                entries.append(TimelineEntry(min(max(t, start), confirm), "input", events))
+            entries.append(TimelineEntry(confirm, "input", logged[-1][1], record=record))
+        else:
+            synthesized += 1
+            entries.append(TimelineEntry(start + DRAG_FRACTION * (confirm - start), "drag", record=record))
+            entries.append(TimelineEntry(confirm, "confirm", record=record))
+        if index in resumes:
+            entries.append(TimelineEntry(confirm, "resume", record=record, rows=index))
+    # 未作答完的题目（例如中途按 Esc 退出）保留原始时刻
+    for logged in by_question.values():
+        others.extend(TimelineEntry(max(t, 0.0), "input", events) for t, events in logged)
+    # 稳定排序：同一时刻按题目内的先后顺序处理
+    timeline = sorted(entries + others, key=lambda entry: entry.time)
+    return timeline, synthesized
+
+
+def compare_exports(original: str, replayed: str, tolerance: float) -> List[str]:
+    """逐行逐列比对两份导出；时间列允许 tolerance 秒的误差，计时质量列不比对"""
+    with open(original, "r", encoding="utf-8-sig", newline="") as handle:
+        expected = list(csv.DictReader(handle))
+    with open(replayed, "r", encoding="utf-8-sig", newline="") as handle:
+        actual = list(csv.DictReader(handle))
+    differences: List[str] = []
+    if len(expected) != len(actual):
+        differences.append(f"行数不同：原始 {len(expected)} 行，回放 {len(actual)} 行")
+    for line, (left, right) in enumerate(zip(expected, actual), start=1):
+        for name in EXPORT_FIELDNAMES:
+            if name in IGNORED_FIELDS:
+                continue
+            a, b = left.get(name, ""), right.get(name, "")
+            if a == b:
+                continue
+            if name in TIME_FIELDS and a and b:
+                try:
+                    if abs(float(a) - float(b)) <= tolerance:
+                        continue
+                except ValueError:
+                    pass
+            differences.append(f"第 {line} 行 {name}：原始 {a}，回放 {b}")
+    return differences
+
+
+class SessionReplay:
+    """在虚拟时钟上重新运行一个会话"""
+
+    def __init__(
+        self,
+        config: Config,
+        stimuli: StimuliManager,
+        app,
+        journal_path: str,
+        output_dir: str,
+        fps: int = DEFAULT_FPS,
+        frame_format: str = "png",
+        workers: int = 1,
+        input_log: Optional[str] = None,
+    ) -> None:
+        if fps <= 0:
+            raise ValueError("回放帧率必须为正数")
+        if frame_format not in FRAME_FORMATS:
+            raise ValueError(f"未知的帧输出格式：{frame_format}，可选 {'、'.join(FRAME_FORMATS)}")
+        state = load_resume_state(journal_path, include_finalized=True)
+        if state is None:
+            raise ValueError(f"作答日志中没有可回放的会话：{journal_path}")
+        if state.seed is None:
+            raise ValueError("作答日志中没有随机种子，无法确定性回放")
+        if state.screen_size is not None and app.screen.get_size() != state.screen_size:
+            width, height = state.screen_size
+            raise ValueError(f"回放窗口为 {app.screen.get_size()[0]}x{app.screen.get_size()[1]}，原会话为 {width}x{height}")
+        if state.scale is not None and abs(app.scale - state.scale) > 1e-6:
+            # 同一尺寸下缩放不同说明配置的基准尺寸已改变，评分条位置会与原会话不同
+            print(f"警告：回放缩放 {app.scale:.4f} 与原会话 {state.scale:.4f} 不一致，请使用原会话的配置文件")
+        elif state.screen_size is None:
+            print("提示：作答日志中没有窗口尺寸（旧版日志），按配置的基准尺寸回放")
+        self.config = config
+        self.stimuli = stimuli
+        self.app = app
+        self.state = state
+        self.journal_path = journal_path
+        self.output_dir = output_dir
+        self.fps = fps
+        self.frame_format = frame_format
+        self.workers = max(1, workers)
+        self.input_log = input_log
+        self.clock = VirtualClock()
+        self.csv_path = os.path.join(output_dir, os.path.basename(journal_path[: -len(JOURNAL_SUFFIX)]))
+        self.recorder = DataRecorder(self.csv_path, journal=False)
+        self.recorder.set_participant_info(state.participant_info)
+        self._finished = False
+
+    def _build_scene(self, resume: Optional[ResumeState] = None) -> ExperimentScene:
+        app = self.app
+        return ExperimentScene(
+            screen=app.screen,
+            config=self.config,
+            fonts=app.fonts,
+            stimuli=self.stimuli,
+            recorder=self.recorder,
+            mode=self.state.mode,
+            participant_info=dict(self.state.participant_info),
+            scale=app.scale,
+            on_finish=self._finish,
+            total_trials_override=self.state.total_trials,
+            seed=self.state.seed,
+            resume=resume,
+            clock=self.clock,
+        )
+
+    def _finish(self) -> None:
+        self._finished = True
+
+    def _open_sink(self):
+        screen = self.app.screen
+        if self.frame_format == "png":
+            return PngSequenceSink(os.path.join(self.output_dir, "frames"), screen, self.workers)
+        if self.frame_format == "raw":
+            return RawVideoSink(os.path.join(self.output_dir, "frames.rgb"), screen, self.workers)
+        return None
+
+    def _apply(self, entry: TimelineEntry, scene: ExperimentScene) -> ExperimentScene:
+        record = entry.record
+        if entry.kind == "resume":
+            # 与原程序一致：从日志中的前 rows 条记录重建场景，时间轴接续上一次确认
+            return self._build_scene(replace(self.state, records=self.state.records[: entry.rows]))
+        if entry.kind == "drag":
+            if scene.state == "question" and scene.slider_visible and record.rating_value is not None:
+                if scene.slider.value != record.rating_value:
+                    start = scene.slider.position_of(scene.slider.value)
+                    end = scene.slider.position_of(record.rating_value)
+                    entry.events = drag_events(start, end)
+        elif entry.kind == "confirm":
+            entry.events = click_events(scene.confirm_button.rect.center)
+        for event in entry.events:
+            scene.handle_event(event)
+            if self._finished:
+                break
+        return scene
+
+    def run(self) -> ReplayResult:
+        batches = []
+        if self.input_log and os.path.exists(self.input_log):
+            batches = read_input_log(self.input_log, seed=self.state.seed)
+        timeline, synthesized = build_timeline(self.state, batches, resume_points(self.journal_path))
+        presents = [index for index, entry in enumerate(timeline) if entry.kind == "present"]
+        end_time = (timeline[-1].time if timeline else 0.0) + TAIL_SECONDS
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.stimuli.restore_run(self.state.mode, self.state.run_plan, 0)
+        started = time.perf_counter()
+        scene = self._build_scene()
+        if self.state.portraits and scene.portrait_names() != self.state.portraits:
+            raise ValueError("画像目录与原会话不一致，同一种子抽到的画像顺序不同，无法回放")
+
+        sink = self._open_sink()
+        position = 0
+        next_present = 0
+        frame_index = 0
+        previous = 0.0
+        now = 0.0
+        try:
+            while not self._finished:
+                grid_time = frame_index / self.fps
+                key_time = timeline[position].time if position < len(timeline) else math.inf
+                now = min(grid_time, key_time)
+                if now > end_time:
+                    break
+                self.clock.advance_to(now)
+                presenting = False
+                while position < len(timeline) and timeline[position].time <= now and not self._finished:
+                    entry = timeline[position]
+                    deadline = scene.next_deadline()
+                    if entry.kind == "present" and deadline is not None and deadline > now:
+                        # 浮点误差使计时节点略晚于记录的呈现时刻时，以计时节点为准
+                        for later in timeline[position:]:
+                            later.time = max(later.time, deadline)
+                        break
+                    position += 1
+                    if entry.kind == "present":
+                        # 呈现后立即更新，同一时刻的其余事件留到下一轮
+                        presenting = True
+                        break
+                    scene = self._apply(entry, scene)
+                while next_present < len(presents) and presents[next_present] < position:
+                    next_present += 1
+                # 下一题的呈现时刻以记录为准：计时节点已过但未到记录时刻时保持当前画面
+                deadline = scene.next_deadline()
+                hold = (
+                    not presenting
+                    and next_present < len(presents)
+                    and deadline is not None
+                    and deadline <= now < timeline[presents[next_present]].time
+                )
+                if scene.state == "completed":
+                    scene.wait_for_export()
+                if not hold:
+                    scene.update(now - previous)
+                if presenting and scene.next_deadline() is not None:
+                    # 计时判断仍差一个舍入单位时，推后最小的时间步再呈现
+                    position -= 1
+                    timeline[position].time = math.nextafter(now, math.inf)
+                scene.draw()
+                on_grid = grid_time <= key_time
+                if sink is not None and (on_grid or not sink.constant_rate):
+                    sink.write(now, self.app.screen)
+                if on_grid:
+                    frame_index += 1
+                previous = now
+        finally:
+            if sink is not None:
+                sink.close(previous)
+        self.recorder.export()
+        self.recorder.close(wait=True)
+        return ReplayResult(
+            csv_path=self.csv_path,
+            session_seconds=previous,
+            wall_seconds=time.perf_counter() - started,
+            frames=sink.frames if sink is not None else 0,
+            encoded=sink.encoded if sink is not None else 0,
+            synthesized=synthesized,
+        )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="会话回放：按作答日志与输入日志重现被试看到的每一帧")
+    parser.add_argument("session", help="结果 CSV 或其作答日志（.journal.jsonl）路径")
+    parser.add_argument("--output", required=True, help="回放输出目录（帧与重新生成的导出）")
+    parser.add_argument("--fps", type=int, default=DEFAULT_FPS, help="均匀取帧的帧率")
+    parser.add_argument("--format", default="png", choices=list(FRAME_FORMATS), help="帧输出格式")
+    parser.add_argument("--workers", type=int, default=None, help="编码线程数，默认 CPU 核数")
+    parser.add_argument("--config", help="配置文件路径，须与原会话一致")
+    parser.add_argument("--tolerance", type=float, default=1e-3, help="比对时间列允许的误差（秒）")
+    args = parser.parse_args(argv)
+
+    from src.app import ExperimentApp
+    from src.config_loader import ConfigError, load_config
+    from src.utils.paths import resource_path
+
+    if args.session.endswith(JOURNAL_SUFFIX):
+        journal_path = args.session
+        original_csv = args.session[: -len(JOURNAL_SUFFIX)]
+    else:
+        original_csv = args.session
+        journal_path = journal_path_for(args.session)
+    if not os.path.exists(journal_path):
+        print(f"错误：找不到作答日志 {journal_path}", file=sys.stderr)
+        return 1
+    if os.path.abspath(args.output) == os.path.abspath(os.path.dirname(original_csv) or "."):
+        print("错误：回放输出目录不能与原始数据目录相同", file=sys.stderr)
+        return 1
+    input_log = input_log_path_for(original_csv)
+    if not os.path.exists(input_log):
+        print(f"提示：找不到输入日志 {input_log}，将按作答记录合成输入")
+
+    try:
+        config = load_config(args.config)
+        stimuli = StimuliManager(resource_path("stimuli.csv"), config)
+    except (ConfigError, ValueError) as exc:
+        print(f"错误：{exc}", file=sys.stderr)
+        return 1
+    # 按原会话的实际窗口尺寸打开，全屏会话的布局与评分条位置才能与被试看到的一致
+    session = load_resume_state(journal_path, include_finalized=True)
+    screen_size = session.screen_size if session is not None else None
+    app = ExperimentApp(config, stimuli, headless=True, clock=VirtualClock(), screen_size=screen_size)
+    try:
+        replay = SessionReplay(
+            config,
+            stimuli,
+            app,
+            journal_path,
+            args.output,
+            fps=args.fps,
+            frame_format=args.format,
+            workers=args.workers or os.cpu_count() or 1,
+            input_log=input_log,
+        )
+        result = replay.run()
+    except (ValueError, RuntimeError) as exc:
+        print(f"错误：{exc}", file=sys.stderr)
+        return 1
+    finally:
+        app.shutdown()
+
+    print(
+        f"回放完成：会话时长 {result.session_seconds:.1f} s，用时 {result.wall_seconds:.1f} s"
+        f"（{result.speedup:.1f} 倍实时），{result.frames} 帧，编码 {result.encoded} 帧"
+    )
+    if result.synthesized:
+        print(f"提示：{result.synthesized} 道题没有输入日志，已按作答记录合成输入")
+    if not os.path.exists(original_csv):
+        print(f"提示：原始导出 {original_csv} 不存在，跳过比对")
+        return 0
+    differences = compare_exports(original_csv, result.csv_path, args.tolerance)
+    if not differences:
+        print(f"重新生成的导出与原始导出一致：{result.csv_path}")
+        return 0
+    print(f"错误：重新生成的导出与原始导出有 {len(differences)} 处不同")
+    for line in differences[:20]:
+        print(f"  {line}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
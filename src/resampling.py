@@ -0,0 +1,169 @@
+"""规则编码之间评分变化的自助法置信区间与置换检验（被试层面重抽样），需要 numpy。
+
+对比统计量：先求每名被试在规则 A、B 下的平均变化（delta 或 abs_shift），再取同时做过
+两种规则的被试的差值 d_i 的均值。自助法对被试有放回抽样；置换检验在被试内交换两种规则
+的标签，即对 d_i 随机翻转符号。
+
+重抽样按固定大小分块，每块在进程池中以批量矩阵运算完成。第 i 块使用
+SeedSequence(seed).spawn() 的第 i 个子种子，因此结果只取决于 seed 与次数，
+与进程数无关。
+
+用法：python -m src.resampling data/merged --rules PNAP PNP~ --resamples 20000
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Tuple
+
+from src.analytics import TrialFrame, compute_shifts, load_frame, require_numpy
+
+
+CHUNK_SIZE = 2000
+# 单批矩阵不超过约 32 MB
+BATCH_ELEMENTS = 4_000_000
+
+
+@dataclass
+class ContrastResult:
+    rule_a: str
+    rule_b: str
+    metric: str
+    participants: int
+    observed: float
+    ci_low: float
+    ci_high: float
+    p_value: float
+    resamples: int
+    elapsed: float
+
+
+def paired_differences(frame: TrialFrame, rule_a: str, rule_b: str, metric: str = "abs_shift") -> Any:
+    """每名被试在两种规则下平均变化之差（只保留两种规则都有有效数据的被试）"""
+    np = require_numpy()
+    shifts = compute_shifts(frame)
+    groups = shifts["participant"]
+    count = int(groups.max()) + 1 if len(groups) else 0
+    rule_codes = frame.arrays["rule_code"]
+    means = []
+    for rule in (rule_a, rule_b):
+        codes = frame.codes_of("rule_code", rule)
+        if not len(codes):
+            raise ValueError(f"数据中没有规则编码 {rule}")
+        mask = shifts["valid"] & np.isin(rule_codes, codes)
+        n = np.bincount(groups[mask], minlength=count)
+        total = np.bincount(groups[mask], weights=shifts[metric][mask], minlength=count)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means.append(np.where(n > 0, total / n, np.nan))
+    differences = means[0] - means[1]
+    return differences[np.isfinite(differences)]
+
+
+def _resample_chunk(kind: str, differences: Any, count: int, seed: Any) -> Any:
+    """在一个子种子上完成 count 次重抽样，按批量矩阵计算"""
+    np = require_numpy()
+    rng = np.random.default_rng(seed)
+    size = len(differences)
+    batch = max(1, BATCH_ELEMENTS // max(size, 1))
+    results = np.empty(count)
+    for start in range(0, count, batch):
+        stop = min(count, start + batch)
+        if kind == "bootstrap":
+            picks = rng.integers(0, size, size=(stop - start, size))
+            results[start:stop] = differences[picks].mean(axis=1)
+        else:
+            signs = rng.integers(0, 2, size=(stop - start, size), dtype=np.int8) * 2 - 1
+            results[start:stop] = (signs * differences).mean(axis=1)
+    return results
+
+
+def resample(kind: str, differences: Any, resamples: int, seed: int = 0, workers: Optional[int] = None) -> Any:
+    """返回 resamples 个重抽样统计量；kind 为 bootstrap 或 permutation"""
+    np = require_numpy()
+    chunks: List[Tuple[int, Any]] = []
+    children = np.random.SeedSequence(seed).spawn(-(-resamples // CHUNK_SIZE))
+    for index, child in enumerate(children):
+        chunks.append((min(CHUNK_SIZE, resamples - index * CHUNK_SIZE), child))
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(chunks) <= 1:
+        parts = [_resample_chunk(kind, differences, count, child) for count, child in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_resample_chunk, kind, differences, count, child) for count, child in chunks]
+            parts = [future.result() for future in futures]
+    return np.concatenate(parts) if parts else np.zeros(0)
+
+
+def rule_contrast(
+    frame: TrialFrame,
+    rule_a: str,
+    rule_b: str,
+    metric: str = "abs_shift",
+    resamples: int = 20000,
+    confidence: float = 0.95,
+    seed: int = 0,
+    workers: Optional[int] = None,
+) -> ContrastResult:
+    np = require_numpy()
+    start = time.perf_counter()
+    differences = paired_differences(frame, rule_a, rule_b, metric)
+    if len(differences) < 2:
+        raise ValueError(f"同时有 {rule_a} 与 {rule_b} 有效数据的被试不足 2 名")
+    observed = float(differences.mean())
+    boot = resample("bootstrap", differences, resamples, seed, workers)
+    # 置换检验使用独立的种子流，避免与自助法共享随机数
+    perm = resample("permutation", differences, resamples, seed + 1, workers)
+    alpha = (1.0 - confidence) / 2
+    ci_low, ci_high = np.quantile(boot, [alpha, 1.0 - alpha])
+    extreme = int(np.count_nonzero(np.abs(perm) >= abs(observed) - 1e-12))
+    return ContrastResult(
+        rule_a=rule_a,
+        rule_b=rule_b,
+        metric=metric,
+        participants=len(differences),
+        observed=observed,
+        ci_low=float(ci_low),
+        ci_high=float(ci_high),
+        p_value=(extreme + 1) / (len(perm) + 1),
+        resamples=resamples,
+        elapsed=time.perf_counter() - start,
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="规则编码之间评分变化的自助法置信区间与置换检验")
+    parser.add_argument("source", help="合并数据集目录、.npz / .parquet 文件或结果 CSV")
+    parser.add_argument("--rules", nargs=2, required=True, metavar=("A", "B"), help="要比较的两个规则编码")
+    parser.add_argument("--metric", default="abs_shift", choices=["abs_shift", "delta"])
+    parser.add_argument("--resamples", type=int, default=20000)
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认 CPU 核数")
+    args = parser.parse_args(argv)
+    try:
+        frame = load_frame(args.source)
+        result = rule_contrast(
+            frame,
+            args.rules[0],
+            args.rules[1],
+            metric=args.metric,
+            resamples=args.resamples,
+            confidence=args.confidence,
+            seed=args.seed,
+            workers=args.workers,
+        )
+    except (OSError, ValueError, RuntimeError, KeyError) as exc:
+        print(f"错误：重抽样失败。详情：{exc}", file=sys.stderr)
+        return 1
+    level = int(round(args.confidence * 100))
+    print(f"{result.rule_a} − {result.rule_b}（{result.metric}，{result.participants} 名被试）")
+    print(f"  观测差值 {result.observed:.4f}，{level}% 置信区间 [{result.ci_low:.4f}, {result.ci_high:.4f}]")
+    print(f"  置换检验 p = {result.p_value:.4g}（各 {result.resamples} 次重抽样，用时 {result.elapsed:.2f} s）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""本地 SQLite 结果库：每次导出把整个会话写入同一个数据库，便于跨被试检索。
+
+数据库使用 WAL 模式，导出线程写入时不阻塞查询；同一会话重复导出时在一个事务中先删后插，
+库中始终只有该会话最新的一份记录。CSV 仍按会话单独导出，结果库只是附加的索引副本。
+打开旧版结果库时会补上后来加入的导出列（如计时质量），已有行的这些列为 NULL。
+
+用法：python -m src.results_db data/results.sqlite3 --mode formal --rule PNP~ --class 三班
+"""
+
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from src.recorder import EXPORT_FIELDNAMES
+
+
+INSERT_BATCH_SIZE = 500
+_REAL_COLUMNS = {
+    "rating_value",
+    "rating_started_at",
+    "rating_confirmed_at",
+    "elapsed_since_display",
+    "trial_elapsed_total",
+    "worst_frame_ms",
+    "total_stall_ms",
+    "gc_pause_ms",
+}
+_INTEGER_COLUMNS = {"trial_index", "question_order", "missed_frames"}
+
+
+def _column_type(name: str) -> str:
+    if name in _INTEGER_COLUMNS:
+        return "INTEGER"
+    if name in _REAL_COLUMNS:
+        return "REAL"
+    return "TEXT"
+
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS sessions (
+        session_id TEXT PRIMARY KEY,
+        csv_path TEXT NOT NULL,
+        participant_name TEXT,
+        participant_class TEXT,
+        seed INTEGER,
+        total_trials INTEGER,
+        row_count INTEGER NOT NULL,
+        exported_at TEXT NOT NULL
+    )
+    """,
+    "CREATE TABLE IF NOT EXISTS responses (session_id TEXT NOT NULL REFERENCES sessions(session_id), "
+    + ", ".join(f"{name} {_column_type(name)}" for name in EXPORT_FIELDNAMES)
+    + ")",
+    "CREATE INDEX IF NOT EXISTS idx_responses_session ON responses (session_id)",
+    "CREATE INDEX IF NOT EXISTS idx_responses_participant ON responses (participant_name, participant_class)",
+    "CREATE INDEX IF NOT EXISTS idx_responses_mode ON responses (mode, trial_index)",
+    "CREATE INDEX IF NOT EXISTS idx_responses_trial ON responses (trial_index)",
+    "CREATE INDEX IF NOT EXISTS idx_responses_rule ON responses (rule_code)",
+    "CREATE INDEX IF NOT EXISTS idx_responses_symbol ON responses (symbol)",
+]
+
+_INSERT_RESPONSE = (
+    f"INSERT INTO responses (session_id, {', '.join(EXPORT_FIELDNAMES)}) "
+    f"VALUES ({', '.join('?' for _ in range(len(EXPORT_FIELDNAMES) + 1))})"
+)
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """打开（必要时创建）结果库，并启用 WAL"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    connection = sqlite3.connect(path, timeout=30.0)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # WAL 下 NORMAL 仍保证崩溃后库文件完整，只可能丢失最后一个事务
+    connection.execute("PRAGMA synchronous=NORMAL")
+    with connection:
+        for statement in SCHEMA:
+            connection.execute(statement)
+        existing = {row[1] for row in connection.execute("PRAGMA table_info(responses)")}
+        for name in EXPORT_FIELDNAMES:
+            if name not in existing:
+                connection.execute(f"ALTER TABLE responses ADD COLUMN {name} {_column_type(name)}")
+    return connection
+
+
+def _sql_value(name: str, value: Any) -> Any:
+    if value == "" and (name in _REAL_COLUMNS or name in _INTEGER_COLUMNS):
+        return None
+    return value
+
+
+def _batches(rows: Iterable[Dict[str, Any]], session_id: str) -> Iterator[List[Tuple[Any, ...]]]:
+    batch: List[Tuple[Any, ...]] = []
+    for row in rows:
+        batch.append((session_id, *(_sql_value(name, row[name]) for name in EXPORT_FIELDNAMES)))
+        if len(batch) >= INSERT_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def write_session(
+    path: str,
+    rows: Sequence[Dict[str, Any]],
+    csv_path: str,
+    session_info: Optional[Dict[str, Any]] = None,
+) -> int:
+    """把一个会话的导出行（与 CSV 写入的字典相同）写入结果库，返回写入行数"""
+    session_info = session_info or {}
+    session_id = os.path.splitext(os.path.basename(csv_path))[0]
+    first = rows[0] if rows else {}
+    connection = connect(path)
+    try:
+        with connection:
+            connection.execute("DELETE FROM responses WHERE session_id = ?", (session_id,))
+            connection.execute(
+                "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    session_id,
+                    os.path.abspath(csv_path),
+                    first.get("participant_name"),
+                    first.get("participant_class"),
+                    session_info.get("seed"),
+                    session_info.get("total_trials"),
+                    len(rows),
+                    datetime.now().isoformat(timespec="seconds"),
+                ),
+            )
+            for batch in _batches(rows, session_id):
+                connection.executemany(_INSERT_RESPONSE, batch)
+    finally:
+        connection.close()
+    return len(rows)
+
+
+def query_responses(
+    path: str,
+    participant: Optional[str] = None,
+    participant_class: Optional[str] = None,
+    mode: Optional[str] = None,
+    rule_code: Optional[str] = None,
+    symbol: Optional[str] = None,
+    trial_index: Optional[int] = None,
+) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+    """按条件检索作答记录，返回 (列名, 行)"""
+    conditions: List[str] = []
+    params: List[Any] = []
+    for column, value in (
+        ("participant_name", participant),
+        ("participant_class", participant_class),
+        ("mode", mode),
+        ("rule_code", rule_code),
+        ("symbol", symbol),
+        ("trial_index", trial_index),
+    ):
+        if value is not None:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+    sql = f"SELECT session_id, {', '.join(EXPORT_FIELDNAMES)} FROM responses"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY session_id, mode, trial_index, question_order"
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        cursor = connection.execute(sql, params)
+        columns = [description[0] for description in cursor.description]
+        return columns, cursor.fetchall()
+    finally:
+        connection.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="检索本地 SQLite 结果库中的作答记录，输出 CSV")
+    parser.add_argument("database", help="结果库路径（配置项 experiment.results_database）")
+    parser.add_argument("--participant", help="被试姓名")
+    parser.add_argument("--class", dest="participant_class", help="班级")
+    parser.add_argument("--mode", choices=["practice", "formal"])
+    parser.add_argument("--rule", dest="rule_code", help="规则编码，如 PNP~")
+    parser.add_argument("--symbol", help="题目符号")
+    parser.add_argument("--trial", dest="trial_index", type=int, help="试次序号")
+    parser.add_argument("--count", action="store_true", help="只输出匹配的行数")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.database):
+        print(f"错误：结果库不存在：{args.database}", file=sys.stderr)
+        return 1
+    try:
+        columns, rows = query_responses(
+            args.database,
+            participant=args.participant,
+            participant_class=args.participant_class,
+            mode=args.mode,
+            rule_code=args.rule_code,
+            symbol=args.symbol,
+            trial_index=args.trial_index,
+        )
+    except sqlite3.Error as exc:
+        print(f"错误：查询结果库失败。详情：{exc}", file=sys.stderr)
+        return 1
+    if args.count:
+        print(len(rows))
+        return 0
+    writer = csv.writer(sys.stdout)
+    writer.writerow(columns)
+    writer.writerows(rows)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
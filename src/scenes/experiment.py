@@ -1,14 +1,24 @@
 import random
-import time
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, ContextManager, Dict, List, Optional, Tuple
 
 import pygame
 
-from src.recorder import DataRecorder
+from src.frame_stats import FrameStats
+from src.frame_watchdog import FrameWatchdog
+from src.recorder import DataRecorder, ExportJob
+from src.session_resume import ResumeState
 from src.stimuli_manager import QuestionSpec, StimuliManager, TrialPlan
 from src.ui.button import Button
+from src.ui.glyph_atlas import atlas_for
+from src.ui.layer_cache import LayerCache
+from src.ui.layout import experiment_layout
 from src.ui.slider import Slider
+from src.utils.clock import Clock, default_clock
+
+
+_NO_SECTION = nullcontext()
 
 
 class ExperimentScene:
@@ -26,8 +36,19 @@ class ExperimentScene:
         scale: float,
         on_finish,
         total_trials_override: Optional[int] = None,
+        seed: Optional[int] = None,
+        resume: Optional[ResumeState] = None,
+        clock: Optional[Clock] = None,
+        frame_stats: Optional[FrameStats] = None,
+        frame_watchdog: Optional[FrameWatchdog] = None,
     ) -> None:
         self.screen = screen
+        # 所有计时都取自注入的时钟，模拟时可换成虚拟时钟
+        self.clock = clock or default_clock()
+        # 主循环的逐帧统计，绘制中的主要步骤按节计时
+        self.frame_stats = frame_stats
+        # 主循环的帧监视，确认作答时取出本题期间的掉帧与停顿
+        self.frame_watchdog = frame_watchdog
         self.config = config
         self.fonts = fonts
         self.stimuli = stimuli
@@ -64,13 +85,19 @@ class ExperimentScene:
         )
         if total_trials_override is not None:
             self.total_trials = total_trials_override
+        if resume is not None:
+            self.total_trials = resume.total_trials
+            seed = resume.seed
 
+        # 会话内的随机抽样（画像顺序、题间间隔）均来自同一种子，便于记录与恢复
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(1 << 62)
+        self.rng = random.Random(self.seed)
         self.portrait_entries = self._load_portraits()
-        if len(self.portrait_entries) < self.total_trials:
-            raise ValueError(
-                f"画像数量不足，至少需要 {self.total_trials} 张图片，当前仅有 {len(self.portrait_entries)} 张"
-            )
-        self._portrait_sequence = random.sample(self.portrait_entries, self.total_trials)
+        check_portrait_count(len(self.portrait_entries), self.total_trials)
+        if resume is not None:
+            self._portrait_sequence = self._restore_portraits(resume.portraits)
+        else:
+            self._portrait_sequence = self.rng.sample(self.portrait_entries, self.total_trials)
         self._portrait_index = 0
         self.current_portrait_entry: Optional[Dict[str, object]] = None
         self.current_subject_name: str = ""
@@ -79,12 +106,10 @@ class ExperimentScene:
         self.current_caption_template: Optional[str] = None
         self.current_hint_template: Optional[str] = None
 
-        slider_length = int(screen.get_width() * 0.65)
-        slider_x = int((screen.get_width() - slider_length) / 2)
-        slider_y = int(screen.get_height() * 0.76)
+        self.layout = experiment_layout(screen.get_size(), self.scale)
         self.slider = Slider(
-            start_pos=(slider_x, slider_y),
-            length=slider_length,
+            start_pos=self.layout.slider_pos,
+            length=self.layout.slider_length,
             min_value=rating_conf["min"],
             max_value=rating_conf["max"],
             step=rating_conf["step"],
@@ -98,12 +123,8 @@ class ExperimentScene:
         )
 
         button_font = self.fonts["body"]
-        button_width = max(200, int(220 * self.scale))
-        button_height = max(48, int(58 * self.scale))
-        button_rect = pygame.Rect(0, 0, button_width, button_height)
-        button_rect.center = (self.screen.get_width() // 2, slider_y + int(120 * self.scale))
         self.confirm_button = Button(
-            rect=button_rect,
+            rect=pygame.Rect(self.layout.confirm_rect),
             text="确认",
             font=button_font,
             bg_color=self.colors["accent"],
@@ -134,26 +155,110 @@ class ExperimentScene:
         self.current_symbol: Optional[str] = None
         self.previous_symbol: Optional[str] = None
         self._debug_lines: Tuple[str, ...] = ()
+        self._export_job: Optional[ExportJob] = None
+        self.exported_file: Optional[str] = None
+        # 题目界面的静态图层：背景、被试信息、题目面板与评分条轨道
+        self._question_layer = LayerCache()
+        # 最近一次绘制的题目面板内容（画像、姓名、题干、说明、提示）的外接矩形，供排版检查
+        self.question_content_rect: Optional[pygame.Rect] = None
 
         delay_conf = self.config.timing["question_delay_range"]
         self.question_delay_range: Tuple[float, float] = (float(delay_conf[0]), float(delay_conf[1]))
 
-        self.transition_start = time.perf_counter()
-        self.trial_start_time = time.perf_counter()
+        self.transition_start = self.clock.now()
+        self.trial_start_time = self.clock.now()
         self.question_start_time: Optional[float] = None
         self.slider_enabled_time: Optional[float] = None
-        self.experiment_start = time.perf_counter()
+        self.experiment_start = self.clock.now()
         self.last_confirm_time: Optional[float] = None
         self.last_question_duration: float = 0.0
         self.previous_rating_value: Optional[float] = None
         self.previous_question_raw: Optional[str] = None
 
+        if resume is not None:
+            self._restore_session(resume)
+            return
+        self.recorder.set_session_info(
+            {
+                "mode": self.mode,
+                "seed": self.seed,
+                "total_trials": self.total_trials,
+                "portraits": self.portrait_names(),
+                "run_plan": self.stimuli.export_run(),
+                **self._display_info(),
+            }
+        )
         self._prepare_next_trial(initial=True)
         if self.show_debug:
             self._build_debug_lines()
             if self._debug_lines:
                 self.state = "debug"
 
+    def _display_info(self) -> Dict[str, Any]:
+        """实际的窗口尺寸与缩放；全屏时与配置的基准尺寸不同，回放须按此重建布局"""
+        return {"screen_size": list(self.screen.get_size()), "scale": self.scale}
+
+    def portrait_names(self) -> List[str]:
+        """本会话按顺序使用的画像名称"""
+        return [str(entry.get("name", "")) for entry in self._portrait_sequence]
+
+    def _restore_portraits(self, names: List[str]) -> List[Dict[str, object]]:
+        by_name = {str(entry.get("name", "")): entry for entry in self.portrait_entries}
+        missing = [name for name in names if name not in by_name]
+        if missing:
+            raise ValueError(f"无法恢复会话，画像目录中缺少：{'、'.join(missing)}")
+        return [by_name[name] for name in names]
+
+    def _restore_session(self, resume: ResumeState) -> None:
+        """从日志恢复：定位到下一道未作答的题目，并还原计时基准与上一题评分"""
+        session_info = {
+            "mode": resume.mode,
+            "seed": resume.seed,
+            "total_trials": resume.total_trials,
+            "portraits": resume.portraits,
+            "run_plan": resume.run_plan,
+            **self._display_info(),
+        }
+        self.recorder.restore(resume.records, session_info)
+        # 恢复后的随机间隔不重复中断前的序列
+        self.rng = random.Random(f"{self.seed}:{len(resume.records)}")
+        next_trial, next_index = resume.next_position()
+        self.stimuli.restore_run(self.mode, resume.run_plan, min(next_trial - 1, self.total_trials))
+        self._portrait_index = next_trial - 1
+        self.current_trial = next_trial - 1
+        self._prepare_next_trial()
+
+        now = self.clock.now()
+        last = resume.records[-1] if resume.records else None
+        if last is not None:
+            # 时间轴接续中断前的记录，停机时长不计入
+            self.experiment_start = now - last.rating_confirmed_at
+        if last is None or next_index == 0 or self.state == "completed":
+            return
+        trial_records = [record for record in resume.records if record.trial_index == next_trial]
+        self.current_question_index = next_index - 1
+        self.trial_start_time = now - last.trial_elapsed_total
+        self.last_question_duration = last.elapsed_since_display
+        for record in reversed(trial_records):
+            if record.rating_value is not None:
+                self.previous_rating_value = record.rating_value
+                break
+        for record in reversed(trial_records):
+            if record.symbol != "~":
+                self.previous_question_raw = record.stimulus
+                self.previous_symbol = record.symbol
+                break
+
+    def resize(self, screen: pygame.Surface) -> None:
+        """窗口尺寸变化后按新布局一次性重排组件并丢弃旧图层"""
+        self.screen = screen
+        self.layout = experiment_layout(screen.get_size(), self.scale)
+        self.slider.set_geometry(self.layout.slider_pos, self.layout.slider_length)
+        self.confirm_button.set_rect(pygame.Rect(self.layout.confirm_rect))
+        self._current_portrait_scaled = None
+        self._question_layer.invalidate()
+        self._refresh_question_segments()
+
     def _prepare_next_trial(self, initial: bool = False) -> None:
         if not initial:
             self.current_trial += 1
@@ -161,10 +266,10 @@ class ExperimentScene:
             self.current_trial = 1
 
         if self.current_trial > self.total_trials:
-            exported = self.recorder.export()
+            # 导出在后台线程进行，完成页显示进度
+            self._export_job = self.recorder.export_async()
             self.state = "completed"
-            self.completion_time = time.perf_counter()
-            self.exported_file = exported
+            self.completion_time = self.clock.now()
             return
 
         if self._portrait_index < len(self._portrait_sequence):
@@ -184,13 +289,7 @@ class ExperimentScene:
         self.current_caption_template = None
         self.current_hint_template = None
 
-        try:
-            plan = self.stimuli.start_trial()
-        except ValueError as exc:
-            raise RuntimeError(f"无法获取第 {self.current_trial} 次试次的题目：{exc}") from exc
-
-        if not plan.questions:
-            raise ValueError(f"第 {self.current_trial} 次试次未分配任何题目")
+        plan = self.stimuli.next_trial_plan(self.current_trial)
 
         self.current_trial_plan = plan
         self.current_rule_code = getattr(plan, "rule_code", None)
@@ -199,8 +298,8 @@ class ExperimentScene:
         self.current_question_spec = None
 
         self.state = "transition"
-        self.transition_start = time.perf_counter()
-        self.trial_start_time = time.perf_counter()
+        self.transition_start = self.clock.now()
+        self.trial_start_time = self.clock.now()
         self.current_question_order = 0
         self.current_question_text = None
         self.current_category = None
@@ -326,7 +425,7 @@ class ExperimentScene:
         if not is_placeholder and raw_text:
             self.previous_question_raw = raw_text
             self.previous_symbol = resolved_symbol
-        self.question_start_time = time.perf_counter()
+        self.question_start_time = self.clock.now()
         self.slider_enabled_time = None
         self.current_question_confirmed = False
         self.state = "question"
@@ -352,10 +451,12 @@ class ExperimentScene:
         self.slider.set_enabled(False)
         self.confirm_button.set_enabled(False)
         self.current_question_confirmed = True
-        confirm_time = time.perf_counter()
+        confirm_time = self.clock.now()
         self.last_confirm_time = confirm_time
-        slider_enabled_at = self.slider_enabled_time or self.question_start_time or confirm_time
-        elapsed = confirm_time - (self.question_start_time or confirm_time)
+        # 虚拟时钟可从 0 开始计时，这里不能用 or 判断是否为空
+        question_start = self.question_start_time if self.question_start_time is not None else confirm_time
+        slider_enabled_at = self.slider_enabled_time if self.slider_enabled_time is not None else question_start
+        elapsed = confirm_time - question_start
         trial_elapsed = confirm_time - self.trial_start_time
         self.last_question_duration = elapsed
         rating_value = self.slider.value if self.slider_visible else None
@@ -370,6 +471,7 @@ class ExperimentScene:
         controls_snapshot = (
             self.current_question_controls.copy() if self.current_question_controls else {}
         )
+        timing_quality = self.frame_watchdog.take().as_record() if self.frame_watchdog is not None else {}
 
         self.recorder.record(
             mode=self.mode,
@@ -385,12 +487,13 @@ class ExperimentScene:
             trial_elapsed_total=trial_elapsed,
             rule_code=self.current_rule_code if self.current_rule_code else None,
             controls=controls_snapshot,
+            **timing_quality,
         )
 
         remaining_questions = len(self.current_trial_questions) - (self.current_question_index + 1)
         if remaining_questions > 0:
             delay_min, delay_max = self.question_delay_range
-            self.waiting_duration = random.uniform(delay_min, delay_max)
+            self.waiting_duration = self.rng.uniform(delay_min, delay_max)
             self.waiting_target_time = confirm_time + self.waiting_duration
             self.state = "waiting_next"
         else:
@@ -440,13 +543,14 @@ class ExperimentScene:
 
     def handle_event(self, event: pygame.event.Event) -> None:
         if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-            self.recorder.export()
+            # 中途退出同样后台导出，记录器关闭时会等待导出写完
+            self.recorder.export_async()
             self.on_finish()
             return
         if self.state == "debug":
             if event.type == pygame.KEYDOWN and event.key in (pygame.K_SPACE, pygame.K_RETURN):
                 self.state = "transition"
-                self.transition_start = time.perf_counter()
+                self.transition_start = self.clock.now()
             return
         if self.state == "completed":
             if event.type == pygame.KEYDOWN and event.key in (pygame.K_SPACE, pygame.K_RETURN):
@@ -457,36 +561,90 @@ class ExperimentScene:
                 self.slider.handle_event(event)
             self.confirm_button.handle_event(event)
 
+    def wait_for_export(self, timeout: Optional[float] = None) -> None:
+        """等待完成页的后台导出结束，回放时据此保证完成页画面与线程调度无关"""
+        if self._export_job is not None:
+            self._export_job.wait(timeout)
+
+    def next_deadline(self) -> Optional[float]:
+        """下一个由计时触发的状态切换时刻；等待作答或按键时返回 None"""
+        if self.state == "transition":
+            return self.transition_start + self.config.timing["transition_duration"]
+        if self.state == "waiting_next":
+            return self.waiting_target_time
+        return None
+
     def update(self, _dt: float) -> None:
+        job = self._export_job
+        if job is not None and job.done and job.error is None:
+            self.exported_file = job.result
         if self.state == "debug":
             return
-        now = time.perf_counter()
+        now = self.clock.now()
         if self.state == "transition":
-            if now - self.transition_start >= self.config.timing["transition_duration"]:
+            # 与 next_deadline() 的算式一致，时钟恰好跳到计时节点时不会因舍入误差晚一帧
+            if now >= self.transition_start + self.config.timing["transition_duration"]:
                 self._present_next_question()
         elif self.state == "waiting_next":
-            if self.waiting_target_time and now >= self.waiting_target_time:
+            if self.waiting_target_time is not None and now >= self.waiting_target_time:
                 self._present_next_question()
 
+    def _section(self, name: str) -> ContextManager[None]:
+        return self.frame_stats.section(name) if self.frame_stats is not None else _NO_SECTION
+
     def draw(self) -> None:
-        self.screen.fill(self.colors["background"])
-        if self.display.get("show_participant_info", True):
-            self._draw_participant_info()
+        if self.state == "question":
+            with self._section("question_layer"):
+                layer = self._question_layer.get(
+                    self._question_layer_key(),
+                    self.screen.get_size(),
+                    self._paint_question_layer,
+                )
+                self.screen.blit(layer, (0, 0))
+        else:
+            self.screen.fill(self.colors["background"])
+            if self.display.get("show_participant_info", True):
+                self._draw_participant_info(self.screen)
         if self.display.get("show_timer", True):
-            self._draw_timer()
+            with self._section("timer"):
+                self._draw_timer()
         if self.state == "debug":
             self._draw_debug_overlay()
         elif self.state == "transition":
             self._draw_transition()
         elif self.state == "question":
-            self._draw_question()
+            with self._section("question_controls"):
+                self._draw_question()
         elif self.state == "waiting_next":
             self._draw_waiting()
         elif self.state == "completed":
             self._draw_completed()
 
 
-    def _draw_participant_info(self) -> None:
+    def _question_layer_key(self) -> Tuple:
+        return (
+            self.screen.get_size(),
+            self.current_trial,
+            self.current_question_order,
+            self.current_question_display,
+            self._current_question_highlight,
+            self.current_subject_name,
+            self.current_caption_template,
+            self.current_hint_template,
+            self.slider_visible,
+            self.slider.static_key() if self.slider_visible else None,
+        )
+
+    def _paint_question_layer(self, layer: pygame.Surface) -> None:
+        layer.fill(self.colors["background"])
+        if self.display.get("show_participant_info", True):
+            self._draw_participant_info(layer)
+        with self._section("question_panel"):
+            self._draw_question_panel(layer)
+        if self.slider_visible:
+            self.slider.draw_static(layer)
+
+    def _draw_participant_info(self, target: pygame.Surface) -> None:
         font = self.fonts["body"]
         labels = [
             f"姓名：{self.participant_info.get('name', '')}",
@@ -494,27 +652,27 @@ class ExperimentScene:
             f"性别：{self.participant_info.get('gender', '')}",
             f"班级：{self.participant_info.get('class', '')}",
         ]
-        margin_x = int(30 * self.scale)
-        margin_y = int(20 * self.scale)
-        line_gap = max(24, int(36 * self.scale))
+        margin_x, margin_y = self.layout.info_origin
+        line_gap = self.layout.info_line_gap
         for idx, text in enumerate(labels):
             surface = font.render(text, True, self.colors["text_primary"])
-            self.screen.blit(surface, (margin_x, margin_y + idx * line_gap))
+            target.blit(surface, (margin_x, margin_y + idx * line_gap))
 
     def _draw_timer(self) -> None:
-        now = time.perf_counter()
+        now = self.clock.now()
         total_elapsed = now - self.experiment_start if self.state != "completed" else self.completion_time - self.experiment_start
         if self.state == "question" and not self.current_question_confirmed:
-            current_elapsed = now - (self.question_start_time or now)
+            current_elapsed = now - (self.question_start_time if self.question_start_time is not None else now)
         else:
             current_elapsed = self.last_question_duration
+        # 读数只用到二十来个字形，SDL_ttf 自身的字形缓存即可命中，逐字拼图集反而更慢
         timer_font = self.fonts["body"]
         total_text = timer_font.render(f"总用时：{total_elapsed:6.2f}s", True, self.colors["text_primary"])
         current_text = timer_font.render(f"当前题目用时：{current_elapsed:5.2f}s", True, self.colors["text_primary"])
-        width = self.screen.get_width()
-        margin = int(30 * self.scale)
-        self.screen.blit(total_text, (width - total_text.get_width() - margin, margin))
-        self.screen.blit(current_text, (width - current_text.get_width() - margin, margin + int(40 * self.scale)))
+        width = self.layout.size[0]
+        margin = self.layout.timer_margin
+        self.screen.blit(total_text, total_text.get_rect(topright=(width - margin, margin)))
+        self.screen.blit(current_text, current_text.get_rect(topright=(width - margin, margin + self.layout.timer_line_gap)))
 
     def _draw_transition(self) -> None:
         font = self.fonts["subtitle"]
@@ -523,7 +681,7 @@ class ExperimentScene:
             True,
             self.colors["text_primary"],
         )
-        self.screen.blit(text, text.get_rect(center=(self.screen.get_width() / 2, self.screen.get_height() / 2)))
+        self.screen.blit(text, text.get_rect(center=self.layout.center))
 
     def _draw_debug_overlay(self) -> None:
         lines = self._debug_lines or ("未启用拉丁方规则调试信息。",)
@@ -539,25 +697,25 @@ class ExperimentScene:
             small_font = body_font
 
         title = title_font.render("规则分配预览", True, self.colors["text_primary"])
-        title_rect = title.get_rect(center=(self.screen.get_width() / 2, int(80 * self.scale)))
+        title_rect = title.get_rect(center=(self.layout.center[0], self.layout.debug_title_y))
         self.screen.blit(title, title_rect)
 
         # 使用更小的行间距
-        line_gap = max(22, int(26 * self.scale))
-        start_y = title_rect.bottom + int(20 * self.scale)
+        line_gap = self.layout.debug_line_gap
+        start_y = title_rect.bottom + self.layout.debug_start_gap
 
         # 分两列显示，如果内容太多
         max_lines_per_column = 12
         if len(lines) > max_lines_per_column:
             # 左列
-            left_x = self.screen.get_width() // 4
+            left_x = self.layout.size[0] // 4
             for idx in range(min(len(lines), max_lines_per_column)):
                 surface = small_font.render(lines[idx], True, self.colors["text_primary"])
                 rect = surface.get_rect(left=left_x, top=start_y + idx * line_gap)
                 self.screen.blit(surface, rect)
 
             # 右列
-            right_x = self.screen.get_width() * 3 // 4
+            right_x = self.layout.size[0] * 3 // 4
             for idx in range(max_lines_per_column, len(lines)):
                 surface = small_font.render(lines[idx], True, self.colors["text_primary"])
                 rect = surface.get_rect(left=right_x, top=start_y + (idx - max_lines_per_column) * line_gap)
@@ -566,23 +724,23 @@ class ExperimentScene:
             # 单列显示
             for idx, text in enumerate(lines):
                 surface = small_font.render(text, True, self.colors["text_primary"])
-                rect = surface.get_rect(center=(self.screen.get_width() / 2, start_y + idx * line_gap))
+                rect = surface.get_rect(center=(self.layout.center[0], start_y + idx * line_gap))
                 self.screen.blit(surface, rect)
 
         hint = body_font.render("按 空格 / 回车 开始实验", True, self.colors["accent"])
-        hint_rect = hint.get_rect(center=(self.screen.get_width() / 2, self.screen.get_height() - int(120 * self.scale)))
+        hint_rect = hint.get_rect(center=(self.layout.center[0], self.layout.debug_hint_y))
         self.screen.blit(hint, hint_rect)
 
     def _draw_question(self) -> None:
-        self._draw_question_panel()
+        # 静态部分已在图层中，这里只绘制滑块手柄、评分读数与按钮
         if self.slider_visible:
-            self.slider.draw(self.screen)
+            self.slider.draw_dynamic(self.screen)
         self.confirm_button.draw(self.screen)
 
     def _draw_waiting(self) -> None:
-        center = (self.screen.get_width() // 2, self.screen.get_height() // 2)
-        size = int(80 * self.scale)
-        thickness = max(4, int(8 * self.scale))
+        center = self.layout.center
+        size = self.layout.fixation_size
+        thickness = self.layout.fixation_thickness
         color = (0, 0, 0)
         pygame.draw.line(
             self.screen,
@@ -601,39 +759,44 @@ class ExperimentScene:
 
     def _draw_completed(self) -> None:
         font = self.fonts["subtitle"]
+        center_x, center_y = self.layout.center
+        title_offset, hint_offset, info_offset = self.layout.completed_offsets
         message = "模拟实验完成" if self.mode == "practice" else "正式实验已完成"
         text = font.render(message, True, self.colors["text_primary"])
-        self.screen.blit(text, text.get_rect(center=(self.screen.get_width() / 2, self.screen.get_height() / 2 - 40)))
+        self.screen.blit(text, text.get_rect(center=(center_x, center_y + title_offset)))
         hint = self.fonts["body"].render("按 空格 / 回车 返回首页", True, self.colors["text_primary"])
-        self.screen.blit(hint, hint.get_rect(center=(self.screen.get_width() / 2, self.screen.get_height() / 2 + 20)))
-        if getattr(self, "exported_file", None):
-            info = self.fonts["body"].render(f"已导出数据：{self.exported_file}", True, self.colors["text_primary"])
-            self.screen.blit(info, info.get_rect(center=(self.screen.get_width() / 2, self.screen.get_height() / 2 + 70)))
-
-    def _draw_question_panel(self) -> None:
-        margin_x = int(80 * self.scale)
-        panel_rect = pygame.Rect(
-            margin_x,
-            int(180 * self.scale),
-            self.screen.get_width() - margin_x * 2,
-            int(self.screen.get_height() * 0.45),
-        )
-        pygame.draw.rect(self.screen, self.colors["panel"], panel_rect, border_radius=16)
-        pygame.draw.rect(self.screen, self.colors["accent"], panel_rect, width=2, border_radius=16)
+        self.screen.blit(hint, hint.get_rect(center=(center_x, center_y + hint_offset)))
+        job = self._export_job
+        if job is None:
+            return
+        if not job.done:
+            message = f"正在导出数据… {job.progress * 100:.0f}%"
+        elif job.error is not None:
+            message = f"数据导出失败，记录已保存在作答日志中：{job.error}"
+        elif self.exported_file:
+            message = f"已导出数据：{self.exported_file}"
+        else:
+            return
+        info = self.fonts["body"].render(message, True, self.colors["text_primary"])
+        self.screen.blit(info, info.get_rect(center=(center_x, center_y + info_offset)))
+
+    def _draw_question_panel(self, target: pygame.Surface) -> None:
+        layout = self.layout
+        panel_rect = layout.panel_rect
+        pygame.draw.rect(target, self.colors["panel"], panel_rect, border_radius=layout.panel_radius)
+        pygame.draw.rect(target, self.colors["accent"], panel_rect, width=2, border_radius=layout.panel_radius)
+        self.question_content_rect = None
         if not self.current_question_display:
             return
         font = self.fonts.get("question", self.fonts["body"])
-        wrap_width = panel_rect.width - int(60 * self.scale)
         segments = self._current_question_segments or self._build_question_segments(
             self.current_question_display,
             self._current_question_highlight,
-            wrap_width,
+            layout.wrap_width,
         )
 
-        portrait_size = int(min(panel_rect.width, panel_rect.height) * 0.4)
-        portrait_rect = pygame.Rect(0, 0, portrait_size, portrait_size)
-        portrait_rect.center = (panel_rect.centerx, panel_rect.top + portrait_size // 2 + int(25 * self.scale))
-        border_radius = max(12, int(18 * self.scale))
+        portrait_rect = layout.portrait_rect
+        border_radius = layout.portrait_radius
         if self.current_portrait_entry and self.current_portrait_entry.get("surface") is not None:
             surface = self.current_portrait_entry["surface"]
             if surface:
@@ -642,24 +805,28 @@ class ExperimentScene:
                     or self._current_portrait_scaled.get_size() != portrait_rect.size
                 ):
                     self._current_portrait_scaled = pygame.transform.smoothscale(surface, portrait_rect.size)
-                self.screen.blit(self._current_portrait_scaled, portrait_rect)
+                target.blit(self._current_portrait_scaled, portrait_rect)
         else:
-            pygame.draw.rect(self.screen, (214, 218, 230), portrait_rect, border_radius=border_radius)
-        pygame.draw.rect(self.screen, self.colors["accent"], portrait_rect, width=3, border_radius=border_radius)
+            pygame.draw.rect(target, (214, 218, 230), portrait_rect, border_radius=border_radius)
+        pygame.draw.rect(target, self.colors["accent"], portrait_rect, width=3, border_radius=border_radius)
+        content = pygame.Rect(portrait_rect)
 
         if self.current_subject_name:
             name_surface = self.fonts["body"].render(self.current_subject_name, True, self.colors["text_primary"])
-            name_rect = name_surface.get_rect(center=(portrait_rect.centerx, portrait_rect.bottom + int(18 * self.scale)))
-            self.screen.blit(name_surface, name_rect)
-            text_start_y = name_rect.bottom + int(36 * self.scale)
+            name_rect = name_surface.get_rect(center=(portrait_rect.centerx, portrait_rect.bottom + layout.name_offset))
+            target.blit(name_surface, name_rect)
+            content.union_ip(name_rect)
+            text_start_y = name_rect.bottom + layout.text_gap
         else:
-            text_start_y = portrait_rect.bottom + int(36 * self.scale)
+            text_start_y = portrait_rect.bottom + layout.text_gap
         line_height = int(font.get_linesize() * 1.3)
         text_bottom = text_start_y
         for idx, (line, color) in enumerate(segments):
-            surf = font.render(line, True, color)
-            text_rect = surf.get_rect(center=(panel_rect.centerx, text_start_y + idx * line_height))
-            self.screen.blit(surf, text_rect)
+            # 题干字形种类多，font.render 每次都要重新光栅化；图集中每个字形只栅格化一次
+            atlas = atlas_for(font, color)
+            text_rect = atlas.get_rect(line, center=(panel_rect.centerx, text_start_y + idx * line_height))
+            atlas.blit(target, line, text_rect.topleft)
+            content.union_ip(text_rect)
             text_bottom = text_rect.bottom
 
         info_font = self.fonts["body"]
@@ -673,11 +840,13 @@ class ExperimentScene:
             True,
             self.colors["text_primary"],
         )
-        min_caption_y = text_bottom + int(40 * self.scale)
-        max_caption_y = panel_rect.bottom - int(60 * self.scale)
-        caption_y = max(min_caption_y, min(max_caption_y, panel_rect.bottom - int(80 * self.scale)))
+        min_caption_y = text_bottom + layout.caption_gap
+        max_caption_y = panel_rect.bottom - layout.caption_min_bottom_gap
+        caption_y = max(min_caption_y, min(max_caption_y, panel_rect.bottom - layout.caption_bottom_gap))
         caption_rect = caption.get_rect(center=(panel_rect.centerx, caption_y))
-        self.screen.blit(caption, caption_rect)
+        target.blit(caption, caption_rect)
+        content.union_ip(caption_rect)
+        self.question_content_rect = content
         hint_template = self.current_hint_template
         if not hint_template and self.current_question_order == 1 and self.mode == "practice":
             hint_template = self.texts.get(
@@ -688,26 +857,37 @@ class ExperimentScene:
             hint_text = self._format_template(str(hint_template))
             if hint_text.strip():
                 hint = info_font.render(hint_text, True, self.colors["text_primary"])
-                hint_y = min(panel_rect.bottom - int(20 * self.scale), caption_rect.bottom + int(30 * self.scale))
+                hint_y = min(panel_rect.bottom - layout.hint_bottom_gap, caption_rect.bottom + layout.hint_gap)
                 hint_rect = hint.get_rect(center=(panel_rect.centerx, hint_y))
-                self.screen.blit(hint, hint_rect)
+                target.blit(hint, hint_rect)
+                content.union_ip(hint_rect)
 
     def _wrap_text(self, text: str, max_width: int) -> Tuple[str, ...]:
         font = self.fonts.get("question", self.fonts["body"])
+        atlas = atlas_for(font, self.colors["text_primary"])
         lines = []
         buffer = ""
+        # pen 为当前行累计步进，extent 为当前行实际绘制宽度
+        pen = 0
+        extent = 0
         max_width = max(100, max_width)
         for char in text:
             if char == "\n":
                 lines.append(buffer)
                 buffer = ""
+                pen = extent = 0
                 continue
-            next_buffer = buffer + char
-            if font.render(next_buffer, True, self.colors["text_primary"]).get_width() > max_width and buffer:
+            glyph_width, advance = atlas.glyph_metrics(char)
+            next_extent = max(extent, pen + glyph_width, pen + advance)
+            if next_extent > max_width and buffer:
                 lines.append(buffer)
                 buffer = char
+                pen = advance
+                extent = max(glyph_width, advance)
             else:
-                buffer = next_buffer
+                buffer += char
+                pen += advance
+                extent = next_extent
         if buffer:
             lines.append(buffer)
         return tuple(lines)
@@ -834,13 +1014,10 @@ class ExperimentScene:
         if not self.current_question_display:
             self._current_question_segments = ()
             return
-        margin_x = int(80 * self.scale)
-        panel_width = self.screen.get_width() - margin_x * 2
-        wrap_width = panel_width - int(60 * self.scale)
         self._current_question_segments = self._build_question_segments(
             self.current_question_display,
             self._current_question_highlight,
-            wrap_width,
+            self.layout.wrap_width,
         )
 
     def _build_question_segments(
@@ -866,25 +1043,62 @@ class ExperimentScene:
         return tuple(segments)
 
     def _load_portraits(self) -> List[Dict[str, object]]:
-        raw = getattr(self.config, "raw", {})
-        pictures_setting = raw.get("pictures_dir", "pictures") if isinstance(raw, dict) else "pictures"
-        base_dir = Path(getattr(self.config, "_path", "config.json")).parent
-        pictures_path = Path(pictures_setting)
-        if not pictures_path.is_absolute():
-            pictures_path = base_dir / pictures_path
-        if not pictures_path.exists() or not pictures_path.is_dir():
-            raise ValueError(f"未找到画像目录: {pictures_path}")
-        allowed_ext = {".png", ".jpg", ".jpeg", ".bmp", ".gif"}
-        portraits: List[Dict[str, object]] = []
-        for file in sorted(pictures_path.iterdir()):
-            if file.suffix.lower() not in allowed_ext:
-                continue
-            try:
-                image = pygame.image.load(str(file)).convert_alpha()
-            except pygame.error:
-                continue
-            name = file.stem
-            portraits.append({"name": name, "surface": image})
+        portraits = [dict(entry) for entry in load_portrait_surfaces(self.config)]
         if not portraits:
-            raise ValueError(f"画像目录 {pictures_path} 中未找到有效的图片")
+            raise ValueError(f"画像目录 {portrait_directory(self.config)} 中未找到有效的图片")
         return portraits
+
+
+PORTRAIT_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".gif"}
+
+
+def portrait_directory(config) -> Path:
+    raw = getattr(config, "raw", {})
+    pictures_setting = raw.get("pictures_dir", "pictures") if isinstance(raw, dict) else "pictures"
+    base_dir = Path(getattr(config, "_path", "config.json")).parent
+    pictures_path = Path(pictures_setting)
+    if not pictures_path.is_absolute():
+        pictures_path = base_dir / pictures_path
+    return pictures_path
+
+
+def portrait_files(config) -> List[Path]:
+    """画像目录中按文件名排序的图片文件（不解码）"""
+    pictures_path = portrait_directory(config)
+    if not pictures_path.exists() or not pictures_path.is_dir():
+        raise ValueError(f"未找到画像目录: {pictures_path}")
+    return [file for file in sorted(pictures_path.iterdir()) if file.suffix.lower() in PORTRAIT_EXTENSIONS]
+
+
+def check_portrait_count(available: int, total_trials: int) -> None:
+    """每个试次需要一张不重复的画像；实验场景与配置校验共用"""
+    if available < total_trials:
+        raise ValueError(f"画像数量不足，至少需要 {total_trials} 张图片，当前仅有 {available} 张")
+
+
+# 解码后的画像按文件清单缓存；同一进程中的后续会话、回放与批量渲染不再重复解码
+_PORTRAIT_CACHE: Dict[Tuple, List[Dict[str, object]]] = {}
+
+
+def load_portrait_surfaces(config) -> List[Dict[str, object]]:
+    """解码画像目录中的图片，文件未变化时直接返回缓存（调用方不应修改返回的表面）"""
+    files = portrait_files(config)
+    key = tuple((str(file), *_file_signature(file)) for file in files)
+    cached = _PORTRAIT_CACHE.get(key)
+    if cached is not None:
+        return cached
+    portraits: List[Dict[str, object]] = []
+    for file in files:
+        try:
+            image = pygame.image.load(str(file)).convert_alpha()
+        except pygame.error:
+            continue
+        portraits.append({"name": file.stem, "surface": image})
+    _PORTRAIT_CACHE.clear()
+    _PORTRAIT_CACHE[key] = portraits
+    return portraits
+
+
+def _file_signature(file: Path) -> Tuple[int, int]:
+    stat = file.stat()
+    return stat.st_mtime_ns, stat.st_size
@@ -1,7 +1,12 @@
-from typing import Callable, Dict, Optional
+from typing import Callable, Dict, Optional, Tuple
 
 import pygame
 
+from src.ui.hit_test import HitTestIndex
+from src.ui.layer_cache import LayerCache
+from src.ui.layout import menu_layout
+from src.ui.widget import EXPOSE_EVENTS
+
 
 class MainMenuScene:
     """实验首页场景"""
@@ -24,41 +29,41 @@ class MainMenuScene:
         self.participant_info = participant_info or {}
         self.scale = max(scale, 0.5)
 
-        width = screen.get_width()
-        height = screen.get_height()
-        box_width = width * 0.25
-        box_height = height * 0.15
-        spacing = width * 0.1
-        center_y = height * 0.6
-        self.boxes = {
-            "practice": pygame.Rect(
-                int(width * 0.5 - spacing - box_width),
-                int(center_y),
-                int(box_width),
-                int(box_height),
-            ),
-            "formal": pygame.Rect(
-                int(width * 0.5 + spacing),
-                int(center_y),
-                int(box_width),
-                int(box_height),
-            ),
-        }
-        info_width = max(260, int(320 * self.scale))
-        info_height = max(48, int(56 * self.scale))
-        self.info_rect = pygame.Rect(0, 0, info_width, info_height)
-        self.info_rect.center = (width // 2, int(height * 0.82))
+        self._hit_index: HitTestIndex[Tuple[str, str]] = HitTestIndex()
+        self._layer = LayerCache()
+        self._composed_layer: Optional[pygame.Surface] = None
+        self.resize(screen)
+
+    def resize(self, screen: pygame.Surface) -> None:
+        """按当前窗口尺寸取布局，重建点击索引并在下一帧重新合成"""
+        self.screen = screen
+        self.layout = menu_layout(screen.get_size(), self.scale)
+        self.boxes = self.layout.boxes
+        self.info_rect = self.layout.info_rect
+        self._hit_index.clear()
+        for mode, rect in self.boxes.items():
+            self._hit_index.add(rect, ("mode", mode))
+        self._hit_index.add(self.info_rect, ("info", ""))
+        self._composed_layer = None
 
     def draw(self) -> None:
+        # 首页没有动态内容，只在图层变化或窗口重新曝光时合成一次
+        layer = self._layer.get(self.screen.get_size(), self.screen.get_size(), self._paint)
+        if layer is self._composed_layer:
+            return
+        self.screen.blit(layer, (0, 0))
+        self._composed_layer = layer
+
+    def _paint(self, target: pygame.Surface) -> None:
         colors = self.config["colors"]
-        self.screen.fill(colors["background"])
+        target.fill(colors["background"])
         title_font = self.fonts["title"]
         body_font = self.fonts["body"]
 
         title_text = self.config.get("texts", {}).get("home_title", "内在思考与外在证据：决策驱动实验")
         title = title_font.render(title_text, True, colors["text_primary"])
-        title_rect = title.get_rect(center=(self.screen.get_width() / 2, self.screen.get_height() * 0.25))
-        self.screen.blit(title, title_rect)
+        title_rect = title.get_rect(center=self.layout.title_center)
+        target.blit(title, title_rect)
 
         default_lines = [
             "通过模拟道德情境，探究改变主意时内在思考后验与外在证据的协同机制。",
@@ -69,39 +74,49 @@ class MainMenuScene:
         for idx, line in enumerate(intro_lines):
             line_surf = body_font.render(line, True, colors["text_primary"])
             line_rect = line_surf.get_rect(
-                center=(self.screen.get_width() / 2, self.screen.get_height() * 0.38 + idx * line_gap)
+                center=(self.layout.title_center[0], self.layout.intro_top + idx * line_gap)
             )
-            self.screen.blit(line_surf, line_rect)
+            target.blit(line_surf, line_rect)
 
-        self._draw_participant_summary(colors, body_font)
+        self._draw_participant_summary(target, colors, body_font)
 
-        border_radius = max(12, int(16 * self.scale))
+        border_radius = self.layout.box_radius
         for mode, rect in self.boxes.items():
-            pygame.draw.rect(self.screen, colors["panel"], rect, border_radius=border_radius)
-            pygame.draw.rect(self.screen, colors["accent"], rect, width=3, border_radius=border_radius)
+            pygame.draw.rect(target, colors["panel"], rect, border_radius=border_radius)
+            pygame.draw.rect(target, colors["accent"], rect, width=3, border_radius=border_radius)
             label = "模拟实验" if mode == "practice" else "正式实验"
             text_surface = body_font.render(label, True, colors["text_primary"])
-            self.screen.blit(text_surface, text_surface.get_rect(center=rect.center))
+            target.blit(text_surface, text_surface.get_rect(center=rect.center))
 
-        info_border_radius = max(16, int(20 * self.scale))
-        pygame.draw.rect(self.screen, colors["panel"], self.info_rect, border_radius=info_border_radius)
-        pygame.draw.rect(self.screen, colors["accent"], self.info_rect, width=2, border_radius=info_border_radius)
+        info_border_radius = self.layout.info_radius
+        pygame.draw.rect(target, colors["panel"], self.info_rect, border_radius=info_border_radius)
+        pygame.draw.rect(target, colors["accent"], self.info_rect, width=2, border_radius=info_border_radius)
         info_text = body_font.render("重新登记被试信息", True, colors["text_primary"])
-        self.screen.blit(info_text, info_text.get_rect(center=self.info_rect.center))
+        target.blit(info_text, info_text.get_rect(center=self.info_rect.center))
 
     def handle_event(self, event: pygame.event.Event) -> None:
+        if event.type in EXPOSE_EVENTS:
+            self._composed_layer = None
+            return
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            for mode, rect in self.boxes.items():
-                if rect.collidepoint(event.pos):
-                    self.on_select_mode(mode)
-                    return
-            if self.info_rect.collidepoint(event.pos):
+            target = self._hit_index.hit(event.pos)
+            if target is None:
+                return
+            kind, mode = target
+            if kind == "mode":
+                self.on_select_mode(mode)
+            else:
                 self.on_edit_info()
 
     def update(self, _dt: float) -> None:
         pass
 
-    def _draw_participant_summary(self, colors: Dict[str, int], font: pygame.font.Font) -> None:
+    def _draw_participant_summary(
+        self,
+        target: pygame.Surface,
+        colors: Dict[str, int],
+        font: pygame.font.Font,
+    ) -> None:
         if not self.participant_info:
             return
         name = self.participant_info.get("name", "")
@@ -117,9 +132,9 @@ class MainMenuScene:
             return
         button_top = min(rect.top for rect in self.boxes.values())
         total_height = line_gap * len(summary_lines)
-        base_y = min(self.screen.get_height() * 0.5, button_top - total_height - int(30 * self.scale))
-        base_y = max(int(self.screen.get_height() * 0.34), base_y)
-        left_margin = int(self.screen.get_width() * 0.18)
+        base_y = min(self.layout.summary_max_y, button_top - total_height - self.layout.summary_gap)
+        base_y = max(self.layout.summary_min_y, base_y)
+        left_margin = self.layout.summary_left
         for idx, text in enumerate(summary_lines):
             surface = font.render(text, True, colors["text_primary"])
-            self.screen.blit(surface, (left_margin, base_y + idx * line_gap))
+            target.blit(surface, (left_margin, base_y + idx * line_gap))
@@ -1,9 +1,14 @@
-from typing import Callable, Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
 import pygame
 
 from src.ui.button import Button
+from src.ui.hit_test import HitTestIndex
+from src.ui.layer_cache import LayerCache
+from src.ui.layout import form_layout
 from src.ui.text_input import TextInput
+from src.ui.widget import EXPOSE_EVENTS, Widget
+from src.utils.clock import Clock
 
 
 class ParticipantFormScene:
@@ -19,6 +24,7 @@ class ParticipantFormScene:
         on_cancel: Callable[[], None],
         initial_values: Optional[Dict[str, str]] = None,
         scale: float = 1.0,
+        clock: Optional[Clock] = None,
     ) -> None:
         self.screen = screen
         self.config = config
@@ -30,15 +36,7 @@ class ParticipantFormScene:
         self.scale = max(scale, 0.5)
         colors = config.colors
 
-        width = screen.get_width()
-        form_width = int(width * 0.6)
-        self.form_left = (width - form_width) // 2
-        self.top_offset = int(screen.get_height() * 0.22)
-        self.row_height = max(72, int(96 * self.scale))
-        input_height = max(48, int(60 * self.scale))
-        self.label_offset = max(80, int(120 * self.scale))
-
-        self.layout: List[Dict[str, object]] = []
+        self.rows: List[Dict[str, object]] = []
         self.fields: List[Dict[str, object]] = []
         rows = [
             ("name", "姓名", "input", False, 20),
@@ -46,14 +44,13 @@ class ParticipantFormScene:
             ("gender", "性别", "gender", False, 0),
             ("class", "班级", "input", False, 20),
         ]
+        self.layout = form_layout(screen.get_size(), self.scale, len(rows))
 
         for index, (key, label, field_type, digits_only, max_len) in enumerate(rows):
-            y = self.top_offset + index * self.row_height
-            entry: Dict[str, object] = {"key": key, "label": label, "type": field_type, "y": y}
+            entry: Dict[str, object] = {"key": key, "label": label, "type": field_type, "index": index}
             if field_type == "input":
-                rect = pygame.Rect(self.form_left, y, form_width, input_height)
                 input_box = TextInput(
-                    rect=rect,
+                    rect=self.layout.input_rect(index),
                     font=self.fonts["body"],
                     placeholder=f"请输入{label}",
                     text_color=colors["text_primary"],
@@ -64,6 +61,7 @@ class ParticipantFormScene:
                     max_length=max_len,
                     digits_only=digits_only,
                     scale=self.scale,
+                    clock=clock,
                 )
                 existing = self.initial_values.get(key, "")
                 if existing:
@@ -71,15 +69,8 @@ class ParticipantFormScene:
                 entry["input"] = input_box
                 self.fields.append(entry)
             else:
-                option_width = max(120, int(160 * self.scale))
-                spacing = max(20, int(30 * self.scale))
-                start_x = self.form_left
-                option_rects = []
-                for idx_opt, value in enumerate(["女", "男"]):
-                    rect = pygame.Rect(start_x + idx_opt * (option_width + spacing), y, option_width, input_height)
-                    option_rects.append((value, rect))
-                entry["options"] = option_rects
-            self.layout.append(entry)
+                entry["options"] = self._option_rects(index)
+            self.rows.append(entry)
 
         self.active_index = 0 if self.fields else -1
         if self.fields:
@@ -87,12 +78,8 @@ class ParticipantFormScene:
         self.gender_selection = self.initial_values.get("gender") if self.initial_values.get("gender") in {"女", "男"} else None
         self.error_message = ""
 
-        button_width = max(200, int(240 * self.scale))
-        button_height = max(48, int(58 * self.scale))
-        button_rect = pygame.Rect(0, 0, button_width, button_height)
-        button_rect.center = (self.screen.get_width() // 2, self.top_offset + len(rows) * self.row_height + int(90 * self.scale))
         self.submit_button = Button(
-            rect=button_rect,
+            rect=pygame.Rect(self.layout.submit_rect),
             text="保存信息",
             font=self.fonts["body"],
             bg_color=colors["accent"],
@@ -102,7 +89,43 @@ class ParticipantFormScene:
             scale=self.scale,
         )
 
+        self.widgets: List[Widget] = [field["input"] for field in self.fields]  # type: ignore[misc]
+        self.widgets.append(self.submit_button)
+        self._hit_index: HitTestIndex[Tuple[str, object]] = HitTestIndex()
+        self._rebuild_hit_index()
+        self._background = LayerCache()
+        self._composed_background: Optional[pygame.Surface] = None
+
+    def resize(self, screen: pygame.Surface) -> None:
+        """按新窗口尺寸一次性重排输入框、性别选项与按钮"""
+        self.screen = screen
+        self.layout = form_layout(screen.get_size(), self.scale, len(self.rows))
+        for entry in self.rows:
+            index = int(entry["index"])  # type: ignore[arg-type]
+            if entry["type"] == "input":
+                entry["input"].set_rect(self.layout.input_rect(index))  # type: ignore[union-attr]
+            else:
+                entry["options"] = self._option_rects(index)
+        self.submit_button.set_rect(pygame.Rect(self.layout.submit_rect))
+        self._rebuild_hit_index()
+        self._composed_background = None
+
+    def _option_rects(self, index: int) -> List[Tuple[str, pygame.Rect]]:
+        return [(value, self.layout.option_rect(index, idx_opt)) for idx_opt, value in enumerate(["女", "男"])]
+
+    def _rebuild_hit_index(self) -> None:
+        self._hit_index.clear()
+        for idx, field in enumerate(self.fields):
+            self._hit_index.add(field["input"].rect, ("input", idx))  # type: ignore[union-attr]
+        for entry in self.rows:
+            if entry["type"] == "gender":  # type: ignore[index]
+                for value, rect in entry["options"]:  # type: ignore[index]
+                    self._hit_index.add(rect, ("gender", value))
+
     def handle_event(self, event: pygame.event.Event) -> None:
+        if event.type in EXPOSE_EVENTS:
+            self._composed_background = None
+            return
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_ESCAPE:
                 self.on_cancel()
@@ -121,64 +144,75 @@ class ParticipantFormScene:
         elif event.type == pygame.TEXTINPUT and self.active_index >= 0:
             self._active_input.handle_text(event.text)
         elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            for idx, field in enumerate(self.fields):
-                input_box: TextInput = field["input"]  # type: ignore[index]
-                if input_box.rect.collidepoint(event.pos):
-                    self._set_active(idx)
-                    break
-            for entry in self.layout:
-                if entry["type"] == "gender":  # type: ignore[index]
-                    for value, rect in entry["options"]:  # type: ignore[index]
-                        if rect.collidepoint(event.pos):
-                            self.gender_selection = value
-                            self.error_message = ""
-                            return
+            target = self._hit_index.hit(event.pos)
+            if target is not None:
+                kind, value = target
+                if kind == "input":
+                    self._set_active(int(value))  # type: ignore[arg-type]
+                elif kind == "gender":
+                    self.gender_selection = value  # type: ignore[assignment]
+                    self.error_message = ""
+                    return
         self.submit_button.handle_event(event)
 
     def update(self, _dt: float) -> None:
-        pass
+        for widget in self.widgets:
+            widget.update()
 
     def draw(self) -> None:
+        background = self._background.get(
+            (self.screen.get_size(), self.gender_selection, self.error_message, self.mode),
+            self.screen.get_size(),
+            self._paint_background,
+        )
+        if background is not self._composed_background:
+            # 背景内容变化（或首次绘制）时整屏合成
+            self.screen.blit(background, (0, 0))
+            for widget in self.widgets:
+                widget.draw(self.screen)
+            self._composed_background = background
+            return
+        # 空闲时只重绘状态发生变化的组件
+        for widget in self.widgets:
+            if widget.dirty:
+                damaged = widget.damaged_rect()
+                self.screen.blit(background, damaged, damaged)
+                widget.draw(self.screen)
+
+    def _paint_background(self, layer: pygame.Surface) -> None:
         colors = self.config.colors
-        self.screen.fill(colors["background"])
+        layer.fill(colors["background"])
+        layout = self.layout
         title = self.fonts["title"].render("被试信息登记", True, colors["text_primary"])
-        self.screen.blit(title, title.get_rect(center=(self.screen.get_width() / 2, self.screen.get_height() * 0.16)))
+        layer.blit(title, title.get_rect(center=layout.title_center))
 
         subtitle_text = "请准确填写以下信息后开始实验"
         subtitle = self.fonts["subtitle"].render(subtitle_text, True, colors["text_primary"])
-        self.screen.blit(subtitle, subtitle.get_rect(center=(self.screen.get_width() / 2, self.screen.get_height() * 0.24)))
+        layer.blit(subtitle, subtitle.get_rect(center=layout.subtitle_center))
 
         mode_text = "待选择" if self.mode is None else ("模拟实验" if self.mode == "practice" else "正式实验")
         mode_label = self.fonts["body"].render(f"当前模式：{mode_text}", True, colors["text_primary"])
-        self.screen.blit(
-            mode_label,
-            (int(self.screen.get_width() * 0.18), self.top_offset - int(60 * self.scale)),
-        )
+        layer.blit(mode_label, layout.mode_label_pos)
 
         label_font = self.fonts["body"]
-        for entry in self.layout:
+        for entry in self.rows:
             label_surface = label_font.render(entry["label"], True, colors["text_primary"])  # type: ignore[index]
-            y = entry["y"]  # type: ignore[index]
-            self.screen.blit(label_surface, (self.form_left - self.label_offset, y + int(12 * self.scale)))
-            if entry["type"] == "input":  # type: ignore[index]
-                input_box: TextInput = entry["input"]  # type: ignore[index]
-                input_box.draw(self.screen)
-            else:
+            y = layout.row_y(int(entry["index"]))  # type: ignore[arg-type]
+            layer.blit(label_surface, (layout.form_left - layout.label_offset, y + layout.label_drop))
+            if entry["type"] == "gender":  # type: ignore[index]
                 for value, rect in entry["options"]:  # type: ignore[index]
                     selected = value == self.gender_selection
                     bg_color = colors["accent"] if selected else (220, 220, 230)
                     text_color = colors["button_text"] if selected else (40, 40, 48)
-                    border_radius = max(8, int(16 * self.scale))
-                    pygame.draw.rect(self.screen, bg_color, rect, border_radius=border_radius)
-                    pygame.draw.rect(self.screen, colors["accent"], rect, width=2, border_radius=border_radius)
+                    border_radius = layout.option_radius
+                    pygame.draw.rect(layer, bg_color, rect, border_radius=border_radius)
+                    pygame.draw.rect(layer, colors["accent"], rect, width=2, border_radius=border_radius)
                     text_surface = label_font.render(value, True, text_color)
-                    self.screen.blit(text_surface, text_surface.get_rect(center=rect.center))
+                    layer.blit(text_surface, text_surface.get_rect(center=rect.center))
 
         if self.error_message:
             error_surface = label_font.render(self.error_message, True, (220, 82, 82))
-            self.screen.blit(error_surface, (self.submit_button.rect.left, self.submit_button.rect.bottom + int(18 * self.scale)))
-
-        self.submit_button.draw(self.screen)
+            layer.blit(error_surface, (self.submit_button.rect.left, self.submit_button.rect.bottom + layout.error_gap))
 
     @property
     def _active_input(self) -> TextInput:
@@ -0,0 +1,126 @@
+from typing import Callable, Dict, List, Optional
+
+import pygame
+
+from src.session_resume import ResumeState
+from src.ui.button import Button
+from src.ui.layout import prompt_layout
+from src.ui.widget import EXPOSE_EVENTS
+
+
+class ResumePromptScene:
+    """启动时发现未完成会话后，询问是否从中断处继续"""
+
+    def __init__(
+        self,
+        screen: pygame.Surface,
+        config,
+        fonts: Dict[str, pygame.font.Font],
+        sessions: List[ResumeState],
+        on_resume: Callable[[ResumeState], None],
+        on_discard: Callable[[ResumeState], None],
+        on_skip: Callable[[], None],
+        scale: float = 1.0,
+    ) -> None:
+        self.screen = screen
+        self.config = config
+        self.fonts = fonts
+        self.sessions = sessions
+        self.on_resume = on_resume
+        self.on_discard = on_discard
+        self.on_skip = on_skip
+        self.scale = max(scale, 0.5)
+        colors = config.colors
+
+        self.layout = prompt_layout(screen.get_size(), self.scale)
+        self.resume_button = Button(
+            rect=pygame.Rect(self.layout.primary_rect),
+            text="继续实验",
+            font=self.fonts["body"],
+            bg_color=colors["accent"],
+            text_color=colors["button_text"],
+            disabled_color=colors["disabled"],
+            on_click=self._resume,
+            scale=self.scale,
+        )
+        self.discard_button = Button(
+            rect=pygame.Rect(self.layout.secondary_rect),
+            text="放弃并重新开始",
+            font=self.fonts["body"],
+            bg_color=colors["disabled"],
+            text_color=colors["button_text"],
+            disabled_color=colors["disabled"],
+            on_click=self._discard,
+            scale=self.scale,
+        )
+
+    @property
+    def current(self) -> Optional[ResumeState]:
+        return self.sessions[0] if self.sessions else None
+
+    def resize(self, screen: pygame.Surface) -> None:
+        self.screen = screen
+        self.layout = prompt_layout(screen.get_size(), self.scale)
+        self.resume_button.set_rect(pygame.Rect(self.layout.primary_rect))
+        self.discard_button.set_rect(pygame.Rect(self.layout.secondary_rect))
+
+    def handle_event(self, event: pygame.event.Event) -> None:
+        if event.type in EXPOSE_EVENTS:
+            return
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:
+                self.on_skip()
+            elif event.key == pygame.K_RETURN:
+                self._resume()
+            return
+        self.resume_button.handle_event(event)
+        self.discard_button.handle_event(event)
+
+    def update(self, _dt: float) -> None:
+        pass
+
+    def draw(self) -> None:
+        colors = self.config.colors
+        self.screen.fill(colors["background"])
+        state = self.current
+        if state is None:
+            return
+        title = self.fonts["subtitle"].render("检测到未完成的实验", True, colors["text_primary"])
+        self.screen.blit(title, title.get_rect(center=self.layout.title_center))
+
+        next_trial, next_index = state.next_position()
+        mode_label = "模拟实验" if state.mode == "practice" else "正式实验"
+        progress = f"已完成 {state.completed_trials()} / {state.total_trials} 个试次，共 {len(state.records)} 道题"
+        if next_index > 0:
+            progress += f"；将从第 {next_trial} 个试次的第 {next_index + 1} 题继续"
+        details = [
+            f"被试：{state.participant_info.get('name', '')}    模式：{mode_label}",
+            progress,
+            f"开始时间：{state.created_at.replace('T', ' ')}",
+        ]
+        if len(self.sessions) > 1:
+            details.append(f"另有 {len(self.sessions) - 1} 个未完成的会话，处理完当前会话后依次提示")
+        body_font = self.fonts["body"]
+        for idx, line in enumerate(details):
+            surface = body_font.render(line, True, colors["text_primary"])
+            center = (self.layout.title_center[0], self.layout.detail_top + idx * self.layout.detail_gap)
+            self.screen.blit(surface, surface.get_rect(center=center))
+
+        self.resume_button.draw(self.screen)
+        self.discard_button.draw(self.screen)
+        hint = body_font.render("回车 继续实验    Esc 暂不处理", True, colors["text_primary"])
+        self.screen.blit(hint, hint.get_rect(center=self.layout.hint_center))
+
+    def _resume(self) -> None:
+        state = self.current
+        if state is not None:
+            self.on_resume(state)
+
+    def _discard(self) -> None:
+        state = self.current
+        if state is None:
+            return
+        self.sessions = self.sessions[1:]
+        self.on_discard(state)
+        if not self.sessions:
+            self.on_skip()
@@ -0,0 +1,114 @@
+import glob
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.journal import JOURNAL_SUFFIX, last_entry_type, read_journal
+from src.recorder import QuestionRecord
+
+
+DISCARDED_SUFFIX = ".discarded"
+
+
+@dataclass
+class ResumeState:
+    """从作答日志恢复出的中断会话"""
+
+    journal_path: str
+    csv_path: str
+    mode: str
+    participant_info: Dict[str, str]
+    seed: Optional[int]
+    total_trials: int
+    run_plan: Dict[str, Any]
+    portraits: List[str]
+    created_at: str = ""
+    records: List[QuestionRecord] = field(default_factory=list)
+    # 最近一次开始或恢复时的窗口尺寸与缩放，旧日志中没有
+    screen_size: Optional[Tuple[int, int]] = None
+    scale: Optional[float] = None
+
+    @property
+    def trial_lengths(self) -> List[int]:
+        return [len(trial.get("questions", [])) for trial in self.run_plan.get("trials", [])]
+
+    def next_position(self) -> Tuple[int, int]:
+        """返回下一道待作答题目的 (试次序号, 题目下标)，均从记录中推算"""
+        if not self.records:
+            return 1, 0
+        last = self.records[-1]
+        lengths = self.trial_lengths
+        trial_length = lengths[last.trial_index - 1] if 0 < last.trial_index <= len(lengths) else 0
+        if last.question_order < trial_length:
+            return last.trial_index, last.question_order
+        return last.trial_index + 1, 0
+
+    def completed_trials(self) -> int:
+        return self.next_position()[0] - 1
+
+
+def load_resume_state(journal_path: str, include_finalized: bool = False) -> Optional[ResumeState]:
+    """解析日志中最后一个会话；已正常导出（include_finalized 为 False 时）或缺少恢复信息时返回 None"""
+    state: Optional[ResumeState] = None
+    finalized = False
+    for entry in read_journal(journal_path):
+        kind = entry.get("type")
+        if kind == "session":
+            session = entry.get("session") or {}
+            finalized = False
+            if not session.get("run_plan"):
+                state = None
+                continue
+            state = ResumeState(
+                journal_path=journal_path,
+                csv_path=str(entry.get("csv_path", "")),
+                mode=str(session.get("mode", "")),
+                participant_info=dict(entry.get("participant") or {}),
+                seed=session.get("seed"),
+                total_trials=int(session.get("total_trials", 0)),
+                run_plan=session["run_plan"],
+                portraits=list(session.get("portraits") or []),
+                created_at=str(entry.get("created_at", "")),
+                screen_size=tuple(session["screen_size"]) if session.get("screen_size") else None,
+                scale=session.get("scale"),
+            )
+        elif kind == "record" and state is not None:
+            state.records.append(QuestionRecord(**entry["record"]))
+        elif kind == "finalized":
+            finalized = True
+    if state is None or (finalized and not include_finalized):
+        return None
+    return state
+
+
+def find_resumable_sessions(directory: str) -> List[ResumeState]:
+    """扫描导出目录中未完成的会话，最近修改的排在前面"""
+    if not directory or not os.path.isdir(directory):
+        return []
+    candidates = glob.glob(os.path.join(glob.escape(directory), f"*{JOURNAL_SUFFIX}"))
+    candidates.sort(key=os.path.getmtime, reverse=True)
+    sessions: List[ResumeState] = []
+    for path in candidates:
+        try:
+            # 已完成的日志末行即为 finalized，只读文件尾即可跳过
+            if last_entry_type(path) == "finalized":
+                continue
+            state = load_resume_state(path)
+        except (OSError, ValueError, TypeError, KeyError) as exc:
+            print(f"警告：无法读取作答日志 {path}，已跳过。详情：{exc}")
+            continue
+        if state is not None:
+            sessions.append(state)
+    return sessions
+
+
+def discard_session(state: ResumeState) -> None:
+    """放弃恢复：保留日志内容但改名，之后不再提示"""
+    target = f"{state.journal_path}{DISCARDED_SUFFIX}"
+    if os.path.exists(target):
+        base = target
+        index = 1
+        while os.path.exists(f"{base}.{index}"):
+            index += 1
+        target = f"{base}.{index}"
+    os.replace(state.journal_path, target)
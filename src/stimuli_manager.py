@@ -21,9 +21,10 @@ class TrialPlan:
 class StimuliManager:
     """管理题库并确保题目调度满足配置"""
 
-    def __init__(self, csv_path: str, config: Any) -> None:
+    def __init__(self, csv_path: str, config: Any, rng: Optional[random.Random] = None) -> None:
         self._csv_path = csv_path
         self._config = config
+        self._rng = rng or random.Random()
         self._latin_conf: Dict[str, Any] = getattr(config, "latin_square", {"enabled": False})
         self._use_latin = bool(self._latin_conf.get("enabled"))
         self._independent_questions = bool(self._latin_conf.get("independent_question", False))
@@ -120,7 +121,7 @@ class StimuliManager:
                 for symbol, items in self._symbol_items.items()
             }
             for items in self._available_symbol_items.values():
-                random.shuffle(items)
+                self._rng.shuffle(items)
             if forced_sequence is not None:
                 rules, weights = self._select_ruleset(mode)
                 if self._independent_questions:
@@ -145,8 +146,8 @@ class StimuliManager:
         else:
             self._available_moral = self._moral.copy()
             self._available_immoral = self._immoral.copy()
-            random.shuffle(self._available_moral)
-            random.shuffle(self._available_immoral)
+            self._rng.shuffle(self._available_moral)
+            self._rng.shuffle(self._available_immoral)
 
     @property
     def total_questions(self) -> int:
@@ -212,8 +213,10 @@ class StimuliManager:
                 except ValueError as exc:
                     raise ValueError(f"模拟实验的拉丁方规则无法排布：{exc}") from exc
 
-    def begin_run(self, mode: str, trial_count: int) -> None:
-        """为新的实验流程准备题库及规则序列"""
+    def begin_run(self, mode: str, trial_count: int, seed: Optional[int] = None) -> None:
+        """为新的实验流程准备题库及规则序列；指定 seed 时抽题与排序可复现"""
+        if seed is not None:
+            self._rng.seed(seed)
         if self._use_latin:
             self.reset_session(mode=mode, trial_count=trial_count)
             if self._session_rules:
@@ -225,6 +228,41 @@ class StimuliManager:
         self._current_trial_questions = []
         self._current_question_index = -1
 
+    def export_run(self) -> Dict[str, Any]:
+        """导出当前流程的规则序列与逐试次题目，供中断后恢复"""
+        return {
+            "rule_plan": self._session_rules.copy(),
+            "trials": [
+                {
+                    "rule_code": plan.rule_code,
+                    "questions": [[question.text, question.symbol, question.category] for question in plan.questions],
+                }
+                for plan in self._trial_plans
+            ],
+        }
+
+    def restore_run(self, mode: str, payload: Dict[str, Any], completed_trials: int = 0) -> None:
+        """按 export_run 的结果恢复流程，下一次 start_trial 返回第 completed_trials + 1 个试次"""
+        self.reset_session()
+        if self._use_latin:
+            self._active_rules, self._active_rule_weights = self._select_ruleset(mode)
+        self._session_rules = [str(code) for code in payload.get("rule_plan", [])]
+        self._trial_plans = [
+            TrialPlan(
+                rule_code=trial.get("rule_code"),
+                questions=[
+                    QuestionSpec(text=text, symbol=symbol, category=category)
+                    for text, symbol, category in trial.get("questions", [])
+                ],
+            )
+            for trial in payload.get("trials", [])
+        ]
+        if not 0 <= completed_trials <= len(self._trial_plans):
+            raise ValueError(f"恢复的试次进度({completed_trials}) 超出试次计划({len(self._trial_plans)})")
+        self._current_trial_index = completed_trials - 1
+        self._current_trial_questions = []
+        self._current_question_index = -1
+
     def start_trial(self) -> TrialPlan:
         if not self._trial_plans:
             raise ValueError("未准备试次，请先调用 begin_run")
@@ -237,6 +275,16 @@ class StimuliManager:
         self._current_question_index = -1
         return plan
 
+    def next_trial_plan(self, trial: int) -> TrialPlan:
+        """开始第 trial 个试次并返回其题目；实验场景与配置校验共用，取题失败时抛出的异常一致"""
+        try:
+            plan = self.start_trial()
+        except ValueError as exc:
+            raise RuntimeError(f"无法获取第 {trial} 次试次的题目：{exc}") from exc
+        if not plan.questions:
+            raise ValueError(f"第 {trial} 次试次未分配任何题目")
+        return plan
+
     def next_question(self) -> Optional[QuestionSpec]:
         if not self._current_trial_questions:
             raise ValueError("尚未开始试次，无法获取题目")
@@ -251,7 +299,7 @@ class StimuliManager:
         pool = self._available_moral if category == "moral" else self._available_immoral
         if not pool:
             raise ValueError(f"{category} 类题目已经用尽")
-        index = random.randrange(len(pool))
+        index = self._rng.randrange(len(pool))
         return pool.pop(index)
 
     def _take_from_symbol(self, symbol: str) -> str:
@@ -390,7 +438,7 @@ class StimuliManager:
         sequence: List[str] = []
         for idx, count in enumerate(assigned):
             sequence.extend([rules[idx]["code"]] * count)
-        random.shuffle(sequence)
+        self._rng.shuffle(sequence)
         return sequence
 
     def _rule_feasible(self, code: str, available_counts: Dict[str, int]) -> bool:
@@ -452,7 +500,7 @@ class StimuliManager:
             base = base_lists.get(symbol, [])
             if not base:
                 raise ValueError(f"符号 {symbol} 缺乏题库支持")
-            return random.choice(base)
+            return self._rng.choice(base)
 
         trial_plans: List[TrialPlan] = []
         for code in self._session_rules:
@@ -488,7 +536,7 @@ class StimuliManager:
         if not pools:
             raise ValueError("题库已耗尽，无法继续实验")
 
-        first_category = random.choice(pools)
+        first_category = self._rng.choice(pools)
         first_text = self._take_from_category(first_category)
         questions: List[QuestionSpec] = [
             QuestionSpec(text=first_text, symbol=first_category, category=first_category)
@@ -509,7 +557,7 @@ class StimuliManager:
             second_candidates.append("immoral")
 
         if second_candidates:
-            second_category = random.choice(second_candidates)
+            second_category = self._rng.choice(second_candidates)
             if (second_category == "moral" and not self._available_moral) or (
                 second_category == "immoral" and not self._available_immoral
             ):
@@ -524,6 +572,19 @@ class StimuliManager:
             raise ValueError("未能生成有效试次")
         return questions
 
+    def question_bank(self) -> Dict[str, List[str]]:
+        """完整题库：拉丁方模式按符号，否则按 moral / immoral 分类"""
+        if self._use_latin:
+            return {symbol: items.copy() for symbol, items in self._symbol_items.items()}
+        return {"moral": self._moral.copy(), "immoral": self._immoral.copy()}
+
+    def rule_codes(self, mode: Optional[str]) -> List[str]:
+        """该模式下可能出现的规则代码；未启用拉丁方时为空"""
+        if not self._use_latin:
+            return []
+        rules, _ = self._select_ruleset(mode)
+        return [str(rule.get("code", "")) for rule in rules]
+
     def get_rule_plan(self) -> List[str]:
         return self._session_rules.copy()
 
@@ -535,6 +596,12 @@ class StimuliManager:
     def practice_trial_count(self) -> int:
         return int(self._config.experiment.get("practice_trials", 0))
 
+    def trial_count(self, mode: str) -> int:
+        """一个会话的试次数：模拟实验取 practice_trials，正式实验取 formal_trials"""
+        if mode == "practice":
+            return self.practice_trial_count()
+        return int(self._config.experiment["formal_trials"])
+
     def get_rule_weights(self) -> List[Tuple[str, float, Optional[float]]]:
         if not self._use_latin:
             return []
@@ -1,9 +1,10 @@
 from typing import Callable, Tuple
 
 import pygame
+from src.ui.widget import Widget
 
 
-class Button:
+class Button(Widget):
     """基础按钮组件"""
 
     def __init__(
@@ -17,6 +18,7 @@ class Button:
         on_click: Callable[[], None],
         scale: float = 1.0,
     ) -> None:
+        super().__init__()
         self.rect = rect
         self.text = text
         self.font = font
@@ -27,12 +29,15 @@ class Button:
         self.enabled = True
         self.border_radius = max(6, int(10 * max(scale, 0.5)))
 
-    def draw(self, surface: pygame.Surface) -> None:
+    def bounds(self) -> pygame.Rect:
+        return pygame.Rect(self.rect)
+
+    def paint(self, surface: pygame.Surface, origin: pygame.Rect) -> None:
         color = self.bg_color if self.enabled else self.disabled_color
-        pygame.draw.rect(surface, color, self.rect, border_radius=self.border_radius)
+        local_rect = pygame.Rect((0, 0), origin.size)
+        pygame.draw.rect(surface, color, local_rect, border_radius=self.border_radius)
         label = self.font.render(self.text, True, self.text_color)
-        text_rect = label.get_rect(center=self.rect.center)
-        surface.blit(label, text_rect)
+        surface.blit(label, label.get_rect(center=local_rect.center))
 
     def handle_event(self, event: pygame.event.Event) -> None:
         if not self.enabled:
@@ -41,5 +46,12 @@ class Button:
             if self.rect.collidepoint(event.pos):
                 self.on_click()
 
+    def set_rect(self, rect: pygame.Rect) -> None:
+        if rect != self.rect:
+            self.rect = rect
+            self.invalidate()
+
     def set_enabled(self, value: bool) -> None:
-        self.enabled = value
+        if value != self.enabled:
+            self.enabled = value
+            self.invalidate()
@@ -0,0 +1,152 @@
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+import pygame
+
+
+Color = Tuple[int, int, int]
+
+# 共享图集的数量上限与单个图集的页数上限，换字体（如按分辨率重建）后旧图集随 LRU 淘汰
+MAX_ATLASES = 16
+MAX_PAGES = 4
+
+
+class GlyphAtlas:
+    """按 (字体, 颜色) 缓存字形的图集，字符串由逐字 blit 组合而成
+
+    每个字形只光栅化一次并打包进图集页面，适合计时读数、逐试次变化的题干等
+    整串缓存命中率低、但字形高度重复的中文文本。页数达到 max_pages 时整体清空重建。
+    """
+
+    def __init__(
+        self,
+        font: pygame.font.Font,
+        color: Color,
+        page_size: int = 1024,
+        max_pages: int = MAX_PAGES,
+    ) -> None:
+        self.font = font
+        self.color = tuple(color)
+        self.height = font.get_height()
+        self._page_size = max(page_size, self.height * 2)
+        self._max_pages = max(1, max_pages)
+        self._pages: List[pygame.Surface] = []
+        # 字形 -> (页面, 页内区域, 步进宽度)
+        self._glyphs: Dict[str, Tuple[pygame.Surface, pygame.Rect, int]] = {}
+        self._cursor_x = 0
+        self._cursor_y = 0
+        self._shelf_height = 0
+
+    def _new_page(self) -> None:
+        if len(self._pages) >= self._max_pages:
+            # 已绘制或正在组合的字符串仍持有旧页面的引用，换新列表即可
+            self._pages = []
+            self._glyphs = {}
+        page = pygame.Surface((self._page_size, self._page_size), pygame.SRCALPHA)
+        # 以透明的同色填充，字形 alpha 混合后颜色不会被黑色稀释
+        page.fill((*self.color, 0))
+        self._pages.append(page)
+        self._cursor_x = 0
+        self._cursor_y = 0
+        self._shelf_height = 0
+
+    def _glyph(self, char: str) -> Tuple[pygame.Surface, pygame.Rect, int]:
+        entry = self._glyphs.get(char)
+        if entry is not None:
+            return entry
+        rendered = self.font.render(char, True, self.color)
+        width, height = rendered.get_size()
+        metrics = self.font.metrics(char)
+        advance = metrics[0][4] if metrics and metrics[0] else width
+
+        if not self._pages:
+            self._new_page()
+        if self._cursor_x + width > self._page_size:
+            self._cursor_x = 0
+            self._cursor_y += self._shelf_height + 1
+            self._shelf_height = 0
+        if self._cursor_y + height > self._page_size:
+            self._new_page()
+        page = self._pages[-1]
+        rect = pygame.Rect(self._cursor_x, self._cursor_y, width, height)
+        if width and height:
+            page.blit(rendered, rect)
+        self._cursor_x += width + 1
+        self._shelf_height = max(self._shelf_height, height)
+
+        entry = (page, rect, advance)
+        self._glyphs[char] = entry
+        return entry
+
+    def glyph_metrics(self, char: str) -> Tuple[int, int]:
+        """返回单个字形的 (位图宽度, 步进宽度)"""
+        _page, rect, advance = self._glyph(char)
+        return rect.width, advance
+
+    def size(self, text: str) -> Tuple[int, int]:
+        pen = 0
+        width = 0
+        for char in text:
+            _page, rect, advance = self._glyph(char)
+            width = max(width, pen + rect.width)
+            pen += advance
+        return max(width, pen), self.height
+
+    def get_rect(self, text: str, **kwargs) -> pygame.Rect:
+        """与 Surface.get_rect 用法一致，例如 get_rect(text, center=(x, y))"""
+        rect = pygame.Rect((0, 0), self.size(text))
+        for name, value in kwargs.items():
+            setattr(rect, name, value)
+        return rect
+
+    def blit(self, target: pygame.Surface, text: str, dest: Tuple[int, int]) -> pygame.Rect:
+        """把字符串直接绘制到目标表面，返回占用区域"""
+        x, y = int(dest[0]), int(dest[1])
+        pen = x
+        right = x
+        sequence = []
+        for char in text:
+            page, rect, advance = self._glyph(char)
+            if rect.width:
+                sequence.append((page, (pen, y), rect))
+            right = max(right, pen + rect.width)
+            pen += advance
+        if sequence:
+            target.blits(sequence, doreturn=False)
+        return pygame.Rect(x, y, max(right, pen) - x, self.height)
+
+    def render(self, text: str) -> pygame.Surface:
+        """与 font.render(text, True, color) 等价的独立表面"""
+        width, height = self.size(text)
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        surface.fill((*self.color, 0))
+        self.blit(surface, text, (0, 0))
+        return surface
+
+    @property
+    def glyph_count(self) -> int:
+        return len(self._glyphs)
+
+    @property
+    def page_count(self) -> int:
+        return len(self._pages)
+
+
+_ATLASES: "OrderedDict[Tuple[int, Color], GlyphAtlas]" = OrderedDict()
+
+
+def atlas_for(font: pygame.font.Font, color: Color) -> GlyphAtlas:
+    """获取共享图集，最近最少使用的图集超出 MAX_ATLASES 时淘汰
+
+    图集持有字体对象，因此缓存中的 id 在进程内不会被复用。
+    """
+    key = (id(font), tuple(color))
+    atlas = _ATLASES.get(key)
+    if atlas is None:
+        atlas = GlyphAtlas(font, color)
+        _ATLASES[key] = atlas
+        while len(_ATLASES) > MAX_ATLASES:
+            _ATLASES.popitem(last=False)
+    else:
+        _ATLASES.move_to_end(key)
+    return atlas
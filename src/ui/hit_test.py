@@ -0,0 +1,44 @@
+from typing import Dict, Generic, List, Optional, Tuple, TypeVar
+
+import pygame
+
+
+T = TypeVar("T")
+
+
+class HitTestIndex(Generic[T]):
+    """均匀网格空间索引，点击时只检查所在网格内的候选区域
+
+    后加入的区域视为位于上层，hit 返回最上层命中的目标。
+    """
+
+    def __init__(self, cell_size: int = 128) -> None:
+        self._cell_size = max(16, int(cell_size))
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        self._entries: List[Tuple[pygame.Rect, T]] = []
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._entries.clear()
+
+    def add(self, rect: pygame.Rect, target: T) -> None:
+        index = len(self._entries)
+        area = pygame.Rect(rect)
+        self._entries.append((area, target))
+        size = self._cell_size
+        for cell_x in range(area.left // size, (area.right - 1) // size + 1):
+            for cell_y in range(area.top // size, (area.bottom - 1) // size + 1):
+                self._cells.setdefault((cell_x, cell_y), []).append(index)
+
+    def hit(self, pos: Tuple[int, int]) -> Optional[T]:
+        candidates = self._cells.get((int(pos[0]) // self._cell_size, int(pos[1]) // self._cell_size))
+        if not candidates:
+            return None
+        for index in reversed(candidates):
+            rect, target = self._entries[index]
+            if rect.collidepoint(pos):
+                return target
+        return None
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,32 @@
+from typing import Callable, Hashable, Optional, Tuple
+
+import pygame
+
+
+class LayerCache:
+    """预合成图层缓存：仅在输入键或尺寸变化时重绘，其余帧直接复用"""
+
+    def __init__(self, flags: int = 0) -> None:
+        self._flags = flags
+        self._key: Optional[Hashable] = None
+        self._surface: Optional[pygame.Surface] = None
+
+    def get(
+        self,
+        key: Hashable,
+        size: Tuple[int, int],
+        paint: Callable[[pygame.Surface], None],
+    ) -> pygame.Surface:
+        surface = self._surface
+        if surface is None or self._key != key or surface.get_size() != tuple(size):
+            surface = pygame.Surface((max(1, size[0]), max(1, size[1])), self._flags)
+            if self._flags & pygame.SRCALPHA:
+                surface.fill((0, 0, 0, 0))
+            paint(surface)
+            self._surface = surface
+            self._key = key
+        return surface
+
+    def invalidate(self) -> None:
+        self._key = None
+        self._surface = None
@@ -0,0 +1,256 @@
+"""按 (屏幕尺寸, 缩放) 缓存的场景布局。
+
+各场景不再在绘制时临时计算坐标，而是读取这里一次算好的矩形；窗口尺寸变化时
+重新取一次布局即可完成整屏重排。返回的 Rect 为共享缓存，调用方需要修改时请先复制。
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Tuple
+
+import pygame
+
+
+Size = Tuple[int, int]
+Point = Tuple[int, int]
+
+
+def _s(value: float, scale: float) -> int:
+    return int(value * scale)
+
+
+@dataclass(frozen=True)
+class ExperimentLayout:
+    size: Size
+    scale: float
+    # 左上角被试信息与右上角计时
+    info_origin: Point
+    info_line_gap: int
+    timer_margin: int
+    timer_line_gap: int
+    # 题目面板
+    panel_rect: pygame.Rect
+    panel_radius: int
+    wrap_width: int
+    portrait_rect: pygame.Rect
+    portrait_radius: int
+    name_offset: int
+    text_gap: int
+    caption_gap: int
+    caption_min_bottom_gap: int
+    caption_bottom_gap: int
+    hint_gap: int
+    hint_bottom_gap: int
+    # 评分条与确认按钮
+    slider_pos: Point
+    slider_length: int
+    confirm_rect: pygame.Rect
+    # 过渡、注视点、完成页与调试页
+    center: Point
+    fixation_size: int
+    fixation_thickness: int
+    completed_offsets: Tuple[int, int, int]
+    debug_title_y: int
+    debug_line_gap: int
+    debug_start_gap: int
+    debug_hint_y: int
+
+
+@lru_cache(maxsize=8)
+def experiment_layout(size: Size, scale: float) -> ExperimentLayout:
+    width, height = size
+    margin_x = _s(80, scale)
+    panel_rect = pygame.Rect(margin_x, _s(180, scale), width - margin_x * 2, int(height * 0.45))
+    portrait_size = int(min(panel_rect.width, panel_rect.height) * 0.4)
+    portrait_rect = pygame.Rect(0, 0, portrait_size, portrait_size)
+    portrait_rect.center = (panel_rect.centerx, panel_rect.top + portrait_size // 2 + _s(25, scale))
+
+    slider_length = int(width * 0.65)
+    slider_x = int((width - slider_length) / 2)
+    slider_y = int(height * 0.76)
+    confirm_rect = pygame.Rect(0, 0, max(200, _s(220, scale)), max(48, _s(58, scale)))
+    confirm_rect.center = (width // 2, slider_y + _s(120, scale))
+
+    return ExperimentLayout(
+        size=size,
+        scale=scale,
+        info_origin=(_s(30, scale), _s(20, scale)),
+        info_line_gap=max(24, _s(36, scale)),
+        timer_margin=_s(30, scale),
+        timer_line_gap=_s(40, scale),
+        panel_rect=panel_rect,
+        panel_radius=16,
+        wrap_width=panel_rect.width - _s(60, scale),
+        portrait_rect=portrait_rect,
+        portrait_radius=max(12, _s(18, scale)),
+        name_offset=_s(18, scale),
+        text_gap=_s(36, scale),
+        caption_gap=_s(40, scale),
+        caption_min_bottom_gap=_s(60, scale),
+        caption_bottom_gap=_s(80, scale),
+        hint_gap=_s(30, scale),
+        hint_bottom_gap=_s(20, scale),
+        slider_pos=(slider_x, slider_y),
+        slider_length=slider_length,
+        confirm_rect=confirm_rect,
+        center=(width // 2, height // 2),
+        fixation_size=_s(80, scale),
+        fixation_thickness=max(4, _s(8, scale)),
+        completed_offsets=(-40, 20, 70),
+        debug_title_y=_s(80, scale),
+        debug_line_gap=max(22, _s(26, scale)),
+        debug_start_gap=_s(20, scale),
+        debug_hint_y=height - _s(120, scale),
+    )
+
+
+@dataclass(frozen=True)
+class MenuLayout:
+    size: Size
+    scale: float
+    title_center: Point
+    intro_top: float
+    boxes: Dict[str, pygame.Rect]
+    box_radius: int
+    info_rect: pygame.Rect
+    info_radius: int
+    summary_left: int
+    summary_min_y: int
+    summary_max_y: float
+    summary_gap: int
+
+
+@lru_cache(maxsize=8)
+def menu_layout(size: Size, scale: float) -> MenuLayout:
+    width, height = size
+    box_width = width * 0.25
+    box_height = height * 0.15
+    spacing = width * 0.1
+    center_y = height * 0.6
+    boxes = {
+        "practice": pygame.Rect(
+            int(width * 0.5 - spacing - box_width),
+            int(center_y),
+            int(box_width),
+            int(box_height),
+        ),
+        "formal": pygame.Rect(
+            int(width * 0.5 + spacing),
+            int(center_y),
+            int(box_width),
+            int(box_height),
+        ),
+    }
+    info_rect = pygame.Rect(0, 0, max(260, _s(320, scale)), max(48, _s(56, scale)))
+    info_rect.center = (width // 2, int(height * 0.82))
+    return MenuLayout(
+        size=size,
+        scale=scale,
+        title_center=(width // 2, int(height * 0.25)),
+        intro_top=height * 0.38,
+        boxes=boxes,
+        box_radius=max(12, _s(16, scale)),
+        info_rect=info_rect,
+        info_radius=max(16, _s(20, scale)),
+        summary_left=int(width * 0.18),
+        summary_min_y=int(height * 0.34),
+        summary_max_y=height * 0.5,
+        summary_gap=_s(30, scale),
+    )
+
+
+@dataclass(frozen=True)
+class FormLayout:
+    size: Size
+    scale: float
+    title_center: Point
+    subtitle_center: Point
+    mode_label_pos: Point
+    form_left: int
+    form_width: int
+    top_offset: int
+    row_height: int
+    input_height: int
+    label_offset: int
+    label_drop: int
+    option_width: int
+    option_spacing: int
+    option_radius: int
+    submit_rect: pygame.Rect
+    error_gap: int
+
+    def row_y(self, index: int) -> int:
+        return self.top_offset + index * self.row_height
+
+    def input_rect(self, index: int) -> pygame.Rect:
+        return pygame.Rect(self.form_left, self.row_y(index), self.form_width, self.input_height)
+
+    def option_rect(self, row_index: int, option_index: int) -> pygame.Rect:
+        return pygame.Rect(
+            self.form_left + option_index * (self.option_width + self.option_spacing),
+            self.row_y(row_index),
+            self.option_width,
+            self.input_height,
+        )
+
+
+@lru_cache(maxsize=8)
+def form_layout(size: Size, scale: float, row_count: int = 4) -> FormLayout:
+    width, height = size
+    form_width = int(width * 0.6)
+    top_offset = int(height * 0.22)
+    row_height = max(72, _s(96, scale))
+    submit_rect = pygame.Rect(0, 0, max(200, _s(240, scale)), max(48, _s(58, scale)))
+    submit_rect.center = (width // 2, top_offset + row_count * row_height + _s(90, scale))
+    return FormLayout(
+        size=size,
+        scale=scale,
+        title_center=(width // 2, int(height * 0.16)),
+        subtitle_center=(width // 2, int(height * 0.24)),
+        mode_label_pos=(int(width * 0.18), top_offset - _s(60, scale)),
+        form_left=(width - form_width) // 2,
+        form_width=form_width,
+        top_offset=top_offset,
+        row_height=row_height,
+        input_height=max(48, _s(60, scale)),
+        label_offset=max(80, _s(120, scale)),
+        label_drop=_s(12, scale),
+        option_width=max(120, _s(160, scale)),
+        option_spacing=max(20, _s(30, scale)),
+        option_radius=max(8, _s(16, scale)),
+        submit_rect=submit_rect,
+        error_gap=_s(18, scale),
+    )
+
+
+@dataclass(frozen=True)
+class PromptLayout:
+    size: Size
+    scale: float
+    title_center: Point
+    detail_top: int
+    detail_gap: int
+    primary_rect: pygame.Rect
+    secondary_rect: pygame.Rect
+    hint_center: Point
+
+
+@lru_cache(maxsize=8)
+def prompt_layout(size: Size, scale: float) -> PromptLayout:
+    width, height = size
+    button_width = max(220, _s(280, scale))
+    button_height = max(48, _s(58, scale))
+    spacing = max(24, _s(40, scale))
+    button_y = int(height * 0.66)
+    primary_rect = pygame.Rect(width // 2 - spacing // 2 - button_width, button_y, button_width, button_height)
+    secondary_rect = pygame.Rect(width // 2 + spacing // 2, button_y, button_width, button_height)
+    return PromptLayout(
+        size=size,
+        scale=scale,
+        title_center=(width // 2, int(height * 0.25)),
+        detail_top=int(height * 0.36),
+        detail_gap=max(30, _s(44, scale)),
+        primary_rect=primary_rect,
+        secondary_rect=secondary_rect,
+        hint_center=(width // 2, button_y + button_height + _s(60, scale)),
+    )
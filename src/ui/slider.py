@@ -1,7 +1,10 @@
-from typing import Tuple
+from typing import List, Optional, Tuple
 
 import pygame
 
+from src.ui.layer_cache import LayerCache
+from src.ui.widget import Widget
+
 
 def _is_whole_number(value: float) -> bool:
     try:
@@ -10,7 +13,7 @@ def _is_whole_number(value: float) -> bool:
         return False
 
 
-class Slider:
+class Slider(Widget):
     """滑动条组件，支持步长限制"""
 
     def __init__(
@@ -28,6 +31,7 @@ class Slider:
         scale: float = 1.0,
         label_medium: str = "",
     ) -> None:
+        super().__init__()
         self.x, self.y = start_pos
         self.length = length
         self.min_value = min_value
@@ -43,64 +47,171 @@ class Slider:
         self.enabled = False
         self.handle_radius = max(8, int(14 * self.scale))
         self.track_height = max(4, int(6 * self.scale))
-        self.value = (min_value + max_value) / 2
+        self._value = (min_value + max_value) / 2
         self._dragging = False
+        self._static_layer = LayerCache(pygame.SRCALPHA)
+        # (static_key, 静态图层区域, 组件区域)：区域需要逐个测量标签宽度，只在布局或标签变化时重算
+        self._geometry: Optional[Tuple[Tuple, pygame.Rect, pygame.Rect]] = None
 
-    def draw(self, surface: pygame.Surface) -> None:
-        track_rect = pygame.Rect(self.x, self.y, self.length, self.track_height)
-        track_color = self.track_color if self.enabled else self.disabled_color
-        pygame.draw.rect(surface, track_color, track_rect, border_radius=4)
+    @property
+    def value(self) -> float:
+        return self._value
 
-        handle_x = self._value_to_position(self.value)
+    @value.setter
+    def value(self, value: float) -> None:
+        if value != self._value:
+            self._value = value
+            self.invalidate()
+
+    def bounds(self) -> pygame.Rect:
+        return self._cached_geometry()[1]
+
+    def _cached_geometry(self) -> Tuple[pygame.Rect, pygame.Rect]:
+        key = self.static_key()
+        geometry = self._geometry
+        if geometry is None or geometry[0] != key:
+            static_rect = self._measure_static_rect()
+            geometry = self._geometry = (key, static_rect, self._measure_bounds(static_rect))
+        return geometry[1], geometry[2]
+
+    def _measure_bounds(self, static_rect: pygame.Rect) -> pygame.Rect:
+        value_top = self.y - int(65 * self.scale)
+        handle_band = pygame.Rect(
+            self.x - self.handle_radius,
+            self.y + self.track_height // 2 - self.handle_radius,
+            self.length + self.handle_radius * 2,
+            self.handle_radius * 2 + 1,
+        )
+        readout = pygame.Rect(static_rect.x, value_top, static_rect.width, self.font.get_height())
+        return static_rect.union(handle_band).union(readout)
+
+    def paint(self, surface: pygame.Surface, origin: pygame.Rect) -> None:
+        text_color = self.label_color if self.enabled else self.disabled_color
+        surface.fill((*text_color, 0))
+        static_rect = self.static_rect()
+        layer = self._static_layer.get(
+            self.static_key(),
+            static_rect.size,
+            lambda target: self._paint_static(target, static_rect),
+        )
+        surface.blit(layer, static_rect.move(-origin.x, -origin.y))
+        self.draw_dynamic(surface, (origin.x, origin.y))
+
+    def static_key(self) -> Tuple:
+        """静态图层（轨道、刻度与标签）依赖的全部输入"""
+        return (
+            self.enabled,
+            self.x,
+            self.y,
+            self.length,
+            self.min_value,
+            self.max_value,
+            self.step,
+            self.label_low,
+            self.label_medium,
+            self.label_high,
+            id(self.font),
+            self.scale,
+            self.track_color,
+            self.disabled_color,
+            self.label_color,
+        )
+
+    def static_rect(self) -> pygame.Rect:
+        """静态图层在屏幕上的覆盖范围"""
+        return self._cached_geometry()[0]
+
+    def _measure_static_rect(self) -> pygame.Rect:
+        labels = [self.label_low, self.label_medium, self.label_high]
+        labels.extend(self._tick_texts())
+        half_width = max((self.font.size(text)[0] for text in labels if text), default=0) // 2
+        pad_x = half_width + 4
+        pad_top = 2
+        tick_height = max(6, int(12 * self.scale))
+        label_height = self.font.get_height()
+        bottom = max(
+            int(45 * self.scale) + label_height,
+            tick_height + int(8 * self.scale) + label_height,
+            self.track_height,
+        )
+        return pygame.Rect(self.x - pad_x, self.y - pad_top, self.length + pad_x * 2, pad_top + bottom + 2)
+
+    def draw_static(self, surface: pygame.Surface) -> None:
+        rect = self.static_rect()
+        layer = self._static_layer.get(self.static_key(), rect.size, lambda target: self._paint_static(target, rect))
+        surface.blit(layer, rect)
+
+    def draw_dynamic(self, surface: pygame.Surface, origin: Tuple[int, int] = (0, 0)) -> None:
+        """绘制手柄与评分读数；origin 为目标表面左上角对应的屏幕坐标"""
+        x = self.x - origin[0]
+        y = self.y - origin[1]
+        handle_x = self._value_to_position(self.value) - origin[0]
         handle_color = self.handle_color if self.enabled else self.disabled_color
-        pygame.draw.circle(surface, handle_color, (int(handle_x), self.y + self.track_height // 2), self.handle_radius)
+        pygame.draw.circle(surface, handle_color, (int(handle_x), y + self.track_height // 2), self.handle_radius)
 
         text_color = self.label_color if self.enabled else self.disabled_color
+        value_offset = int(65 * self.scale)
+        format_str = self._get_value_format()
+        # 字形少且重复，直接 render 比图集逐字拼接快（见 benchmarks/bench_text_wrap.py）
+        value_label = self.font.render(f"当前评分：{self.value:{format_str}}", True, text_color)
+        surface.blit(value_label, (x + self.length // 2 - value_label.get_width() // 2, y - value_offset))
+
+    def _tick_texts(self) -> List[str]:
+        if self.step <= 0:
+            return []
+        format_str = self._get_value_format()
+        tick_count = int(round((self.max_value - self.min_value) / self.step)) + 1
+        return [f"{self.min_value + i * self.step:{format_str}}" for i in range(tick_count)]
+
+    def _paint_static(self, layer: pygame.Surface, origin: pygame.Rect) -> None:
+        # 以图层左上角为原点换算屏幕坐标
+        x = self.x - origin.x
+        y = self.y - origin.y
+        text_color = self.label_color if self.enabled else self.disabled_color
+        # 透明底色取文字颜色，抗锯齿边缘混合时不会偏暗
+        layer.fill((*text_color, 0))
+        track_rect = pygame.Rect(x, y, self.length, self.track_height)
+        track_color = self.track_color if self.enabled else self.disabled_color
+        pygame.draw.rect(layer, track_color, track_rect, border_radius=4)
+
         scale_offset_y = int(45 * self.scale)
-        
+
         # 绘制左侧和右侧标签
         low_label = self.font.render(self.label_low, True, text_color)
         high_label = self.font.render(self.label_high, True, text_color)
-        surface.blit(low_label, (self.x - low_label.get_width() // 2, self.y + scale_offset_y))
-        surface.blit(high_label, (self.x + self.length - high_label.get_width() // 2, self.y + scale_offset_y))
-        
+        layer.blit(low_label, (x - low_label.get_width() // 2, y + scale_offset_y))
+        layer.blit(high_label, (x + self.length - high_label.get_width() // 2, y + scale_offset_y))
+
         # 绘制中间标签（如果有的话）
         if self.label_medium:
             medium_label = self.font.render(self.label_medium, True, text_color)
-            medium_x = self.x + self.length // 2 - medium_label.get_width() // 2
-            surface.blit(medium_label, (medium_x, self.y + scale_offset_y))
-
-        value_offset = int(65 * self.scale)
-        format_str = self._get_value_format()
-        value_label = self.font.render(f"当前评分：{self.value:{format_str}}", True, text_color)
-        surface.blit(value_label, (self.x + self.length // 2 - value_label.get_width() // 2, self.y - value_offset))
+            medium_x = x + self.length // 2 - medium_label.get_width() // 2
+            layer.blit(medium_label, (medium_x, y + scale_offset_y))
 
         if self.step > 0:
-            tick_count = int(round((self.max_value - self.min_value) / self.step)) + 1
             tick_height = max(6, int(12 * self.scale))
             tick_thickness = max(1, int(2 * self.scale))
             tick_color = text_color
-            
+
             # 绘制刻度线和数值标签
-            for i in range(tick_count):
+            for i, tick_text in enumerate(self._tick_texts()):
                 tick_value = self.min_value + i * self.step
-                tick_x = int(self._value_to_position(tick_value))
-                
+                tick_x = int(self._value_to_position(tick_value)) - origin.x
+
                 # 绘制刻度线
                 pygame.draw.line(
-                    surface,
+                    layer,
                     tick_color,
-                    (tick_x, self.y),
-                    (tick_x, self.y + tick_height),
+                    (tick_x, y),
+                    (tick_x, y + tick_height),
                     tick_thickness,
                 )
-                
+
                 # 绘制数值标签
-                format_str = self._get_value_format()
-                tick_label = self.font.render(f"{tick_value:{format_str}}", True, text_color)
+                tick_label = self.font.render(tick_text, True, text_color)
                 label_x = tick_x - tick_label.get_width() // 2
-                label_y = self.y + tick_height + int(8 * self.scale)
-                surface.blit(tick_label, (label_x, label_y))
+                label_y = y + tick_height + int(8 * self.scale)
+                layer.blit(tick_label, (label_x, label_y))
 
     def handle_event(self, event: pygame.event.Event) -> None:
         if not self.enabled:
@@ -126,12 +237,26 @@ class Slider:
         snapped = max(self.min_value, min(self.max_value, snapped))
         self.value = snapped
 
+    def position_of(self, value: float) -> Tuple[int, int]:
+        """评分值在轨道上对应的屏幕坐标（手柄圆心）"""
+        return int(round(self._value_to_position(value))), self.y + self.track_height // 2
+
     def _value_to_position(self, value: float) -> float:
         ratio = (value - self.min_value) / (self.max_value - self.min_value)
         return self.x + ratio * self.length
 
+    def set_geometry(self, start_pos: Tuple[int, int], length: int) -> None:
+        """重新定位轨道；静态图层以坐标为键，会在下次绘制时自动重建"""
+        if (self.x, self.y) != tuple(start_pos) or self.length != length:
+            self.x, self.y = start_pos
+            self.length = length
+            self._dragging = False
+            self.invalidate()
+
     def set_enabled(self, enabled: bool) -> None:
-        self.enabled = enabled
+        if enabled != self.enabled:
+            self.enabled = enabled
+            self.invalidate()
         if not enabled:
             self._dragging = False
 
@@ -145,7 +270,7 @@ class Slider:
     def reset(self) -> None:
         self.value = (self.min_value + self.max_value) / 2
         self._dragging = False
-        self.enabled = False
+        self.set_enabled(False)
 
     def _get_value_format(self) -> str:
         """根据步长和值范围决定数值显示格式"""
@@ -1,9 +1,12 @@
-from typing import Tuple
+from typing import Optional, Tuple
 
 import pygame
 
+from src.ui.widget import Widget
+from src.utils.clock import Clock, default_clock
 
-class TextInput:
+
+class TextInput(Widget):
     """简易文本输入框，用于收集被试信息"""
 
     def __init__(
@@ -19,7 +22,10 @@ class TextInput:
         max_length: int = 32,
         digits_only: bool = False,
         scale: float = 1.0,
+        clock: Optional[Clock] = None,
     ) -> None:
+        super().__init__()
+        self.clock = clock or default_clock()
         self.rect = rect
         self.font = font
         self.placeholder = placeholder
@@ -30,19 +36,36 @@ class TextInput:
         self.background_color = background_color
         self.max_length = max_length
         self.digits_only = digits_only
-        self.value = ""
+        self._value = ""
         self.active = False
         self._caret_visible = True
-        self._last_toggle = 0
-        self._caret_interval = 400  # ms
+        self._last_toggle = 0.0
+        self._caret_interval = 0.4  # s
         self.scale = max(scale, 0.5)
         self.border_radius = max(6, int(12 * self.scale))
 
+    @property
+    def value(self) -> str:
+        return self._value
+
+    @value.setter
+    def value(self, text: str) -> None:
+        if text != self._value:
+            self._value = text
+            self.invalidate()
+
+    def set_rect(self, rect: pygame.Rect) -> None:
+        if rect != self.rect:
+            self.rect = rect
+            self.invalidate()
+
     def set_active(self, active: bool) -> None:
+        if active != self.active or (active and not self._caret_visible):
+            self.invalidate()
         self.active = active
         if active:
             self._caret_visible = True
-            self._last_toggle = pygame.time.get_ticks()
+            self._last_toggle = self.clock.now()
 
     def handle_key(self, event: pygame.event.Event) -> None:
         if not self.active:
@@ -63,28 +86,36 @@ class TextInput:
                 break
             self.value += char
 
-    def draw(self, surface: pygame.Surface) -> None:
-        pygame.draw.rect(surface, self.background_color, self.rect, border_radius=self.border_radius)
+    def bounds(self) -> pygame.Rect:
+        return pygame.Rect(self.rect)
+
+    def update(self) -> None:
+        if not self.active:
+            return
+        now = self.clock.now()
+        if now - self._last_toggle >= self._caret_interval:
+            self._caret_visible = not self._caret_visible
+            self._last_toggle = now
+            self.invalidate()
+
+    def paint(self, surface: pygame.Surface, origin: pygame.Rect) -> None:
+        local_rect = pygame.Rect((0, 0), origin.size)
+        pygame.draw.rect(surface, self.background_color, local_rect, border_radius=self.border_radius)
         border_color = self.active_border_color if self.active else self.border_color
-        pygame.draw.rect(surface, border_color, self.rect, width=2, border_radius=self.border_radius)
+        pygame.draw.rect(surface, border_color, local_rect, width=2, border_radius=self.border_radius)
 
         display_text = self.value if self.value else self.placeholder
         color = self.text_color if self.value else self.placeholder_color
         text_surface = self.font.render(display_text, True, color)
         text_rect = text_surface.get_rect()
-        text_rect.midleft = (self.rect.left + 12, self.rect.centery)
+        text_rect.midleft = (local_rect.left + 12, local_rect.centery)
         surface.blit(text_surface, text_rect)
 
-        if self.active:
-            now = pygame.time.get_ticks()
-            if now - self._last_toggle >= self._caret_interval:
-                self._caret_visible = not self._caret_visible
-                self._last_toggle = now
-            if self._caret_visible:
-                caret_x = text_rect.right + 4
-                caret_top = self.rect.top + int(10 * self.scale)
-                caret_bottom = self.rect.bottom - int(10 * self.scale)
-                pygame.draw.line(surface, self.text_color, (caret_x, caret_top), (caret_x, caret_bottom), 2)
+        if self.active and self._caret_visible:
+            caret_x = text_rect.right + 4
+            caret_top = local_rect.top + int(10 * self.scale)
+            caret_bottom = local_rect.bottom - int(10 * self.scale)
+            pygame.draw.line(surface, self.text_color, (caret_x, caret_top), (caret_x, caret_bottom), 2)
 
     def get_value(self) -> str:
         return self.value.strip()
@@ -92,3 +123,4 @@ class TextInput:
     def clear(self) -> None:
         self.value = ""
         self.active = False
+        self.invalidate()
@@ -0,0 +1,53 @@
+from typing import Optional
+
+import pygame
+
+
+# 窗口内容被系统覆盖或重新显示后需要整屏重绘
+EXPOSE_EVENTS = {pygame.VIDEOEXPOSE, getattr(pygame, "WINDOWEXPOSED", pygame.VIDEOEXPOSE)}
+
+
+class Widget:
+    """保留模式组件基类：组件缓存自身表面，仅在状态变化后重绘"""
+
+    def __init__(self) -> None:
+        self._dirty = True
+        self._surface: Optional[pygame.Surface] = None
+        self._drawn_bounds: Optional[pygame.Rect] = None
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def invalidate(self) -> None:
+        self._dirty = True
+
+    def bounds(self) -> pygame.Rect:
+        """组件绘制时覆盖的屏幕区域"""
+        raise NotImplementedError
+
+    def damaged_rect(self) -> pygame.Rect:
+        """重绘时需要先恢复背景的区域（含上一次绘制的位置）"""
+        bounds = self.bounds()
+        if self._drawn_bounds is not None:
+            return bounds.union(self._drawn_bounds)
+        return bounds
+
+    def paint(self, surface: pygame.Surface, origin: pygame.Rect) -> None:
+        """在组件自身的表面上绘制，origin 为该表面对应的屏幕区域"""
+        raise NotImplementedError
+
+    def update(self) -> None:
+        """逐帧推进与时间相关的状态（如光标闪烁），需要重绘时调用 invalidate"""
+
+    def draw(self, surface: pygame.Surface) -> None:
+        bounds = self.bounds()
+        cached = self._surface
+        if self._dirty or cached is None or cached.get_size() != bounds.size:
+            cached = pygame.Surface((max(1, bounds.width), max(1, bounds.height)), pygame.SRCALPHA)
+            cached.fill((0, 0, 0, 0))
+            self.paint(cached, bounds)
+            self._surface = cached
+            self._dirty = False
+        surface.blit(cached, bounds)
+        self._drawn_bounds = bounds
@@ -0,0 +1,68 @@
+"""场景与主循环使用的时钟。
+
+正式运行用 MonotonicClock（perf_counter 计时、按帧率休眠）；模拟与回归用 VirtualClock，
+时间只在 tick()/advance() 时前进，且可以直接跳到场景的下一个计时节点，整场实验在
+毫秒级完成，记录的时间轴只取决于种子与作答操作。
+"""
+
+import time
+from typing import Optional, Union
+
+import pygame
+
+
+class MonotonicClock:
+    """真实时钟"""
+
+    def __init__(self) -> None:
+        self._frame_clock: Optional[pygame.time.Clock] = None
+
+    def now(self) -> float:
+        return time.perf_counter()
+
+    def tick(self, frame_rate: int = 0, deadline: Optional[float] = None) -> float:
+        """等到下一帧并返回距上一帧的秒数；deadline 仅供虚拟时钟使用"""
+        if self._frame_clock is None:
+            self._frame_clock = pygame.time.Clock()
+        return self._frame_clock.tick(frame_rate) / 1000
+
+
+class VirtualClock:
+    """可控的虚拟时钟：不休眠，每帧前进固定步长"""
+
+    def __init__(self, start: float = 0.0, frame_time: Optional[float] = None, skip_to_deadline: bool = True) -> None:
+        self._now = float(start)
+        self.frame_time = frame_time
+        self.skip_to_deadline = skip_to_deadline
+
+    def now(self) -> float:
+        return self._now
+
+    def advance(self, seconds: float) -> None:
+        if seconds < 0:
+            raise ValueError("虚拟时钟不能倒退")
+        self._now += seconds
+
+    def advance_to(self, target: float) -> None:
+        if target > self._now:
+            self._now = target
+
+    def tick(self, frame_rate: int = 0, deadline: Optional[float] = None) -> float:
+        """前进一帧；deadline 晚于下一帧且允许跳跃时，直接跳到 deadline"""
+        step = self.frame_time if self.frame_time is not None else (1.0 / frame_rate if frame_rate else 0.0)
+        previous = self._now
+        target = previous + step
+        if self.skip_to_deadline and deadline is not None and deadline > target:
+            target = deadline
+        self._now = target
+        return target - previous
+
+
+Clock = Union[MonotonicClock, VirtualClock]
+
+_default_clock = MonotonicClock()
+
+
+def default_clock() -> MonotonicClock:
+    """未注入时钟时使用的全局真实时钟"""
+    return _default_clock
@@ -0,0 +1,287 @@
+"""蒙特卡洛配置校验：对大量种子完整执行试次排布与会话流程，统计失败率与题库消耗。
+
+启动时的 validate_capacity 只检查一次随机分配；个别种子或模拟实验中才出现的问题
+（画像数量不足、取题失败的 RuntimeError、题目控制配置错误等）要在实验室里
+才会暴露。这里对每个种子调用与实验程序相同的方法（trial_count、check_portrait_count、
+begin_run、next_trial_plan、resolve_question_settings）逐试次取题、解析题目控制，统计：
+
+- 失败率与各类失败（含首个复现种子，可用 ExperimentApp(seed=...) 复现）；
+- 每个会话中各规则实际出现次数的分布；
+- 各符号题库的最坏消耗（单个会话用掉的最多题目数与最少剩余）。
+
+种子分块在进程池中执行，结果与进程数无关。
+
+用法：python -m src.validate_configs config.json --seeds 5000 --workers 8
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.config_loader import Config, ConfigError, load_config
+from src.scenes.experiment import check_portrait_count, portrait_files
+from src.stimuli_manager import StimuliManager
+from src.utils.paths import resource_path
+
+
+MODES = ("practice", "formal")
+MIN_CHUNK = 50
+
+
+@dataclass
+class ModeStats:
+    """一种实验模式在一批种子上的汇总，可跨进程合并"""
+
+    sessions: int = 0
+    failed: int = 0
+    failures: Dict[str, Tuple[int, int, str]] = field(default_factory=dict)
+    rule_counts: Dict[str, Counter] = field(default_factory=dict)
+    pool_sizes: Dict[str, int] = field(default_factory=dict)
+    max_used: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+
+    def add_failure(self, seed: int, exc: BaseException) -> None:
+        message = f"{type(exc).__name__}: {exc}"
+        # 试次序号等数字不同的同类错误归为一组
+        key = re.sub(r"\d+", "N", message)
+        count, first_seed, example = self.failures.get(key, (0, seed, message))
+        if seed < first_seed:
+            first_seed, example = seed, message
+        self.failures[key] = (count + 1, first_seed, example)
+        self.failed += 1
+
+    def add_session(self, seed: int, rules: Counter, used: Counter) -> None:
+        # 只记出现过的次数，未出现的会话数在汇总时按 0 次补齐
+        for rule, count in rules.items():
+            self.rule_counts.setdefault(rule, Counter())[count] += 1
+        for symbol, count in used.items():
+            self._update_max_used(symbol, count, seed)
+
+    def _update_max_used(self, symbol: str, count: int, seed: int) -> None:
+        best = self.max_used.get(symbol)
+        if best is None or count > best[0] or (count == best[0] and seed < best[1]):
+            self.max_used[symbol] = (count, seed)
+
+    def merge(self, other: "ModeStats") -> None:
+        self.sessions += other.sessions
+        self.failed += other.failed
+        for rule, histogram in other.rule_counts.items():
+            self.rule_counts.setdefault(rule, Counter()).update(histogram)
+        for key, (count, seed, example) in other.failures.items():
+            if key in self.failures:
+                own_count, own_seed, own_example = self.failures[key]
+                if seed < own_seed:
+                    own_seed, own_example = seed, example
+                self.failures[key] = (own_count + count, own_seed, own_example)
+            else:
+                self.failures[key] = (count, seed, example)
+        self.pool_sizes.update(other.pool_sizes)
+        for symbol, (count, seed) in other.max_used.items():
+            self._update_max_used(symbol, count, seed)
+
+    @property
+    def failure_rate(self) -> float:
+        return self.failed / self.sessions if self.sessions else 0.0
+
+
+def simulate_session(
+    config: Config,
+    stimuli: StimuliManager,
+    portraits: int,
+    mode: str,
+    seed: int,
+) -> Tuple[Counter, Counter]:
+    """走完一个会话的试次排布，返回 (各规则次数, 各符号用题数)
+
+    试次数、画像数量检查与逐试次取题调用的都是实验程序本身的方法，不另写一份。
+    """
+    total = stimuli.trial_count(mode)
+    check_portrait_count(portraits, total)
+    stimuli.begin_run(mode, total, seed=seed)
+    rules: Counter = Counter()
+    used: Counter = Counter()
+    for trial in range(1, total + 1):
+        plan = stimuli.next_trial_plan(trial)
+        for order, question in enumerate(plan.questions, start=1):
+            config.resolve_question_settings(mode=mode, order=order, symbol=question.symbol, rule_code=plan.rule_code)
+            if question.symbol != "~":
+                used[question.symbol] += 1
+        rules[plan.rule_code or "+".join(question.symbol for question in plan.questions)] += 1
+    return rules, used
+
+
+_worker_state: Optional[Tuple[Config, StimuliManager, int, Dict[str, int]]] = None
+
+
+def _load_state(config_path: Optional[str]) -> Tuple[Config, StimuliManager, int, Dict[str, int]]:
+    config = load_config(config_path)
+    stimuli = StimuliManager(resource_path("stimuli.csv"), config)
+    try:
+        portraits = len(portrait_files(config))
+    except ValueError:
+        portraits = 0
+    stimuli.reset_session()
+    return config, stimuli, portraits, stimuli.remaining()
+
+
+def _init_worker(config_path: Optional[str]) -> None:
+    global _worker_state
+    _worker_state = _load_state(config_path)
+
+
+def _run_chunk(start: int, stop: int, modes: Sequence[str]) -> Dict[str, ModeStats]:
+    assert _worker_state is not None
+    config, stimuli, portraits, pools = _worker_state
+    results = {mode: ModeStats(pool_sizes=dict(pools)) for mode in modes}
+    for seed in range(start, stop):
+        for mode in modes:
+            stats = results[mode]
+            stats.sessions += 1
+            try:
+                rules, used = simulate_session(config, stimuli, portraits, mode, seed)
+            except (ValueError, RuntimeError, KeyError, ConfigError) as exc:
+                stats.add_failure(seed, exc)
+                continue
+            stats.add_session(seed, rules, used)
+    return results
+
+
+def validate_config(
+    config_path: Optional[str],
+    seeds: int,
+    start_seed: int = 0,
+    modes: Sequence[str] = MODES,
+    workers: Optional[int] = None,
+) -> Dict[str, ModeStats]:
+    """对 [start_seed, start_seed + seeds) 的每个种子在各模式下跑一遍会话"""
+    workers = workers or os.cpu_count() or 1
+    chunk = max(MIN_CHUNK, -(-seeds // (workers * 8)))
+    bounds = [(begin, min(begin + chunk, start_seed + seeds)) for begin in range(start_seed, start_seed + seeds, chunk)]
+    totals = {mode: ModeStats() for mode in modes}
+    if workers <= 1 or len(bounds) <= 1:
+        _init_worker(config_path)
+        parts = [_run_chunk(begin, end, modes) for begin, end in bounds]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(config_path,)) as executor:
+            futures = [executor.submit(_run_chunk, begin, end, modes) for begin, end in bounds]
+            parts = [future.result() for future in futures]
+    for part in parts:
+        for mode, stats in part.items():
+            totals[mode].merge(stats)
+    return totals
+
+
+def _percentile(histogram: Counter, fraction: float) -> int:
+    total = sum(histogram.values())
+    target = fraction * (total - 1)
+    seen = 0
+    for value in sorted(histogram):
+        seen += histogram[value]
+        if seen > target:
+            return value
+    return max(histogram) if histogram else 0
+
+
+def report_dict(stats: Dict[str, ModeStats]) -> Dict[str, Any]:
+    report: Dict[str, Any] = {}
+    for mode, mode_stats in stats.items():
+        completed = mode_stats.sessions - mode_stats.failed
+        rules = {}
+        for rule, observed in sorted(mode_stats.rule_counts.items()):
+            histogram = observed.copy()
+            absent = completed - sum(observed.values())
+            if absent > 0:
+                histogram[0] += absent
+            total = sum(value * count for value, count in histogram.items())
+            rules[rule] = {
+                "mean": total / completed if completed else 0.0,
+                "min": min(histogram) if histogram else 0,
+                "p5": _percentile(histogram, 0.05),
+                "p50": _percentile(histogram, 0.5),
+                "p95": _percentile(histogram, 0.95),
+                "max": max(histogram) if histogram else 0,
+            }
+        depletion = {}
+        for symbol, pool in sorted(mode_stats.pool_sizes.items()):
+            used, seed = mode_stats.max_used.get(symbol, (0, None))
+            depletion[symbol] = {"pool": pool, "max_used": used, "min_remaining": pool - used, "seed": seed}
+        report[mode] = {
+            "sessions": mode_stats.sessions,
+            "failed": mode_stats.failed,
+            "failure_rate": mode_stats.failure_rate,
+            "failures": [
+                {"count": count, "first_seed": seed, "example": example}
+                for count, seed, example in sorted(mode_stats.failures.values(), key=lambda item: -item[0])
+            ],
+            "rules": rules,
+            "depletion": depletion,
+        }
+    return report
+
+
+def print_report(path: str, report: Dict[str, Any], elapsed: float) -> None:
+    print(f"配置：{path}（用时 {elapsed:.2f} s）")
+    for mode, data in report.items():
+        label = "模拟实验" if mode == "practice" else "正式实验"
+        print(f"  {label}：{data['sessions']} 个种子，失败 {data['failed']} 个（{data['failure_rate']:.2%}）")
+        for failure in data["failures"]:
+            print(f"    错误：{failure['count']} 次，首个种子 {failure['first_seed']}：{failure['example']}")
+        if data["rules"]:
+            print("    规则\t平均\t最少\tP5\tP50\tP95\t最多")
+            for rule, row in data["rules"].items():
+                print(
+                    f"    {rule}\t{row['mean']:.2f}\t{row['min']}\t{row['p5']}\t{row['p50']}\t{row['p95']}\t{row['max']}"
+                )
+        for symbol, row in data["depletion"].items():
+            warn = "（会重复出题）" if row["min_remaining"] < 0 else ""
+            print(
+                f"    符号 {symbol}：题库 {row['pool']} 道，单会话最多用 {row['max_used']} 道，"
+                f"最少剩余 {row['min_remaining']}{warn}"
+            )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="蒙特卡洛配置校验：对大量种子完整执行试次排布与会话流程")
+    parser.add_argument("configs", nargs="*", help="配置文件路径，默认 config.json")
+    parser.add_argument("--seeds", type=int, default=2000, help="每个配置校验的种子数")
+    parser.add_argument("--start-seed", type=int, default=0)
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认 CPU 核数")
+    parser.add_argument("--json", help="把完整报告写入 JSON 文件")
+    args = parser.parse_args(argv)
+
+    configs: List[Optional[str]] = list(args.configs) or [None]
+    reports: Dict[str, Any] = {}
+    failed = False
+    for config_path in configs:
+        label = config_path or "config.json"
+        try:
+            config, stimuli, _, _ = _load_state(config_path)
+        except (ConfigError, ValueError, OSError) as exc:
+            print(f"错误：无法加载配置 {label}。详情：{exc}")
+            failed = True
+            continue
+        try:
+            config.ensure_stimuli_capacity(stimuli)
+        except (ConfigError, ValueError) as exc:
+            print(f"警告：{label} 未通过启动时的容量校验：{exc}")
+        start = time.perf_counter()
+        stats = validate_config(config_path, args.seeds, args.start_seed, args.modes, args.workers)
+        report = report_dict(stats)
+        print_report(label, report, time.perf_counter() - start)
+        reports[label] = report
+        failed = failed or any(data["failed"] for data in report.values())
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(reports, handle, ensure_ascii=False, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
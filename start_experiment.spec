@@ -22,10 +22,22 @@ for filename in ("config.json", "stimuli.csv"):
     if os.path.exists(source):
         datas.append((source, "."))
 
+# 设置 PSYCH_SUBSET_FONT_ONLY=1 时，只打包 `python -m src.font_subset` 生成的子集字体，
+# 不再携带对应的完整字体（子集外字符将回退到系统字体）
+subset_font_only = os.environ.get("PSYCH_SUBSET_FONT_ONLY") == "1"
+
 for folder, prefix in (("fonts", "fonts"), ("pictures", "pictures")):
     folder_path = os.path.join(project_root_str, folder)
     if os.path.isdir(folder_path):
-        extra_trees.append((folder_path, prefix))
+        excludes = []
+        if folder == "fonts" and subset_font_only:
+            for name in os.listdir(folder_path):
+                stem, ext = os.path.splitext(name)
+                if ext.lower() not in (".ttf", ".otf") or stem.endswith(".subset"):
+                    continue
+                if os.path.exists(os.path.join(folder_path, f"{stem}.subset.ttf")):
+                    excludes.append(name)
+        extra_trees.append((folder_path, prefix, excludes))
 
 hiddenimports = collect_submodules("pygame")
 
@@ -45,8 +57,8 @@ a = Analysis(
     noarchive=False,
 )
 
-for folder_path, prefix in extra_trees:
-    a.datas += Tree(folder_path, prefix=prefix)
+for folder_path, prefix, excludes in extra_trees:
+    a.datas += Tree(folder_path, prefix=prefix, excludes=excludes)
 
 pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
 
@@ -0,0 +1,25 @@
+import json
+import os
+
+import pytest
+
+# 测试在无显示器环境中运行，须在导入 pygame 之前切换到 dummy 驱动
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from src.config_loader import load_config  # noqa: E402
+from src.utils.paths import resource_path  # noqa: E402
+
+
+@pytest.fixture
+def experiment_config(tmp_path):
+    """仓库自带的 config.json，去掉未随仓库分发的字体路径，导出到临时目录"""
+    with open(resource_path("config.json"), "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    raw["fonts"]["path"] = None
+    raw["pictures_dir"] = resource_path("pictures")
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(raw, ensure_ascii=False), encoding="utf-8")
+    config = load_config(str(path))
+    config.set_export_directory(str(tmp_path / "data"))
+    return config
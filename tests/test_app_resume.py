@@ -0,0 +1,57 @@
+from src.app import ExperimentApp
+from src.stimuli_manager import StimuliManager
+from src.utils.paths import resource_path
+
+
+INFO = {"name": "张三", "age": "20", "gender": "男", "class": "1"}
+
+
+def _app(config) -> ExperimentApp:
+    return ExperimentApp(config, StimuliManager(resource_path("stimuli.csv"), config), headless=True, frame_rate=0)
+
+
+def _answer(app: ExperimentApp, count=None) -> None:
+    answered = 0
+    while app.state == "experiment" and app.current_scene.state != "completed":
+        scene = app.current_scene
+        if scene.state == "question":
+            if count is not None and answered >= count:
+                return
+            scene.slider.set_value(4)
+            scene._confirm_rating()
+            answered += 1
+        else:
+            scene._present_next_question()
+
+
+def _crash_session(config, name: str) -> None:
+    app = _app(config)
+    app.participant_info = dict(INFO, name=name)
+    app.start_experiment("formal")
+    _answer(app, count=2)
+    # 模拟异常退出：日志已落盘，但不导出
+    app.recorder._journal.close()
+
+
+def test_remaining_sessions_are_offered_after_a_resumed_one_finishes(experiment_config):
+    _crash_session(experiment_config, "甲")
+    _crash_session(experiment_config, "乙")
+
+    app = _app(experiment_config)
+    app.start()
+    assert app.state == "resume"
+    assert len(app.current_scene.sessions) == 2
+
+    first = app.current_scene.current
+    app.current_scene._resume()
+    _answer(app)
+    app.current_scene.on_finish()
+
+    assert app.state == "resume"
+    sessions = app.current_scene.sessions
+    assert len(sessions) == 1
+    assert sessions[0].journal_path != first.journal_path
+
+    app.current_scene.on_skip()
+    assert app.state == "menu"
+    app.shutdown()
@@ -0,0 +1,46 @@
+import os
+import shutil
+from types import SimpleNamespace
+
+import pygame
+import pytest
+
+from src import font_subset
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    font_path = tmp_path / "fonts" / "Demo.ttf"
+    font_path.parent.mkdir()
+    shutil.copy(os.path.join(os.path.dirname(pygame.__file__), pygame.font.get_default_font()), font_path)
+    return SimpleNamespace(
+        font_path=str(font_path),
+        raw={"title": "Demo"},
+        _path=str(tmp_path / "config.json"),
+    )
+
+
+def test_falls_back_to_full_font_without_fonttools(config, monkeypatch, capsys):
+    monkeypatch.setattr(font_subset, "_has_fonttools", lambda: False)
+
+    selection = font_subset.resolve_font_selection(config, None)
+
+    assert selection.path == config.font_path
+    assert selection.charset is None
+    out = capsys.readouterr().out
+    assert "未安装 fontTools" in out
+    assert config.font_path in out
+
+
+def test_reports_where_subset_is_written(config, capsys):
+    pytest.importorskip("fontTools.subset")
+
+    selection = font_subset.resolve_font_selection(config, None)
+
+    assert selection.path != config.font_path
+    assert os.path.exists(selection.path)
+    assert selection.fallback_path == config.font_path
+    out = capsys.readouterr().out
+    assert f"写入用户目录：{selection.path}" in out
+    assert f"已生成子集字体：{selection.path}" in out
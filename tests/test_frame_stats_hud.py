@@ -0,0 +1,57 @@
+import pygame
+import pytest
+
+from src.frame_stats import FrameStats, FrameStatsHud
+from src.scenes.main_menu import MainMenuScene
+
+
+@pytest.fixture
+def screen():
+    pygame.init()
+    yield pygame.display.set_mode((800, 600))
+    pygame.quit()
+
+
+def _menu(screen: pygame.Surface) -> MainMenuScene:
+    font = pygame.font.Font(None, 24)
+    config = {
+        "colors": {
+            "background": (244, 246, 252),
+            "panel": (255, 255, 255),
+            "text_primary": (44, 47, 56),
+            "accent": (80, 120, 200),
+        },
+        "texts": {},
+    }
+    fonts = {"title": font, "subtitle": font, "body": font, "question": font}
+    return MainMenuScene(screen, config, fonts, lambda mode: None, lambda: None)
+
+
+def _frame(screen: pygame.Surface, scene: MainMenuScene, hud: FrameStatsHud, stats: FrameStats) -> None:
+    # 与 ExperimentApp.step 相同的顺序
+    stats.begin_frame()
+    hud.restore(screen)
+    scene.draw()
+    hud.draw(screen)
+    stats.end_frame("MainMenuScene", "")
+
+
+def test_hud_does_not_burn_into_static_scene(screen):
+    stats = FrameStats(capacity=64)
+    hud = FrameStatsHud(stats)
+    scene = _menu(screen)
+    _frame(screen, scene, hud, stats)
+    clean = tuple(screen.get_at((9, 9)))
+
+    hud.toggle()
+    shaded = []
+    for _ in range(5):
+        _frame(screen, scene, hud, stats)
+        shaded.append(tuple(screen.get_at((9, 9))))
+    # 面板每帧都叠加在原画面上，而不是在上一帧的面板上继续变暗
+    assert shaded[0] != clean
+    assert len(set(shaded)) == 1
+
+    hud.toggle()
+    _frame(screen, scene, hud, stats)
+    assert tuple(screen.get_at((9, 9))) == clean
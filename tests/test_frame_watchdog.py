@@ -0,0 +1,43 @@
+import gc
+import time
+
+from src.frame_watchdog import FrameWatchdog
+
+
+def _busy(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_confirm_frame_stall_is_charged_to_confirmed_question():
+    watchdog = FrameWatchdog(60)
+    watchdog.begin_frame("question")
+    watchdog.begin_frame("question")
+    # 确认所在的帧在事件处理中卡顿，随后立即取出本题的计时质量
+    _busy(0.06)
+    confirmed = watchdog.take()
+    assert confirmed.missed_frames >= 1
+    assert confirmed.worst_frame_ms >= 60
+
+    watchdog.begin_frame("waiting_next")
+    following = watchdog.take()
+    assert following.missed_frames == 0
+    assert following.worst_frame_ms < 30
+
+
+def test_unwatched_states_and_gc_pauses():
+    watchdog = FrameWatchdog(60)
+    watchdog.install()
+    try:
+        watchdog.begin_frame("transition")
+        _busy(0.06)
+        watchdog.begin_frame("transition")
+        assert watchdog.take().missed_frames == 0
+
+        watchdog.begin_frame("question")
+        gc.collect()
+        quality = watchdog.take()
+        assert quality.gc_pause_ms > 0
+    finally:
+        watchdog.close()
@@ -0,0 +1,57 @@
+import pygame
+import pytest
+
+from src.ui import glyph_atlas
+from src.ui.glyph_atlas import GlyphAtlas, atlas_for
+
+
+@pytest.fixture(autouse=True)
+def fonts_ready():
+    pygame.init()
+    glyph_atlas._ATLASES.clear()
+    yield
+    glyph_atlas._ATLASES.clear()
+    pygame.quit()
+
+
+def test_blit_matches_font_render_width():
+    font = pygame.font.Font(None, 32)
+    atlas = GlyphAtlas(font, (20, 20, 20))
+    target = pygame.Surface((400, 60), pygame.SRCALPHA)
+
+    rect = atlas.blit(target, "Rating 4.25", (0, 0))
+
+    # 逐字拼接不做字距调整，与整串 render 的宽度只差舍入
+    assert rect.width == atlas.size("Rating 4.25")[0]
+    assert abs(rect.width - font.size("Rating 4.25")[0]) <= len("Rating 4.25")
+    assert rect.height == font.get_height()
+    assert target.get_bounding_rect().width > 0
+
+
+def test_pages_are_capped():
+    font = pygame.font.Font(None, 40)
+    atlas = GlyphAtlas(font, (20, 20, 20), page_size=64, max_pages=2)
+    text = "".join(chr(code) for code in range(ord("A"), ord("Z") + 1))
+
+    for char in text:
+        atlas.glyph_metrics(char)
+        assert atlas.page_count <= 2
+    assert atlas.glyph_count < len(text)
+    # 清空重建后已缓存的字形仍能正常绘制
+    rect = atlas.blit(pygame.Surface((2000, 60), pygame.SRCALPHA), text, (0, 0))
+    assert rect.width == atlas.size(text)[0]
+
+
+def test_shared_atlases_are_evicted_least_recently_used():
+    first = pygame.font.Font(None, 20)
+    kept = atlas_for(first, (0, 0, 0))
+    fonts = [pygame.font.Font(None, 20 + index) for index in range(glyph_atlas.MAX_ATLASES + 3)]
+
+    for index, font in enumerate(fonts):
+        atlas_for(font, (0, 0, 0))
+        if index % 2 == 0:
+            assert atlas_for(first, (0, 0, 0)) is kept
+
+    assert len(glyph_atlas._ATLASES) == glyph_atlas.MAX_ATLASES
+    assert atlas_for(first, (0, 0, 0)) is kept
+    assert atlas_for(fonts[-1], (0, 0, 0)) is atlas_for(fonts[-1], (0, 0, 0))
@@ -0,0 +1,74 @@
+import importlib.util
+import os
+from collections import Counter
+
+import pytest
+
+from src.merge_results import SOURCE_COLUMN, merge_directory, read_dataset
+from src.recorder import DataRecorder
+
+
+pytestmark = pytest.mark.skipif(
+    not any(importlib.util.find_spec(name) for name in ("pyarrow", "numpy")),
+    reason="合并数据集需要 pyarrow 或 numpy",
+)
+
+
+def _export(path: str, name: str, answered: int) -> None:
+    recorder = DataRecorder(path, journal=False)
+    recorder.set_participant_info({"name": name, "age": "20", "gender": "女", "class": "1"})
+    for index in range(answered):
+        recorder.record("formal", index + 1, 1, "moral", "P", f"题目{index}", 4.0, 0.1, 0.2, 0.3, 0.4, "PN")
+    recorder.export()
+    recorder.close(wait=True)
+
+
+def _rows_by_source(output: str) -> Counter:
+    return Counter(read_dataset(output)[SOURCE_COLUMN])
+
+
+def test_unchanged_files_are_skipped(tmp_path):
+    data, output = tmp_path / "data", str(tmp_path / "merged")
+    _export(str(data / "a_results.csv"), "甲", 3)
+    _export(str(data / "b_results.csv"), "乙", 2)
+
+    first = merge_directory(str(data), output, workers=1)
+    assert (first.merged, first.skipped, first.rows) == (2, 0, 5)
+
+    second = merge_directory(str(data), output, workers=1)
+    assert (second.parsed, second.merged, second.skipped) == (0, 0, 2)
+
+    # 只改修改时间、内容相同：重新解析后按哈希跳过，且更新清单中的时间
+    stat = os.stat(data / "a_results.csv")
+    os.utime(data / "a_results.csv", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    third = merge_directory(str(data), output, workers=1)
+    assert (third.parsed, third.merged, third.skipped) == (1, 0, 2)
+    fourth = merge_directory(str(data), output, workers=1)
+    assert fourth.parsed == 0
+
+    assert _rows_by_source(output) == {"a_results.csv": 3, "b_results.csv": 2}
+
+
+def test_changed_file_replaces_its_old_rows(tmp_path):
+    data, output = tmp_path / "data", str(tmp_path / "merged")
+    _export(str(data / "a_results.csv"), "甲", 3)
+    _export(str(data / "b_results.csv"), "乙", 2)
+    merge_directory(str(data), output, workers=1)
+
+    _export(str(data / "a_results.csv"), "甲", 5)
+    report = merge_directory(str(data), output, workers=1)
+
+    assert (report.merged, report.replaced, report.skipped, report.rows) == (1, 1, 1, 5)
+    assert _rows_by_source(output) == {"a_results.csv": 5, "b_results.csv": 2}
+
+
+def test_invalid_file_is_reported_and_not_merged(tmp_path):
+    data, output = tmp_path / "data", str(tmp_path / "merged")
+    _export(str(data / "a_results.csv"), "甲", 1)
+    (data / "bad_results.csv").write_text("x,y\n1,2\n", encoding="utf-8")
+
+    report = merge_directory(str(data), output, workers=1)
+
+    assert report.merged == 1
+    assert [key for key, _error in report.invalid] == ["bad_results.csv"]
+    assert _rows_by_source(output) == {"a_results.csv": 1}
@@ -0,0 +1,32 @@
+import pytest
+
+from src import resampling
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def differences():
+    return np.random.default_rng(7).normal(0.3, 1.0, size=25)
+
+
+@pytest.mark.parametrize("kind", ["bootstrap", "permutation"])
+def test_result_does_not_depend_on_worker_count(kind, differences):
+    resamples = 2 * resampling.CHUNK_SIZE + 17
+
+    serial = resampling.resample(kind, differences, resamples, seed=3, workers=1)
+
+    assert serial.shape == (resamples,)
+    for workers in (2, 3):
+        parallel = resampling.resample(kind, differences, resamples, seed=3, workers=workers)
+        np.testing.assert_array_equal(parallel, serial)
+
+
+def test_result_depends_on_seed(differences):
+    first = resampling.resample("bootstrap", differences, 500, seed=0, workers=1)
+    again = resampling.resample("bootstrap", differences, 500, seed=0, workers=1)
+    other = resampling.resample("bootstrap", differences, 500, seed=1, workers=1)
+
+    np.testing.assert_array_equal(first, again)
+    assert not np.array_equal(first, other)
+
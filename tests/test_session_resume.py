@@ -0,0 +1,74 @@
+import csv
+
+from src.journal import read_journal
+from src.recorder import DataRecorder
+from src.session_resume import find_resumable_sessions, load_resume_state
+
+
+INFO = {"name": "张三", "age": "20", "gender": "男", "class": "1"}
+SESSION = {
+    "mode": "formal",
+    "seed": 42,
+    "total_trials": 2,
+    "portraits": ["小丁"],
+    "run_plan": {"trials": [{"questions": ["a", "b", "c"]}, {"questions": ["d", "e", "f"]}]},
+    "screen_size": [1920, 1080],
+    "scale": 1.0,
+}
+
+
+def _record(recorder: DataRecorder, trial: int, order: int) -> None:
+    recorder.record("formal", trial, order, "moral", "P", f"题目{trial}-{order}", 3.0, 0.1, 0.2, 0.3, 0.4, "PN")
+
+
+def _crash_after(csv_path: str, answered: int) -> None:
+    recorder = DataRecorder(csv_path)
+    recorder.set_participant_info(INFO)
+    recorder.set_session_info(SESSION)
+    for index in range(answered):
+        _record(recorder, index // 3 + 1, index % 3 + 1)
+    # 模拟崩溃：不导出，末尾留下写了一半的条目
+    recorder._journal.close()
+    with open(recorder.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"type": "rec')
+
+
+def test_interrupted_session_is_found_with_its_position(tmp_path):
+    _crash_after(str(tmp_path / "p.csv"), 4)
+
+    sessions = find_resumable_sessions(str(tmp_path))
+
+    assert len(sessions) == 1
+    state = sessions[0]
+    assert state.participant_info == INFO
+    assert state.mode == "formal" and state.seed == 42
+    assert state.screen_size == (1920, 1080) and state.scale == 1.0
+    assert [(r.trial_index, r.question_order) for r in state.records] == [(1, 1), (1, 2), (1, 3), (2, 1)]
+    assert state.next_position() == (2, 1)
+    assert state.completed_trials() == 1
+
+
+def test_resumed_session_round_trips_to_export(tmp_path):
+    csv_path = str(tmp_path / "p.csv")
+    _crash_after(csv_path, 4)
+    state = find_resumable_sessions(str(tmp_path))[0]
+
+    recorder = DataRecorder(state.csv_path)
+    recorder.set_participant_info(state.participant_info)
+    recorder.restore(state.records, SESSION)
+    _record(recorder, 2, 2)
+    _record(recorder, 2, 3)
+    assert recorder.export() == csv_path
+    recorder.close(wait=True)
+
+    with open(csv_path, "r", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    keys = [(row["trial_index"], row["question_order"]) for row in rows]
+    assert len(keys) == 6 and len(set(keys)) == 6
+    # 残行已截掉，续写的条目仍可完整读出
+    types = [entry["type"] for entry in read_journal(recorder.journal_path)]
+    assert types[-1] == "finalized" and "resumed" in types
+    assert find_resumable_sessions(str(tmp_path)) == []
+    finished = load_resume_state(recorder.journal_path, include_finalized=True)
+    assert len(finished.records) == 6
+    assert finished.next_position() == (3, 0)
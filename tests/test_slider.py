@@ -0,0 +1,56 @@
+import pygame
+import pytest
+
+from src.ui.slider import Slider
+
+
+class CountingFont(pygame.font.Font):
+    def __init__(self, size: int) -> None:
+        super().__init__(None, size)
+        self.size_calls = 0
+
+    def size(self, text):
+        self.size_calls += 1
+        return super().size(text)
+
+
+@pytest.fixture
+def screen():
+    pygame.init()
+    yield pygame.display.set_mode((800, 400))
+    pygame.quit()
+
+
+def _slider(font: pygame.font.Font) -> Slider:
+    colors = ((180, 180, 190), (80, 120, 200), (160, 160, 160))
+    slider = Slider((100, 200), 600, 1, 7, 1, font, "完全不同意", "完全同意", colors, (44, 47, 56))
+    slider.set_enabled(True)
+    return slider
+
+
+def test_geometry_is_measured_once_per_layout(screen):
+    font = CountingFont(24)
+    slider = _slider(font)
+    slider.draw(screen)
+    measured = font.size_calls
+    assert measured > 0
+    # 拖动只改变数值，逐帧重绘不再测量标签
+    for value in (1, 2, 3, 4, 5, 6, 7):
+        slider.set_value(value)
+        slider.draw(screen)
+    assert font.size_calls == measured
+    assert slider.bounds() is slider.bounds()
+
+
+def test_geometry_follows_labels_and_layout(screen):
+    font = CountingFont(24)
+    slider = _slider(font)
+    before = slider.static_rect()
+    slider.label_high = "非常非常非常非常同意"
+    widened = slider.static_rect()
+    assert widened.width > before.width
+    slider.set_geometry((50, 100), 300)
+    moved = slider.static_rect()
+    assert moved.topleft != widened.topleft
+    assert moved == slider._measure_static_rect()
+    assert slider.bounds().contains(moved)
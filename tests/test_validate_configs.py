@@ -0,0 +1,84 @@
+from collections import Counter
+
+import pytest
+
+from src.stimuli_manager import StimuliManager
+from src.utils.paths import resource_path
+from src.validate_configs import ModeStats, simulate_session
+
+
+# 每个种子的模拟结果：(各规则次数, 各符号用题数) 或失败时的异常
+OUTCOMES = {
+    0: (Counter({"PN": 2, "AP": 1}), Counter({"P": 3, "N": 2})),
+    1: ValueError("第 3 个试次缺少题目"),
+    2: (Counter({"PN": 1}), Counter({"P": 5})),
+    3: (Counter({"AP": 2}), Counter({"P": 5, "N": 4})),
+    4: ValueError("第 7 个试次缺少题目"),
+    5: RuntimeError("画像不足"),
+    6: (Counter({"PN": 2}), Counter({"N": 4})),
+}
+
+
+def _stats(seeds) -> ModeStats:
+    stats = ModeStats(pool_sizes={"P": 40, "N": 40})
+    for seed in seeds:
+        stats.sessions += 1
+        outcome = OUTCOMES[seed]
+        if isinstance(outcome, BaseException):
+            stats.add_failure(seed, outcome)
+        else:
+            stats.add_session(seed, *outcome)
+    return stats
+
+
+def test_merged_shards_equal_a_single_pass():
+    expected = _stats(OUTCOMES)
+
+    for shards in ([[0, 1, 2], [3, 4, 5, 6]], [[4, 5, 6], [2, 3], [0, 1]]):
+        merged = ModeStats()
+        for seeds in shards:
+            merged.merge(_stats(seeds))
+        assert merged == expected
+
+
+def test_merge_keeps_lowest_seed_as_example():
+    merged = ModeStats()
+    merged.merge(_stats([4, 5, 6]))
+    merged.merge(_stats([0, 1, 2, 3]))
+
+    # 数字不同的同类错误归为一组，示例取最小的种子
+    count, seed, example = merged.failures["ValueError: 第 N 个试次缺少题目"]
+    assert (count, seed, example) == (2, 1, "ValueError: 第 3 个试次缺少题目")
+    # 符号最大用题数相同时同样取最小种子
+    assert merged.max_used == {"P": (5, 2), "N": (4, 3)}
+    assert merged.rule_counts["PN"] == Counter({2: 2, 1: 1})
+    assert (merged.sessions, merged.failed) == (7, 3)
+    assert merged.failure_rate == 3 / 7
+
+
+def test_simulate_session_uses_the_experiment_trial_setup(experiment_config, monkeypatch):
+    stimuli = StimuliManager(resource_path("stimuli.csv"), experiment_config)
+    total = stimuli.trial_count("formal")
+
+    rules, _used = simulate_session(experiment_config, stimuli, total, "formal", seed=0)
+    assert sum(rules.values()) == total
+    with pytest.raises(ValueError, match="画像数量不足"):
+        simulate_session(experiment_config, stimuli, total - 1, "formal", seed=0)
+
+    # 实验场景的取题流程一改，校验随之改变
+    def broken(self, trial):
+        raise RuntimeError(f"第 {trial} 次试次取题失败")
+
+    monkeypatch.setattr(StimuliManager, "next_trial_plan", broken)
+    with pytest.raises(RuntimeError, match="第 1 次试次取题失败"):
+        simulate_session(experiment_config, stimuli, total, "formal", seed=0)
+
+
+def test_next_trial_plan_reports_exhausted_plan(experiment_config):
+    stimuli = StimuliManager(resource_path("stimuli.csv"), experiment_config)
+    stimuli.begin_run("formal", 2, seed=0)
+    stimuli.next_trial_plan(1)
+    stimuli.next_trial_plan(2)
+
+    with pytest.raises(RuntimeError, match="无法获取第 3 次试次的题目"):
+        stimuli.next_trial_plan(3)